@@ -0,0 +1,127 @@
+"""Run the TFHE benchmarks.
+
+Example:
+
+    python -m benchmarks --degree 1024 --log-p 8 --lwe-dimension 630 \
+        --batch-sizes 1 8 32 --output results.json --baseline baseline.json
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import runner, suite
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--degree",
+        type=int,
+        nargs="+",
+        default=[1024],
+        help="RLWE polynomial degrees N.",
+    )
+    parser.add_argument(
+        "--log-p",
+        type=int,
+        nargs="+",
+        default=[8],
+        help="Base 2 logarithms of the gadget decomposition base.",
+    )
+    parser.add_argument(
+        "--lwe-dimension",
+        type=int,
+        default=None,
+        help="LWE dimension n. Defaults to N, i.e. no key switching.",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32],
+        help="Batch sizes for bootstrap_batch and bootstrap_loop.",
+    )
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=suite.OPERATIONS,
+        default=list(suite.OPERATIONS),
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--baseline", help="Compare the results with this JSON file."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed relative p50 latency increase over the baseline.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    results = []
+    for degree in args.degree:
+        for log_p in args.log_p:
+            params = suite.BenchmarkParams(
+                degree=degree,
+                log_p=log_p,
+                lwe_dimension=args.lwe_dimension or degree,
+            )
+            results += suite.run_suite(
+                params,
+                batch_sizes=args.batch_sizes,
+                repeats=args.repeats,
+                operations=args.operations,
+                log=print,
+            )
+
+    result_dicts = [dataclasses.asdict(r) for r in results]
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "metadata": {
+                        "timestamp": time.time(),
+                        "python": platform.python_version(),
+                        "numpy": np.__version__,
+                        "platform": platform.platform(),
+                    },
+                    "results": result_dicts,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = runner.compare_results(
+            result_dicts, baseline, tolerance=args.tolerance
+        )
+        for r in regressions:
+            print(
+                f"REGRESSION {r.key}: {r.baseline_ms:.3f}ms -> "
+                f"{r.current_ms:.3f}ms ({r.ratio:.2f}x)"
+            )
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
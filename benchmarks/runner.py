@@ -0,0 +1,161 @@
+"""Utilities for timing operations and comparing benchmark results."""
+
+import dataclasses
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any, Optional
+
+import numpy as np
+
+from tfhe import profiling
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    name: str
+    params: Mapping[str, Any]
+
+    # Latency percentiles of a single call, in milliseconds.
+    latency_ms: Mapping[str, float]
+
+    # The number of gates (bootstraps) per second. None for operations that do
+    # not evaluate gates.
+    gates_per_second: Optional[float]
+
+    # The peak traced memory during a call, relative to the start of the call.
+    peak_memory_bytes: int
+
+    # The number of arrays that the operations instrumented with
+    # profiling.count_allocation allocate during a call. Other allocations,
+    # such as the temporaries of numpy expressions, are not counted.
+    instrumented_allocations: int
+
+    def key(self) -> str:
+        """Return a key identifying the operation and its parameters."""
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]"
+
+
+def _measure_memory(fn: Callable[[], Any]) -> int:
+    """Return the peak memory of a call to fn."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        result = fn()
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return peak_memory - start_memory
+
+
+def _count_instrumented_allocations(fn: Callable[[], Any]) -> int:
+    """Return the number of instrumented arrays allocated by a call to fn."""
+    with profiling.profile():
+        fn()
+        return profiling.allocation_summary()["allocations"]
+
+
+def run_benchmark(
+    name: str,
+    fn: Callable[[], Any],
+    params: Mapping[str, Any],
+    repeats: int,
+    warmup: int = 1,
+    gates_per_call: Optional[int] = None,
+) -> BenchmarkResult:
+    """Time repeated calls to fn and measure the memory usage of one call.
+
+    If gates_per_call is not None then the result also contains the gate
+    throughput.
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies[i] = time.perf_counter() - start
+
+    latencies_ms = 1000 * latencies
+    latency_ms = {
+        "mean": float(np.mean(latencies_ms)),
+        "min": float(np.min(latencies_ms)),
+        "p50": float(np.percentile(latencies_ms, 50)),
+        "p90": float(np.percentile(latencies_ms, 90)),
+        "p99": float(np.percentile(latencies_ms, 99)),
+    }
+
+    gates_per_second = None
+    if gates_per_call is not None:
+        gates_per_second = gates_per_call / float(np.mean(latencies))
+
+    peak_memory_bytes = _measure_memory(fn)
+    instrumented_allocations = _count_instrumented_allocations(fn)
+
+    return BenchmarkResult(
+        name=name,
+        params=dict(params),
+        latency_ms=latency_ms,
+        gates_per_second=gates_per_second,
+        peak_memory_bytes=peak_memory_bytes,
+        instrumented_allocations=instrumented_allocations,
+    )
+
+
+@dataclasses.dataclass
+class Regression:
+    key: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms
+
+
+def compare_results(
+    results: Sequence[Mapping[str, Any]],
+    baseline: Sequence[Mapping[str, Any]],
+    tolerance: float = 0.1,
+    metric: str = "p50",
+) -> list[Regression]:
+    """Find the results whose latency regressed relative to a baseline.
+
+    results and baseline are lists of BenchmarkResults converted to dicts, as
+    stored in the JSON output of the runner. A result regresses if its latency
+    metric is more than (1 + tolerance) times the baseline. Results without a
+    matching baseline are ignored.
+    """
+
+    def key(result):
+        return BenchmarkResult(**result).key()
+
+    baseline_by_key = {key(r): r for r in baseline}
+
+    regressions = []
+    for result in results:
+        baseline_result = baseline_by_key.get(key(result))
+        if baseline_result is None:
+            continue
+
+        baseline_ms = baseline_result["latency_ms"][metric]
+        current_ms = result["latency_ms"][metric]
+        if current_ms > (1 + tolerance) * baseline_ms:
+            regressions.append(
+                Regression(
+                    key=key(result),
+                    baseline_ms=baseline_ms,
+                    current_ms=current_ms,
+                )
+            )
+
+    return regressions
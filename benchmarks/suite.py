@@ -0,0 +1,218 @@
+"""Benchmarks for each layer of the TFHE stack."""
+
+import dataclasses
+from collections.abc import Callable, Sequence
+from typing import Optional
+
+from benchmarks import runner
+from tfhe import (
+    bootstrap,
+    config,
+    gsw,
+    lwe,
+    nand,
+    polynomial,
+    rlwe,
+    utils,
+)
+
+OPERATIONS = (
+    "polynomial_multiply",
+    "array_to_base_p",
+    "gsw_multiply",
+    "cmux",
+    "blind_rotate",
+    "bootstrap",
+    "lwe_nand",
+    "bootstrap_batch",
+    "bootstrap_loop",
+)
+
+# The operations whose throughput is reported in gates per second.
+_GATE_OPERATIONS = ("bootstrap", "lwe_nand")
+
+# The operations that are run once for every batch size. bootstrap_loop calls
+# bootstrap on each ciphertext of the batch, so that its throughput is the
+# baseline for the gain of bootstrap_batch.
+_BATCH_OPERATIONS = ("bootstrap_batch", "bootstrap_loop")
+
+
+@dataclasses.dataclass
+class BenchmarkParams:
+    degree: int  # The RLWE polynomial degree N.
+    log_p: int
+    lwe_dimension: int
+    noise_std: float = 2 ** (-24)
+
+    def as_dict(self) -> dict:
+        return {"N": self.degree, "log_p": self.log_p, "n": self.lwe_dimension}
+
+
+class _Setup:
+    """Keys and ciphertexts shared by the benchmarks of a parameter set."""
+
+    def __init__(self, params: BenchmarkParams):
+        self.rlwe_config = rlwe.RlweConfig(
+            degree=params.degree, noise_std=params.noise_std
+        )
+        self.gsw_config = gsw.GswConfig(
+            rlwe_config=self.rlwe_config, log_p=params.log_p
+        )
+        lwe_config = lwe.LweConfig(
+            dimension=params.lwe_dimension, noise_std=params.noise_std
+        )
+
+        self.lwe_key = lwe.generate_lwe_key(lwe_config)
+        self.rlwe_key = rlwe.generate_rlwe_key(self.rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(self.rlwe_key, self.gsw_config)
+
+        # Switch back to the LWE key if its dimension differs from N.
+        keyswitch_config = None
+        if params.lwe_dimension != params.degree:
+            keyswitch_config = config.KEYSWITCH_CONFIG
+
+        self.bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                self.lwe_key, gsw_key, keyswitch_config=keyswitch_config
+            )
+        )
+
+        N = params.degree
+        self.polynomials = [
+            polynomial.Polynomial(N=N, coeff=utils.uniform_sample_int32(N))
+            for _ in range(2)
+        ]
+        self.rlwe_ciphertexts = [
+            rlwe.convert_rlwe_to_compact(
+                rlwe.rlwe_encrypt(
+                    rlwe.rlwe_encode(
+                        polynomial.build_monomial(i, 1, N), self.rlwe_config
+                    ),
+                    self.rlwe_key,
+                )
+            )
+            for i in range(2)
+        ]
+        self.gsw_ciphertext = self.bootstrap_key.gsw_ciphertexts[0]
+        self.lwe_ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode_bool(b), self.lwe_key)
+            for b in [False, True]
+        ]
+
+    def lwe_batch(self, batch_size: int) -> list[lwe.LweCiphertext]:
+        return [
+            lwe.lwe_encrypt(lwe.lwe_encode(-3), self.lwe_key)
+            for _ in range(batch_size)
+        ]
+
+
+def _operation(setup: _Setup, name: str) -> Callable[[], object]:
+    scale = utils.encode_bool(True)
+
+    if name == "polynomial_multiply":
+        return lambda: polynomial.polynomial_multiply(*setup.polynomials)
+    elif name == "array_to_base_p":
+        coeff = setup.polynomials[0].coeff
+        log_p = setup.gsw_config.log_p
+        return lambda: gsw.array_to_base_p(coeff, log_p)
+    elif name == "gsw_multiply":
+        return lambda: gsw.gsw_multiply(
+            setup.gsw_ciphertext, setup.rlwe_ciphertexts[0]
+        )
+    elif name == "cmux":
+        return lambda: gsw.cmux(setup.gsw_ciphertext, *setup.rlwe_ciphertexts)
+    elif name == "blind_rotate":
+        return lambda: bootstrap.blind_rotate(
+            setup.lwe_ciphertexts[0],
+            setup.rlwe_ciphertexts[0],
+            setup.bootstrap_key,
+        )
+    elif name == "bootstrap":
+        return lambda: bootstrap.bootstrap(
+            setup.lwe_ciphertexts[0], setup.bootstrap_key, scale
+        )
+    elif name == "lwe_nand":
+        return lambda: nand.lwe_nand(
+            *setup.lwe_ciphertexts, setup.bootstrap_key
+        )
+
+    raise ValueError(f"Unknown operation: {name}")
+
+
+def _batch_operation(
+    setup: _Setup, name: str, ciphertexts: Sequence[lwe.LweCiphertext]
+) -> Callable[[], object]:
+    scale = utils.encode_bool(True)
+
+    if name == "bootstrap_batch":
+        return lambda: bootstrap.bootstrap_batch(
+            ciphertexts, setup.bootstrap_key, scale
+        )
+    elif name == "bootstrap_loop":
+        return lambda: [
+            bootstrap.bootstrap(c, setup.bootstrap_key, scale)
+            for c in ciphertexts
+        ]
+
+    raise ValueError(f"Unknown operation: {name}")
+
+
+def run_suite(
+    params: BenchmarkParams,
+    batch_sizes: Sequence[int] = (1,),
+    repeats: int = 10,
+    operations: Optional[Sequence[str]] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> list[runner.BenchmarkResult]:
+    """Run the benchmarks of the given operations for one parameter set.
+
+    bootstrap_batch and bootstrap_loop are run once for every batch size.
+    """
+    if operations is None:
+        operations = OPERATIONS
+
+    setup = _Setup(params)
+    results = []
+    for name in operations:
+        if name in _BATCH_OPERATIONS:
+            for batch_size in batch_sizes:
+                ciphertexts = setup.lwe_batch(batch_size)
+                results.append(
+                    runner.run_benchmark(
+                        name,
+                        _batch_operation(setup, name, ciphertexts),
+                        params={**params.as_dict(), "batch_size": batch_size},
+                        repeats=repeats,
+                        gates_per_call=batch_size,
+                    )
+                )
+                if log is not None:
+                    log(_format_result(results[-1]))
+            continue
+
+        results.append(
+            runner.run_benchmark(
+                name,
+                _operation(setup, name),
+                params=params.as_dict(),
+                repeats=repeats,
+                gates_per_call=1 if name in _GATE_OPERATIONS else None,
+            )
+        )
+        if log is not None:
+            log(_format_result(results[-1]))
+
+    return results
+
+
+def _format_result(result: runner.BenchmarkResult) -> str:
+    latency = result.latency_ms
+    line = (
+        f"{result.key():<50} p50={latency['p50']:10.3f}ms "
+        f"p90={latency['p90']:10.3f}ms p99={latency['p99']:10.3f}ms "
+        f"peak={result.peak_memory_bytes / 2**20:8.2f}MiB "
+        f"inst_allocs={result.instrumented_allocations}"
+    )
+    if result.gates_per_second is not None:
+        line += f" gates/s={result.gates_per_second:.2f}"
+    return line
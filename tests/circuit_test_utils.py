@@ -0,0 +1,10 @@
+"""Helpers shared by the circuit tests."""
+
+import itertools
+
+import numpy as np
+
+
+def all_inputs(num_inputs):
+    """Return an array of shape (num_inputs, 2^num_inputs) with all inputs."""
+    return np.array(list(itertools.product([False, True], repeat=num_inputs))).T
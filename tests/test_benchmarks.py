@@ -0,0 +1,65 @@
+import dataclasses
+import unittest
+
+from benchmarks import runner, suite
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_suite(self):
+        params = suite.BenchmarkParams(degree=16, log_p=8, lwe_dimension=4)
+
+        results = suite.run_suite(
+            params,
+            batch_sizes=[1, 2],
+            repeats=2,
+            operations=[
+                "polynomial_multiply",
+                "bootstrap",
+                "bootstrap_batch",
+                "bootstrap_loop",
+            ],
+        )
+
+        self.assertEqual(
+            [r.key() for r in results],
+            [
+                "polynomial_multiply[N=16,log_p=8,n=4]",
+                "bootstrap[N=16,log_p=8,n=4]",
+                "bootstrap_batch[N=16,batch_size=1,log_p=8,n=4]",
+                "bootstrap_batch[N=16,batch_size=2,log_p=8,n=4]",
+                "bootstrap_loop[N=16,batch_size=1,log_p=8,n=4]",
+                "bootstrap_loop[N=16,batch_size=2,log_p=8,n=4]",
+            ],
+        )
+        self.assertIsNone(results[0].gates_per_second)
+        for r in results[1:]:
+            self.assertGreater(r.gates_per_second, 0)
+        for r in results:
+            self.assertLessEqual(r.latency_ms["p50"], r.latency_ms["p99"])
+            self.assertGreaterEqual(r.peak_memory_bytes, 0)
+            self.assertGreater(r.instrumented_allocations, 0)
+
+    def test_compare_results(self):
+        def result(name, p50):
+            return dataclasses.asdict(
+                runner.BenchmarkResult(
+                    name=name,
+                    params={"N": 16},
+                    latency_ms={"p50": p50},
+                    gates_per_second=None,
+                    peak_memory_bytes=0,
+                    instrumented_allocations=0,
+                )
+            )
+
+        baseline = [result("a", 1.0), result("b", 1.0)]
+        results = [result("a", 1.05), result("b", 1.5), result("c", 1.0)]
+
+        regressions = runner.compare_results(results, baseline, tolerance=0.1)
+
+        self.assertEqual([r.key for r in regressions], ["b[N=16]"])
+        self.assertAlmostEqual(regressions[0].ratio, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,16 @@ import unittest
 
 import numpy as np
 
-from tfhe import bootstrap, config, gsw, lwe, polynomial, rlwe, utils
+from tfhe import (
+    bootstrap,
+    config,
+    gsw,
+    lwe,
+    polynomial,
+    profiling,
+    rlwe,
+    utils,
+)
 
 
 class TestBootstrap(unittest.TestCase):
@@ -44,6 +53,43 @@ class TestBootstrap(unittest.TestCase):
         self.assertEqual(rotated_f.coeff[N // 2], -1)
         self.assertEqual(rotated_f.coeff[-1], -1)
 
+    def test_generate_bootstrap_key_parallel(self):
+        lwe_config = lwe.LweConfig(dimension=8, noise_std=2 ** (-24))
+        lwe_key = lwe.generate_lwe_key(lwe_config)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+
+        serial_key = bootstrap.generate_bootstrap_key(lwe_key, gsw_key, seed=5)
+        parallel_key = bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, seed=5, num_workers=2
+        )
+        other_key = bootstrap.generate_bootstrap_key(lwe_key, gsw_key, seed=6)
+
+        def key_data(key):
+            return np.array(
+                [
+                    gsw.convert_gsw_to_compact(c).data
+                    for c in key.gsw_ciphertexts
+                ]
+            )
+
+        # The key only depends on the seed.
+        self.assertTrue(np.all(key_data(serial_key) == key_data(parallel_key)))
+        self.assertFalse(np.all(key_data(serial_key) == key_data(other_key)))
+
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(-3), lwe_key)
+        bootstrap_ciphertext = bootstrap.bootstrap(
+            ciphertext, parallel_key, scale=utils.encode(2)
+        )
+        self.assertEqual(
+            lwe.lwe_decode(
+                lwe.lwe_decrypt(
+                    bootstrap_ciphertext, rlwe.convert_rlwe_key_to_lwe(rlwe_key)
+                )
+            ),
+            2,
+        )
+
     def test_extract_sample(self):
         lwe_key = lwe.generate_lwe_key(config.LWE_CONFIG)
         rlwe_key = rlwe.convert_lwe_key_to_rlwe(lwe_key)
@@ -92,6 +138,282 @@ class TestBootstrap(unittest.TestCase):
             lwe.lwe_decode(lwe.lwe_decrypt(bootstrap_ciphertext, lwe_key)), 2
         )
 
+    def test_bootstrap_fourier_key(self):
+        lwe_key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        gsw_key = gsw.convert_lwe_key_to_gsw(lwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(lwe_key, gsw_key)
+        )
+
+        for i, expected in [(1, 0), (-3, 2)]:
+            ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(i), lwe_key)
+            bootstrap_ciphertext = bootstrap.bootstrap(
+                ciphertext, bootstrap_key, scale=utils.encode(2)
+            )
+            self.assertEqual(
+                lwe.lwe_decode(lwe.lwe_decrypt(bootstrap_ciphertext, lwe_key)),
+                expected,
+            )
+
+    def test_bootstrap_truncated_decomposition(self):
+        lwe_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_config = gsw.GswConfig(config.RLWE_CONFIG, log_p=8, levels=2)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(lwe_key, gsw_key)
+        )
+        self.assertLess(
+            bootstrap.estimate_blind_rotate_noise(
+                gsw_config, lwe_key.config.dimension
+            ),
+            bootstrap.estimate_blind_rotate_noise(
+                config.GSW_CONFIG, lwe_key.config.dimension
+            ),
+        )
+
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(i), lwe_key) for i in [1, -3]
+        ]
+        batch_ciphertexts = bootstrap.bootstrap_batch(
+            ciphertexts, bootstrap_key, scale=utils.encode(2)
+        )
+
+        self.assertEqual(
+            [
+                lwe.lwe_decode(
+                    lwe.lwe_decrypt(c, rlwe.convert_rlwe_key_to_lwe(rlwe_key))
+                )
+                for c in batch_ciphertexts
+            ],
+            [0, 2],
+        )
+
+    def test_bootstrap_unrolled(self):
+        # An odd dimension, so the last key bit is paired with a padding bit.
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=33, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, unrolled=True
+        )
+        fourier_key = bootstrap.convert_bootstrap_key_to_fourier(bootstrap_key)
+
+        self.assertEqual(len(bootstrap_key.gsw_ciphertexts), 3 * 17)
+        self.assertEqual(len(fourier_key.gsw_ciphertexts), 17)
+        self.assertTrue(fourier_key.unrolled)
+
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(i), lwe_key) for i in [1, -3, 3]
+        ]
+        batch_ciphertexts = bootstrap.bootstrap_batch(
+            ciphertexts, fourier_key, scale=utils.encode(2)
+        )
+
+        # An unrolled key is not converted to the Fourier domain on each call.
+        with self.assertRaises(TypeError):
+            bootstrap.bootstrap(
+                ciphertexts[0], bootstrap_key, scale=utils.encode(2)
+            )
+
+        single_ciphertexts = [
+            bootstrap.bootstrap(c, fourier_key, scale=utils.encode(2))
+            for c in ciphertexts
+        ]
+
+        for batch_ciphertext, single_ciphertext in zip(
+            batch_ciphertexts, single_ciphertexts
+        ):
+            self.assertTrue(np.all(batch_ciphertext.a == single_ciphertext.a))
+            self.assertEqual(batch_ciphertext.b, single_ciphertext.b)
+
+        self.assertEqual(
+            [
+                lwe.lwe_decode(
+                    lwe.lwe_decrypt(c, rlwe.convert_rlwe_key_to_lwe(rlwe_key))
+                )
+                for c in batch_ciphertexts
+            ],
+            [0, 2, 2],
+        )
+
+    def test_bootstrap_batch(self):
+        lwe_key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        gsw_key = gsw.convert_lwe_key_to_gsw(lwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(lwe_key, gsw_key)
+        )
+
+        messages = [1, -3, 0, 3]
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(i), lwe_key) for i in messages
+        ]
+
+        batch_ciphertexts = bootstrap.bootstrap_batch(
+            ciphertexts, bootstrap_key, scale=utils.encode(2)
+        )
+
+        self.assertEqual(len(batch_ciphertexts), len(messages))
+        for ciphertext, batch_ciphertext in zip(ciphertexts, batch_ciphertexts):
+            single_ciphertext = bootstrap.bootstrap(
+                ciphertext, bootstrap_key, scale=utils.encode(2)
+            )
+            self.assertTrue(np.all(batch_ciphertext.a == single_ciphertext.a))
+            self.assertEqual(batch_ciphertext.b, single_ciphertext.b)
+
+        self.assertEqual(
+            [
+                lwe.lwe_decode(lwe.lwe_decrypt(c, lwe_key))
+                for c in batch_ciphertexts
+            ],
+            [0, 2, 0, 2],
+        )
+
+    def test_bootstrap_batch_empty(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=4, noise_std=2 ** (-24))
+        )
+        gsw_key = gsw.convert_rlwe_key_to_gsw(
+            rlwe.generate_rlwe_key(config.RLWE_CONFIG), config.GSW_CONFIG
+        )
+
+        for unrolled in [False, True]:
+            bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+                bootstrap.generate_bootstrap_key(
+                    lwe_key, gsw_key, unrolled=unrolled
+                )
+            )
+            self.assertEqual(
+                bootstrap.bootstrap_batch([], bootstrap_key, utils.encode(2)),
+                [],
+            )
+
+    def test_bootstrap_batch_vectorized(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=8, noise_std=2 ** (-24))
+        )
+        gsw_key = gsw.convert_rlwe_key_to_gsw(
+            rlwe.generate_rlwe_key(config.RLWE_CONFIG), config.GSW_CONFIG
+        )
+        bootstrap_key = bootstrap.generate_bootstrap_key(lwe_key, gsw_key)
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(1), lwe_key) for _ in range(4)
+        ]
+
+        # Converting the key on every batch costs more than the batch.
+        with self.assertRaises(TypeError):
+            bootstrap.bootstrap_batch(
+                ciphertexts, bootstrap_key, scale=utils.encode(2)
+            )
+
+        # Each step of the blind rotation is one external product for the
+        # whole batch.
+        fourier_key = bootstrap.convert_bootstrap_key_to_fourier(bootstrap_key)
+        for batch_size in [1, 4]:
+            with profiling.profile():
+                bootstrap.bootstrap_batch(
+                    ciphertexts[:batch_size], fourier_key, utils.encode(2)
+                )
+            summary = profiling.summary()
+            self.assertEqual(summary["external_product"]["count"], 8)
+            self.assertEqual(summary["monomial_rotate"]["count"], 8)
+
+    def test_bootstrap_batch_keyswitch(self):
+        lwe_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(i), lwe_key) for i in [1, -3]
+        ]
+
+        batch_ciphertexts = bootstrap.bootstrap_batch(
+            ciphertexts, bootstrap_key, scale=utils.encode(2)
+        )
+
+        for c in batch_ciphertexts:
+            self.assertEqual(c.config, config.SMALL_LWE_CONFIG)
+        self.assertEqual(
+            [
+                lwe.lwe_decode(lwe.lwe_decrypt(c, lwe_key))
+                for c in batch_ciphertexts
+            ],
+            [0, 2],
+        )
+
+    def test_programmable_bootstrap(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+        def square(m):
+            return m * m
+
+        for lookup_table in [square, [3, -4, 1, 2]]:
+            for m in range(-4, 4):
+                ciphertext = bootstrap.programmable_bootstrap(
+                    lwe.lwe_encrypt(lwe.lwe_encode(m), lwe_key),
+                    bootstrap_key,
+                    lookup_table,
+                )
+                if callable(lookup_table):
+                    expected = square(m % 4)
+                else:
+                    expected = lookup_table[m % 4]
+                if m < 0:
+                    expected = -expected
+
+                self.assertEqual(
+                    lwe.lwe_decode(lwe.lwe_decrypt(ciphertext, lwe_key)),
+                    utils.decode(utils.encode(expected)),
+                    msg=f"m={m}",
+                )
+
+    def test_multi_output_bootstrap(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+        lookup_tables = [[0, 1, 2, 3], [3, 2, 1, 0], lambda m: m % 2]
+        for m in range(4):
+            ciphertexts = bootstrap.multi_output_bootstrap(
+                lwe.lwe_encrypt(lwe.lwe_encode(m), lwe_key),
+                bootstrap_key,
+                lookup_tables,
+            )
+            self.assertEqual(
+                [
+                    lwe.lwe_decode(lwe.lwe_decrypt(c, lwe_key))
+                    for c in ciphertexts
+                ],
+                [m, 3 - m, m % 2],
+            )
+
+    def test_programmable_bootstrap_invalid_lookup_table(self):
+        with self.assertRaises(ValueError):
+            bootstrap.build_lookup_table_polynomial([0, 1, 2], 1024)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from tfhe import bootstrap, bootstrap_context, config, gsw, lwe, rlwe, utils
+
+
+class TestBootstrapContext(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=16, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        cls.gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        cls.ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode(m), cls.lwe_key)
+            for m in [1, -3, 0, 2, -1]
+        ]
+
+    def assert_same_bootstraps(self, bootstrap_key, max_batch_size):
+        context = bootstrap_context.BootstrapContext(
+            bootstrap_key, max_batch_size=max_batch_size
+        )
+        scale = utils.encode(2)
+
+        outputs = context.bootstrap_batch(self.ciphertexts, scale)
+
+        expected = bootstrap.bootstrap_batch(
+            self.ciphertexts, context.bootstrap_key, scale
+        )
+        self.assertEqual(len(outputs), len(expected))
+        for c, expected_c in zip(outputs, expected):
+            self.assertEqual(c.config, expected_c.config)
+            self.assertTrue(np.array_equal(c.a, expected_c.a))
+            self.assertEqual(c.b, expected_c.b)
+
+    def test_bootstrap_batch(self):
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            self.lwe_key, self.gsw_key
+        )
+        # The batch is bootstrapped in chunks of 2 and 1.
+        self.assert_same_bootstraps(bootstrap_key, max_batch_size=2)
+        self.assert_same_bootstraps(bootstrap_key, max_batch_size=8)
+
+    def test_bootstrap_keyswitch(self):
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            self.lwe_key,
+            self.gsw_key,
+            keyswitch_config=config.KEYSWITCH_CONFIG,
+        )
+        context = bootstrap_context.BootstrapContext(bootstrap_key)
+
+        output = context.bootstrap(self.ciphertexts[0], utils.encode(2))
+
+        self.assertEqual(
+            lwe.lwe_decode(lwe.lwe_decrypt(output, self.lwe_key)), 0
+        )
+        self.assert_same_bootstraps(bootstrap_key, max_batch_size=3)
+
+    def test_bootstrap_unrolled(self):
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            self.lwe_key, self.gsw_key, unrolled=True
+        )
+        self.assert_same_bootstraps(bootstrap_key, max_batch_size=2)
+
+    def test_no_allocations_per_step(self):
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            self.lwe_key, self.gsw_key
+        )
+        context = bootstrap_context.BootstrapContext(
+            bootstrap_key, max_batch_size=4
+        )
+        scale = utils.encode(2)
+        context.bootstrap_batch(self.ciphertexts[:3], scale)
+        self.assertIs(
+            context.test_polynomial(scale), context.test_polynomial(scale)
+        )
+
+        # Run the CMux steps of a blind rotation on a batch smaller than the
+        # buffers. numpy still allocates a few small objects per call.
+        accumulator = context._accumulator[:3]
+        rotated = context._rotated[0, :3]
+        tracemalloc.start()
+        for i, fourier_data in enumerate(context._fourier_data):
+            context._rotate(accumulator, context._shifts[:3, i, 0], rotated)
+            np.subtract(rotated, accumulator, out=rotated)
+            context._decompose(rotated, context._digits[0, :3])
+            context._external_product_add(fourier_data, accumulator)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(peak, accumulator.nbytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
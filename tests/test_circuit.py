@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+
+from tfhe import bootstrap, circuit, config, gsw, lwe, rlwe
+from tfhe.circuit import Op
+
+from circuit_test_utils import all_inputs
+
+
+def add_adder(builder, x_wires, y_wires):
+    """Add a ripple carry adder to the builder and return its output wires.
+
+    The wires hold the bits of x and y, least significant bit first. The
+    outputs are the len(x_wires) + 1 bits of x + y.
+    """
+    carry = builder.add_gate(Op.FALSE)
+    outputs = []
+    for x, y in zip(x_wires, y_wires):
+        x_xor_y = builder.add_gate(Op.XOR, x, y)
+        outputs.append(builder.add_gate(Op.XOR, x_xor_y, carry))
+        carry = builder.add_gate(Op.MUX, x_xor_y, carry, x)
+    outputs.append(carry)
+    return outputs
+
+
+def build_adder(num_bits):
+    builder = circuit.CircuitBuilder(num_inputs=2 * num_bits)
+    return builder.build(
+        add_adder(builder, range(num_bits), range(num_bits, 2 * num_bits))
+    )
+
+
+class TestCircuit(unittest.TestCase):
+    def test_evaluate_plaintext(self):
+        num_bits = 3
+        adder = build_adder(num_bits)
+        inputs = all_inputs(2 * num_bits)
+
+        outputs = circuit.evaluate_plaintext(adder, inputs)
+
+        weights = 2 ** np.arange(num_bits)
+        x = weights @ inputs[:num_bits]
+        y = weights @ inputs[num_bits:]
+        self.assertTrue(np.all(2 ** np.arange(num_bits + 1) @ outputs == x + y))
+
+    def test_levelize(self):
+        builder = circuit.CircuitBuilder(num_inputs=2)
+        not_x = builder.add_gate(Op.NOT, 0)
+        x_and_y = builder.add_gate(Op.AND, not_x, 1)
+        not_and = builder.add_gate(Op.NOT, x_and_y)
+        output = builder.add_gate(Op.MUX, not_and, 0, 1)
+        c = builder.build([output])
+
+        self.assertEqual(circuit.levelize(c).tolist(), [0, 0, 0, 1, 1, 2])
+        self.assertEqual(circuit.circuit_depth(c), 2)
+        self.assertEqual(circuit.count_bootstraps(c), 3)
+
+    def test_builder_validation(self):
+        builder = circuit.CircuitBuilder(num_inputs=2)
+        with self.assertRaises(ValueError):
+            builder.add_gate(Op.AND, 0)
+        with self.assertRaises(ValueError):
+            builder.add_gate(Op.AND, 0, 2)
+        with self.assertRaises(ValueError):
+            builder.build([3])
+        with self.assertRaises(ValueError):
+            builder.add_gates([Op.XOR, Op.NOT], [[0, 1, -1], [3, -1, -1]])
+
+        wires = builder.add_gates([Op.XOR, Op.NOT], [[0, 1, -1], [2, -1, -1]])
+        self.assertEqual(wires.tolist(), [2, 3])
+        self.assertEqual(builder.add_gate(Op.AND, 2, 3), 4)
+
+    def test_evaluate_circuit(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+        )
+        backend = circuit.BatchBootstrapBackend(bootstrap_key)
+
+        # Check every op together with a 2 bit adder.
+        builder = circuit.CircuitBuilder(num_inputs=4)
+        outputs = [
+            builder.add_gate(op, 0, 1) for op in sorted(circuit.TWO_INPUT_OPS)
+        ]
+        outputs.append(builder.add_gate(Op.NOT, 2))
+        outputs.append(builder.add_gate(Op.TRUE))
+        outputs.append(builder.add_gate(Op.MUX, 0, 2, 3))
+        outputs += add_adder(builder, [0, 1], [2, 3])
+        c = builder.build(outputs)
+
+        for inputs in [[False, True, True, False], [True, True, False, True]]:
+            ciphertexts = [
+                lwe.lwe_encrypt(lwe.lwe_encode_bool(b), lwe_key) for b in inputs
+            ]
+            output_ciphertexts = circuit.evaluate_circuit(
+                c, ciphertexts, backend, max_batch_size=4
+            )
+
+            self.assertEqual(
+                [
+                    lwe.lwe_decode_bool(lwe.lwe_decrypt(ciphertext, lwe_key))
+                    for ciphertext in output_ciphertexts
+                ],
+                circuit.evaluate_plaintext(c, inputs).tolist(),
+            )
+
+    def test_evaluate_circuit_batch_size(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+        )
+        batch_backend = circuit.BatchBootstrapBackend(bootstrap_key)
+        batch_sizes = []
+
+        def backend(ciphertexts):
+            batch_sizes.append(len(ciphertexts))
+            return batch_backend(ciphertexts)
+
+        # A single level of MUX gates, each with two bootstraps.
+        builder = circuit.CircuitBuilder(num_inputs=3)
+        outputs = [
+            builder.add_gate(Op.MUX, *wires)
+            for wires in [(0, 1, 2), (1, 2, 0), (2, 0, 1)]
+        ]
+        c = builder.build(outputs)
+
+        inputs = [True, False, True]
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode_bool(b), lwe_key) for b in inputs
+        ]
+        for max_batch_size in [1, 3, 4]:
+            batch_sizes.clear()
+            output_ciphertexts = circuit.evaluate_circuit(
+                c, ciphertexts, backend, max_batch_size=max_batch_size
+            )
+
+            self.assertLessEqual(max(batch_sizes), max_batch_size)
+            self.assertEqual(sum(batch_sizes), 2 * len(outputs))
+            self.assertEqual(
+                [
+                    lwe.lwe_decode_bool(lwe.lwe_decrypt(ciphertext, lwe_key))
+                    for ciphertext in output_ciphertexts
+                ],
+                circuit.evaluate_plaintext(c, inputs).tolist(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from tfhe import circuit, circuit_optimizer
+from tfhe.circuit import Op
+
+from circuit_test_utils import all_inputs
+
+
+def random_circuit(num_inputs, num_gates, num_outputs, rng):
+    builder = circuit.CircuitBuilder(num_inputs)
+    for _ in range(num_gates):
+        op = Op(rng.integers(len(Op)))
+        inputs = rng.integers(builder.num_wires, size=circuit.NUM_INPUTS[op])
+        builder.add_gate(op, *inputs.tolist())
+    return builder.build(
+        rng.integers(num_inputs, builder.num_wires, size=num_outputs)
+    )
+
+
+class TestCircuitOptimizer(unittest.TestCase):
+    def assert_equivalent(self, c1, c2):
+        inputs = all_inputs(c1.num_inputs)
+        self.assertTrue(
+            np.array_equal(
+                circuit.evaluate_plaintext(c1, inputs),
+                circuit.evaluate_plaintext(c2, inputs),
+            )
+        )
+
+    def test_fold_constants(self):
+        builder = circuit.CircuitBuilder(num_inputs=3)
+        x_and_y = builder.add_gate(Op.AND, 0, 1)
+        x_xor_true = builder.add_gate(Op.XOR, 0, builder.add_gate(Op.TRUE))
+        mux = builder.add_gate(Op.MUX, 2, x_and_y, x_xor_true)
+        c = builder.build([mux, x_xor_true])
+
+        folded = circuit_optimizer.fold_constants(c, known_inputs={1: True})
+
+        # AND(x, 1) = x and XOR(x, 1) = NOT(x), so only the MUX remains.
+        self.assertEqual(circuit.count_bootstraps(folded), 2)
+        self.assertEqual(sorted(folded.ops.tolist()), [Op.NOT, Op.MUX])
+        inputs = all_inputs(3)
+        inputs[1] = True
+        self.assertTrue(
+            np.array_equal(
+                circuit.evaluate_plaintext(c, inputs),
+                circuit.evaluate_plaintext(folded, inputs),
+            )
+        )
+
+    def test_eliminate_common_subexpressions(self):
+        builder = circuit.CircuitBuilder(num_inputs=2)
+        and_1 = builder.add_gate(Op.AND, 0, 1)
+        and_2 = builder.add_gate(Op.AND, 1, 0)
+        c = builder.build([builder.add_gate(Op.XOR, and_1, and_2), and_2])
+
+        optimized = circuit_optimizer.eliminate_common_subexpressions(c)
+
+        # XOR(a, a) = 0 once both ANDs are merged.
+        self.assertEqual(optimized.ops.tolist(), [Op.AND, Op.FALSE])
+        self.assert_equivalent(c, optimized)
+
+    def test_absorb_nots(self):
+        builder = circuit.CircuitBuilder(num_inputs=2)
+        not_x = builder.add_gate(Op.NOT, 0)
+        not_y = builder.add_gate(Op.NOT, 1)
+        c = builder.build([builder.add_gate(Op.AND, not_x, not_y)])
+
+        optimized = circuit_optimizer.absorb_nots(c)
+
+        self.assertEqual(optimized.ops.tolist(), [Op.NOR])
+        self.assert_equivalent(c, optimized)
+
+    def test_rebalance(self):
+        builder = circuit.CircuitBuilder(num_inputs=8)
+        wire = 0
+        for i in range(1, 8):
+            wire = builder.add_gate(Op.XOR, wire, i)
+        c = builder.build([wire])
+        self.assertEqual(circuit.circuit_depth(c), 7)
+
+        balanced = circuit_optimizer.rebalance(c)
+
+        self.assertEqual(circuit.circuit_depth(balanced), 3)
+        self.assertEqual(circuit.count_bootstraps(balanced), 7)
+        self.assert_equivalent(c, balanced)
+
+    def test_optimize_circuit(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            c = random_circuit(
+                num_inputs=5, num_gates=60, num_outputs=4, rng=rng
+            )
+
+            optimized, report = circuit_optimizer.optimize_circuit(c)
+
+            self.assert_equivalent(c, optimized)
+            self.assertEqual(
+                report.bootstraps_after, circuit.count_bootstraps(optimized)
+            )
+            self.assertGreaterEqual(report.bootstraps_saved, 0)
+            self.assertLessEqual(report.depth_after, report.depth_before)
+
+
+if __name__ == "__main__":
+    unittest.main()
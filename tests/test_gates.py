@@ -0,0 +1,120 @@
+import itertools
+import operator
+import unittest
+
+from tfhe import bootstrap, config, gates, gsw, lwe, rlwe
+
+_GATE_FUNCTIONS = {
+    "and": lambda x, y: x and y,
+    "nand": lambda x, y: not (x and y),
+    "or": lambda x, y: x or y,
+    "nor": lambda x, y: not (x or y),
+    "xor": operator.xor,
+    "xnor": lambda x, y: x == y,
+    "andny": lambda x, y: (not x) and y,
+    "andyn": lambda x, y: x and (not y),
+    "orny": lambda x, y: (not x) or y,
+    "oryn": lambda x, y: x or (not y),
+}
+
+
+def _generate_keys(lwe_config, keyswitch_config=None):
+    lwe_key = lwe.generate_lwe_key(lwe_config)
+    rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+    gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+    bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+        bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, keyswitch_config=keyswitch_config
+        )
+    )
+    return lwe_key, bootstrap_key
+
+
+class TestGates(unittest.TestCase):
+    def setUp(self):
+        # A small LWE key keeps the number of blind rotation steps low.
+        self.lwe_key, self.bootstrap_key = _generate_keys(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24)),
+            config.KEYSWITCH_CONFIG,
+        )
+
+    def _encrypt(self, b, lwe_key=None):
+        lwe_key = lwe_key or self.lwe_key
+        return lwe.lwe_encrypt(lwe.lwe_encode_bool(b), lwe_key)
+
+    def _decrypt(self, ciphertext, lwe_key=None):
+        lwe_key = lwe_key or self.lwe_key
+        return lwe.lwe_decode_bool(lwe.lwe_decrypt(ciphertext, lwe_key))
+
+    def test_two_input_gates(self):
+        self.assertEqual(
+            set(_GATE_FUNCTIONS), set(gates.GATE_LINEAR_FORMS.keys())
+        )
+
+        for gate, function in _GATE_FUNCTIONS.items():
+            for b_left, b_right in itertools.product([False, True], repeat=2):
+                ciphertext = gates.lwe_gate(
+                    gate,
+                    self._encrypt(b_left),
+                    self._encrypt(b_right),
+                    self.bootstrap_key,
+                )
+                self.assertEqual(
+                    self._decrypt(ciphertext),
+                    bool(function(b_left, b_right)),
+                    msg=f"{gate}({b_left}, {b_right})",
+                )
+
+    def test_gate_linear_combination_batch(self):
+        lefts = [False, False, True, True]
+        rights = [False, True, False, True]
+        batch_left, batch_right = (
+            lwe.stack_lwe_ciphertexts([self._encrypt(b) for b in bits])
+            for bits in [lefts, rights]
+        )
+
+        combination = gates.gate_linear_combination(
+            "and", batch_left, batch_right
+        )
+
+        self.assertEqual(combination.a.shape, batch_left.a.shape)
+        for i, c in enumerate(lwe.unstack_lwe_ciphertexts(combination)):
+            expected = gates.gate_linear_combination(
+                "and",
+                lwe.unstack_lwe_ciphertexts(batch_left)[i],
+                lwe.unstack_lwe_ciphertexts(batch_right)[i],
+            )
+            self.assertEqual(c.a.tolist(), expected.a.tolist())
+            self.assertEqual(c.b, expected.b)
+
+    def test_xor(self):
+        for b_left, b_right in itertools.product([False, True], repeat=2):
+            ciphertext = gates.lwe_xor(
+                self._encrypt(b_left),
+                self._encrypt(b_right),
+                self.bootstrap_key,
+            )
+            self.assertEqual(self._decrypt(ciphertext), b_left != b_right)
+
+    def test_not(self):
+        for b in [False, True]:
+            ciphertext = gates.lwe_not(self._encrypt(b))
+            self.assertEqual(self._decrypt(ciphertext), not b)
+
+    def test_mux(self):
+        for b_select, b_true, b_false in itertools.product(
+            [False, True], repeat=3
+        ):
+            ciphertext = gates.lwe_mux(
+                self._encrypt(b_select),
+                self._encrypt(b_true),
+                self._encrypt(b_false),
+                self.bootstrap_key,
+            )
+            self.assertEqual(
+                self._decrypt(ciphertext), b_true if b_select else b_false
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,6 +52,127 @@ class TestGsw(unittest.TestCase):
             gsw.base_p_to_polynomial(f_base_p, log_p), f
         )
 
+    def test_gadget_decompose(self):
+        log_p = 8
+        num_powers = gsw.base_p_num_powers(log_p)
+        a = np.random.randint(
+            -(2**31), 2**31 - 1, size=(3, 2, 64), dtype=np.int32
+        )
+
+        a_base_p = gsw.gadget_decompose(a, log_p)
+
+        self.assertEqual(a_base_p.shape, (3, 2 * num_powers, 64))
+        self.assertEqual(a_base_p.dtype, np.int32)
+        self.assertTrue(np.all(a_base_p < 128))
+        self.assertTrue(np.all(a_base_p >= -128))
+
+        # The first L rows are the digits of a and the last L are the digits
+        # of b.
+        for i in range(3):
+            for j in range(2):
+                levels = a_base_p[i, j * num_powers : (j + 1) * num_powers]
+                self.assertTrue(
+                    np.all(gsw.base_p_to_array(levels, log_p) == a[i, j])
+                )
+
+    def test_truncated_gadget_decompose(self):
+        log_p = 8
+        a = np.random.randint(
+            -(2**31), 2**31 - 1, size=(3, 2, 64), dtype=np.int32
+        )
+
+        a_base_p = gsw.gadget_decompose(a, log_p, levels=2)
+
+        self.assertEqual(a_base_p.shape, (3, 4, 64))
+        self.assertTrue(np.all(a_base_p < 128))
+        self.assertTrue(np.all(a_base_p >= -128))
+
+        # The two digits are the coefficients of 2^16 and 2^24 of a rounded
+        # to a multiple of 2^16.
+        for j in range(2):
+            digits = a_base_p[:, 2 * j : 2 * j + 2].swapaxes(0, 1)
+            error = np.subtract(
+                gsw.base_p_to_array(digits, log_p), a[:, j], dtype=np.int32
+            )
+            self.assertTrue(np.all(np.abs(error.astype(np.int64)) <= 2**15))
+            self.assertTrue(
+                np.array_equal(
+                    gsw.array_to_base_p(a[:, j], log_p, levels=2), digits
+                )
+            )
+
+    def test_truncated_gsw_multiply(self):
+        rlwe_config = config.RLWE_CONFIG
+        N = rlwe_config.degree
+        gsw_config = gsw.GswConfig(rlwe_config, log_p=8, levels=2)
+
+        rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+        g = polynomial.Polynomial(
+            N=N, coeff=np.random.randint(-4, 4, size=N, dtype=np.int32)
+        )
+
+        gsw_ciphertext = gsw.gsw_encrypt_compact(
+            gsw.GswPlaintext(gsw_config, polynomial.build_monomial(1, 0, N)),
+            gsw_key,
+        )
+        rlwe_ciphertext = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(g, rlwe_config), rlwe_key
+        )
+
+        self.assertEqual(gsw_ciphertext.data.shape, (4, 2, N))
+        for c in [gsw_ciphertext, gsw.convert_gsw_to_fourier(gsw_ciphertext)]:
+            plaintext = rlwe.rlwe_decrypt(
+                gsw.gsw_multiply(c, rlwe_ciphertext), rlwe_key
+            )
+            self.assert_polynomial_equal(rlwe.rlwe_decode(plaintext), g)
+
+            # The noise matches the estimate.
+            noise = np.subtract(
+                plaintext.message.coeff,
+                rlwe.rlwe_encode(g, rlwe_config).message.coeff,
+                dtype=np.int32,
+            )
+            noise_std = np.std(noise / 2**31)
+            estimate = gsw.estimate_external_product_noise(gsw_config)
+            self.assertGreater(noise_std, estimate / 2)
+            self.assertLess(noise_std, estimate * 2)
+
+    def test_gsw_encrypt(self):
+        rlwe_config = config.RLWE_CONFIG
+        gsw_config = config.GSW_CONFIG
+
+        rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+        gsw_plaintext = gsw.GswPlaintext(
+            config=gsw_config,
+            message=polynomial.build_monomial(c=1, i=1, N=rlwe_config.degree),
+        )
+
+        gsw_ciphertext = gsw.gsw_encrypt(gsw_plaintext, gsw_key)
+        self.assertIsInstance(gsw_ciphertext, gsw.GswCiphertext)
+        self.assertEqual(
+            len(gsw_ciphertext.rlwe_ciphertexts),
+            2 * gsw.gsw_num_levels(gsw_config),
+        )
+
+        # The RLWE ciphertexts round trip through the compact form.
+        compact_ciphertext = gsw.convert_gsw_to_compact(gsw_ciphertext)
+        self.assertEqual(compact_ciphertext.config, gsw_ciphertext.config)
+        for c, compact_c in zip(
+            gsw_ciphertext.rlwe_ciphertexts,
+            compact_ciphertext.rlwe_ciphertexts,
+        ):
+            self.assertIsInstance(c, rlwe.RlweCiphertext)
+            self.assertEqual(compact_c.config, c.config)
+            self.assert_polynomial_equal(compact_c.a, c.a)
+            self.assert_polynomial_equal(compact_c.b, c.b)
+
+        self.assertIsInstance(
+            gsw.gsw_encrypt_compact(gsw_plaintext, gsw_key),
+            gsw.CompactGswCiphertext,
+        )
+
     def test_gsw_multiply(self):
         rlwe_config = config.RLWE_CONFIG
         gsw_config = config.GSW_CONFIG
@@ -76,13 +197,73 @@ class TestGsw(unittest.TestCase):
             fg,
         )
 
+    def test_seeded_gsw_multiply(self):
+        rlwe_config = config.RLWE_CONFIG
+        gsw_config = config.GSW_CONFIG
+
+        rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+
+        f = polynomial.build_monomial(c=-1, i=2, N=rlwe_config.degree)
+        g = polynomial.build_monomial(c=1, i=1, N=rlwe_config.degree)
+
+        gsw_plaintext = gsw.GswPlaintext(config=gsw_config, message=f)
+        gsw_ciphertext = gsw.gsw_encrypt_seeded(gsw_plaintext, gsw_key)
+        rlwe_ciphertext = rlwe.rlwe_encrypt_seeded(
+            rlwe.rlwe_encode(g, rlwe_config), rlwe_key
+        )
+
+        self.assertEqual(
+            gsw_ciphertext.b.shape,
+            (2 * gsw.base_p_num_powers(gsw_config.log_p), rlwe_config.degree),
+        )
+        for c in [gsw_ciphertext, gsw.convert_gsw_to_fourier(gsw_ciphertext)]:
+            rlwe_ciphertext_prod = gsw.gsw_multiply(c, rlwe_ciphertext)
+
+            fg = polynomial.build_monomial(c=-1, i=3, N=rlwe_config.degree)
+            self.assert_polynomial_equal(
+                rlwe.rlwe_decode(
+                    rlwe.rlwe_decrypt(rlwe_ciphertext_prod, rlwe_key)
+                ),
+                fg,
+            )
+
+    def test_fourier_gsw_multiply(self):
+        rlwe_config = config.RLWE_CONFIG
+        gsw_config = config.GSW_CONFIG
+
+        rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+
+        f = polynomial.build_monomial(c=1, i=2, N=rlwe_config.degree)
+        g = polynomial.build_monomial(c=1, i=1, N=rlwe_config.degree)
+
+        gsw_plaintext = gsw.GswPlaintext(config=gsw_config, message=f)
+        rlwe_plaintext = rlwe.rlwe_encode(g, rlwe_config)
+
+        gsw_ciphertext = gsw.gsw_encrypt(gsw_plaintext, gsw_key)
+        fourier_gsw_ciphertext = gsw.convert_gsw_to_fourier(gsw_ciphertext)
+        rlwe_ciphertext = rlwe.rlwe_encrypt(rlwe_plaintext, rlwe_key)
+
+        prod = gsw.gsw_multiply(gsw_ciphertext, rlwe_ciphertext)
+        fourier_prod = gsw.gsw_multiply(fourier_gsw_ciphertext, rlwe_ciphertext)
+
+        # The Fourier domain product is exact.
+        self.assert_polynomial_equal(fourier_prod.a, prod.a)
+        self.assert_polynomial_equal(fourier_prod.b, prod.b)
+
+        fg = polynomial.build_monomial(c=1, i=3, N=rlwe_config.degree)
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(fourier_prod, rlwe_key)), fg
+        )
+
     def test_cmux(self):
         rlwe_config = config.RLWE_CONFIG
         gsw_config = config.GSW_CONFIG
 
         rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
         gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
-        
+
         # Selector bit is 1
         selector = polynomial.build_monomial(c=1, i=0, N=rlwe_config.degree)
         line_0 = polynomial.build_monomial(c=1, i=1, N=rlwe_config.degree)
@@ -107,6 +288,56 @@ class TestGsw(unittest.TestCase):
             line_1,
         )
 
+    def test_compact_cmux(self):
+        rlwe_config = config.RLWE_CONFIG
+        gsw_config = config.GSW_CONFIG
+
+        rlwe_key = rlwe.generate_rlwe_key(rlwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, gsw_config)
+
+        selector = polynomial.build_monomial(c=1, i=0, N=rlwe_config.degree)
+        line_0 = polynomial.build_monomial(c=1, i=1, N=rlwe_config.degree)
+        line_1 = polynomial.build_monomial(c=2, i=1, N=rlwe_config.degree)
+
+        selector_ciphertext = gsw.gsw_encrypt(
+            gsw.GswPlaintext(config=gsw_config, message=selector), gsw_key
+        )
+        line_0_ciphertext = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(line_0, rlwe_config), rlwe_key
+        )
+        line_1_ciphertext = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(line_1, rlwe_config), rlwe_key
+        )
+
+        compact_selector = gsw.convert_gsw_to_compact(selector_ciphertext)
+        self.assertEqual(
+            compact_selector.data.shape,
+            (
+                2 * gsw.base_p_num_powers(gsw_config.log_p),
+                2,
+                rlwe_config.degree,
+            ),
+        )
+
+        cmux_ciphertext = gsw.cmux(
+            selector_ciphertext, line_0_ciphertext, line_1_ciphertext
+        )
+        compact_cmux_ciphertext = gsw.cmux(
+            compact_selector,
+            rlwe.convert_rlwe_to_compact(line_0_ciphertext),
+            rlwe.convert_rlwe_to_compact(line_1_ciphertext),
+        )
+
+        self.assertIsInstance(
+            compact_cmux_ciphertext, rlwe.CompactRlweCiphertext
+        )
+        self.assert_polynomial_equal(
+            compact_cmux_ciphertext.a, cmux_ciphertext.a
+        )
+        self.assert_polynomial_equal(
+            compact_cmux_ciphertext.b, cmux_ciphertext.b
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
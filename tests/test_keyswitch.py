@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from tfhe import config, keyswitch, lwe
+
+
+class TestKeySwitch(unittest.TestCase):
+    def test_keyswitch_decompose(self):
+        ks_config = keyswitch.KeySwitchConfig(log_base=2, levels=8)
+        a = np.random.randint(-(2**31), 2**31, size=(3, 16), dtype=np.int32)
+
+        digits = keyswitch.keyswitch_decompose(a, ks_config)
+
+        self.assertEqual(digits.shape, (3, 16 * 8))
+        self.assertTrue(np.all(digits >= -2))
+        self.assertTrue(np.all(digits < 2))
+
+        # Recombining the digits recovers a up to the rounding of its lowest 16
+        # bits.
+        gadget = 2 ** (32 - 2 * np.arange(1, 9, dtype=np.int64))
+        recombined = np.sum(
+            digits.reshape(3, 16, 8).astype(np.int64) * gadget, axis=-1
+        ).astype(np.int32)
+        error = np.subtract(recombined, a, dtype=np.int32)
+        self.assertTrue(np.all(np.abs(error.astype(np.int64)) <= 2**15))
+
+    def test_keyswitch(self):
+        input_key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        output_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        keyswitch_key = keyswitch.generate_keyswitch_key(
+            input_key, output_key, config.KEYSWITCH_CONFIG
+        )
+
+        for i in range(-4, 4):
+            ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(i), input_key)
+            switched_ciphertext = keyswitch.keyswitch(ciphertext, keyswitch_key)
+
+            self.assertEqual(
+                switched_ciphertext.a.shape,
+                (config.SMALL_LWE_CONFIG.dimension,),
+            )
+            self.assertEqual(
+                lwe.lwe_decode(
+                    lwe.lwe_decrypt(switched_ciphertext, output_key)
+                ),
+                i,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from tfhe import lwe
 from tfhe import config
 from tfhe import utils
@@ -17,6 +19,55 @@ class TestLwe(unittest.TestCase):
 
         self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(ciphertext, key)), -1)
 
+    def test_encrypt_decrypt_batch(self):
+        key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        bits = np.random.randint(2, size=100).astype(bool)
+
+        ciphertext = lwe.lwe_encrypt_batch(lwe.lwe_encode_bool_batch(bits), key)
+
+        self.assertEqual(ciphertext.a.shape, (100, config.LWE_CONFIG.dimension))
+        self.assertEqual(ciphertext.b.shape, (100,))
+        self.assertTrue(
+            np.array_equal(
+                lwe.lwe_decode_bool_batch(
+                    lwe.lwe_decrypt_batch(ciphertext, key)
+                ),
+                bits,
+            )
+        )
+
+        # Each row is an ordinary LWE ciphertext.
+        ciphertexts = lwe.unstack_lwe_ciphertexts(ciphertext)
+        self.assertEqual(
+            [lwe.lwe_decode_bool(lwe.lwe_decrypt(c, key)) for c in ciphertexts],
+            bits.tolist(),
+        )
+        stacked = lwe.stack_lwe_ciphertexts(ciphertexts)
+        self.assertTrue(np.array_equal(stacked.a, ciphertext.a))
+        self.assertTrue(np.array_equal(stacked.b, ciphertext.b))
+
+    def test_encrypt_seeded(self):
+        key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        rng = np.random.default_rng(1)
+
+        ciphertext = lwe.lwe_encrypt_seeded(lwe.lwe_encode(-2), key, rng=rng)
+        self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(ciphertext, key)), -2)
+        expanded = lwe.expand_lwe_ciphertext(ciphertext)
+        self.assertTrue(np.array_equal(expanded.a, ciphertext.a))
+        self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(expanded, key)), -2)
+
+        bits = rng.integers(2, size=10).astype(bool)
+        batch = lwe.lwe_encrypt_seeded(
+            lwe.lwe_encode_bool_batch(bits), key, rng=rng
+        )
+        self.assertEqual(batch.a.shape, (10, config.LWE_CONFIG.dimension))
+        self.assertTrue(
+            np.array_equal(
+                lwe.lwe_decode_bool_batch(lwe.lwe_decrypt_batch(batch, key)),
+                bits,
+            )
+        )
+
     def test_lwe_trivial_ciphertext(self):
         key = lwe.generate_lwe_key(config.LWE_CONFIG)
 
@@ -55,6 +106,52 @@ class TestLwe(unittest.TestCase):
             lwe.lwe_decode(lwe.lwe_decrypt(ciphertext_sum, key)), -1
         )
 
+    def test_add_inplace(self):
+        key = lwe.generate_lwe_key(config.LWE_CONFIG)
+
+        accumulator = lwe.lwe_encrypt(lwe.lwe_encode(3), key)
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(-1), key)
+        a = accumulator.a
+
+        self.assertIs(lwe.lwe_add_inplace(accumulator, ciphertext), accumulator)
+        self.assertIs(accumulator.a, a)
+        lwe.lwe_add_inplace(accumulator, ciphertext)
+        self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(accumulator, key)), 1)
+
+        # The bodies of a batch are updated in place.
+        batch = lwe.lwe_encrypt_batch(
+            lwe.lwe_encode_bool_batch(np.array([False, True])), key
+        )
+        b = batch.b
+        lwe.lwe_subtract_inplace(batch, ciphertext)
+        self.assertIs(batch.b, b)
+        self.assertEqual(
+            utils.decode_array(
+                lwe.lwe_decrypt_batch(batch, key).message
+            ).tolist(),
+            [1, 3],
+        )
+
+    def test_add_inplace_seeded(self):
+        key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        seeded = lwe.lwe_encrypt_seeded(lwe.lwe_encode(1), key)
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(2), key)
+
+        # The mask of a seeded ciphertext cannot be updated in place.
+        with self.assertRaises(TypeError):
+            lwe.lwe_add_inplace(seeded, ciphertext)
+        with self.assertRaises(TypeError):
+            lwe.lwe_subtract_inplace(seeded, ciphertext)
+
+        accumulator = lwe.lwe_add_inplace(
+            lwe.expand_lwe_ciphertext(seeded), ciphertext
+        )
+        self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(accumulator, key)), 3)
+
+        # A seeded ciphertext can be added to an accumulator.
+        accumulator = lwe.lwe_add_inplace(ciphertext, seeded)
+        self.assertEqual(lwe.lwe_decode(lwe.lwe_decrypt(accumulator, key)), 3)
+
     def test_plaintext_multiply(self):
         key = lwe.generate_lwe_key(config.LWE_CONFIG)
         plaintext = lwe.lwe_encode(2)
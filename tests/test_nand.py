@@ -2,7 +2,7 @@ import unittest
 
 import numpy as np
 
-from tfhe import bootstrap, config, gsw, lwe, nand
+from tfhe import bootstrap, config, gsw, lwe, nand, rlwe
 
 
 class TestNand(unittest.TestCase):
@@ -24,6 +24,39 @@ class TestNand(unittest.TestCase):
 
         self.assertEqual(lwe.lwe_decode_bool(plaintext_nand), True)
 
+    def test_nand_gate_keyswitch(self):
+        lwe_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+        for b_left in [False, True]:
+            for b_right in [False, True]:
+                ciphertext_left = lwe.lwe_encrypt(
+                    lwe.lwe_encode_bool(b_left), lwe_key
+                )
+                ciphertext_right = lwe.lwe_encrypt(
+                    lwe.lwe_encode_bool(b_right), lwe_key
+                )
+
+                ciphertext_nand = nand.lwe_nand(
+                    ciphertext_left, ciphertext_right, bootstrap_key
+                )
+
+                self.assertEqual(
+                    ciphertext_nand.config, config.SMALL_LWE_CONFIG
+                )
+                self.assertEqual(
+                    lwe.lwe_decode_bool(
+                        lwe.lwe_decrypt(ciphertext_nand, lwe_key)
+                    ),
+                    not (b_left and b_right),
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from tfhe import circuit, netlist
+from tfhe.circuit import Op
+
+from circuit_test_utils import all_inputs
+
+# A 2 bit adder. The inputs are a = (w0, w1) and b = (w2, w3), least
+# significant bit first, and the outputs are the 3 bits of a + b.
+BRISTOL_ADDER = """\
+7 12
+2 2 2
+1 3
+
+2 1 0 2 4 XOR
+2 1 0 2 5 AND
+2 1 1 3 6 XOR
+1 1 4 9 EQW
+2 1 6 5 10 XOR
+4 2 1 6 3 5 7 8 MAND
+2 1 7 8 11 XOR
+"""
+
+# The same adder in BLIF, with the blocks out of order.
+BLIF_ADDER = """\
+# A 2 bit adder
+.model adder
+.inputs a0 a1 \\
+  b0 b1
+.outputs s0 s1 s2
+.names t c0 s1
+10 1
+01 1
+.names a0 b0 s0
+00 0
+11 0
+.names a0 b0 c0
+11 1
+.names a1 b1 t
+10 1
+01 1
+.names a1 b1 c1
+11 1
+.names t c0 tc
+11 1
+.names c1 tc s2
+1- 1
+-1 1
+.end
+"""
+
+
+class TestNetlist(unittest.TestCase):
+    def assert_adder(self, c):
+        inputs = all_inputs(4)
+        outputs = circuit.evaluate_plaintext(c, inputs)
+
+        self.assertEqual(outputs.shape, (3, 16))
+        a = inputs[0] + 2 * inputs[1].astype(int)
+        b = inputs[2] + 2 * inputs[3].astype(int)
+        self.assertTrue(np.array_equal([1, 2, 4] @ outputs, a + b))
+
+    def test_parse_bristol(self):
+        c = netlist.parse_bristol(BRISTOL_ADDER.splitlines())
+
+        self.assertEqual(c.num_inputs, 4)
+        self.assertEqual(c.num_gates, 7)
+        self.assert_adder(c)
+
+    def test_parse_bristol_constants(self):
+        c = netlist.parse_bristol(
+            ["3 4", "1 1", "1 3", "1 1 0 1 INV", "1 1 1 2 EQ", "1 1 0 3 EQ"]
+        )
+
+        self.assertEqual(c.ops.tolist(), [Op.NOT, Op.TRUE, Op.FALSE])
+        self.assertEqual(
+            circuit.evaluate_plaintext(c, [[False, True]]).tolist(),
+            [[True, False], [True, True], [False, False]],
+        )
+
+    def test_parse_bristol_chunks(self):
+        # A chain of XOR gates that spans several chunks.
+        num_gates = 3 * netlist._CHUNK_SIZE // 2
+        lines = [f"{num_gates} {num_gates + 2}", "2 1 1", "1 1"]
+        for g in range(num_gates):
+            lines.append(f"2 1 {g} {g + 1} {g + 2} XOR")
+
+        c = netlist.parse_bristol(lines)
+
+        self.assertEqual(c.num_gates, num_gates)
+        self.assertTrue(np.all(c.ops == Op.XOR))
+        self.assertTrue(
+            np.array_equal(
+                c.gate_inputs[:, :2],
+                np.arange(num_gates)[:, None] + [0, 1],
+            )
+        )
+
+    def test_parse_bristol_errors(self):
+        with self.assertRaises(ValueError):
+            netlist.parse_bristol(["1 3", "1 2", "1 1", "2 1 0 1 2 OR"])
+        with self.assertRaises(ValueError):
+            # Wire 3 is read before it is defined.
+            netlist.parse_bristol(["1 4", "1 2", "1 1", "2 1 0 3 2 AND"])
+        with self.assertRaises(ValueError):
+            # The header has more gates than the netlist.
+            netlist.parse_bristol(["2 3", "1 2", "1 1", "2 1 0 1 2 AND"])
+
+    def test_parse_blif(self):
+        c = netlist.parse_blif(BLIF_ADDER.splitlines())
+
+        self.assertEqual(c.num_inputs, 4)
+        self.assert_adder(c)
+
+    def test_parse_blif_degenerate_blocks(self):
+        c = netlist.parse_blif(
+            [
+                ".model m",
+                ".inputs x y",
+                ".outputs one zero buf not_y",
+                ".names one",
+                "1",
+                ".names zero",
+                ".names x buf",
+                "1 1",
+                ".names x y not_y",
+                "-0 1",
+            ]
+        )
+
+        self.assertEqual(sorted(c.ops.tolist()), [Op.NOT, Op.FALSE, Op.TRUE])
+        self.assertEqual(
+            circuit.evaluate_plaintext(
+                c, [[False, True], [False, False]]
+            ).T.tolist(),
+            [[True, False, False, True], [True, False, True, True]],
+        )
+
+    def test_parse_blif_errors(self):
+        with self.assertRaises(ValueError):
+            netlist.parse_blif([".inputs a b c", ".names a b c d", "111 1"])
+        with self.assertRaises(ValueError):
+            netlist.parse_blif([".inputs a", ".outputs b", ".names c b", "1 1"])
+        with self.assertRaises(ValueError):
+            netlist.parse_blif(
+                [
+                    ".inputs a",
+                    ".outputs b",
+                    ".names a c b",
+                    "11 1",
+                    ".names b c",
+                    "1 1",
+                ]
+            )
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bristol_path = os.path.join(directory, "adder.txt")
+            blif_path = os.path.join(directory, "adder.blif")
+            with open(bristol_path, "w") as f:
+                f.write(BRISTOL_ADDER)
+            with open(blif_path, "w") as f:
+                f.write(BLIF_ADDER)
+
+            self.assert_adder(netlist.load_bristol(bristol_path))
+            self.assert_adder(netlist.load_blif(blif_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
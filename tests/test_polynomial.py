@@ -47,6 +47,89 @@ class TestPolynomial(unittest.TestCase):
             polynomial.polynomial_multiply(p_0, p_1), p_mul
         )
 
+    def test_polynomial_multiply_matches_naive(self):
+        N = 1024
+        p_0 = polynomial.Polynomial(
+            N=N,
+            coeff=np.random.randint(-(2**31), 2**31, size=N, dtype=np.int32),
+        )
+        p_1 = polynomial.Polynomial(
+            N=N,
+            coeff=np.random.randint(-(2**31), 2**31, size=N, dtype=np.int32),
+        )
+
+        self.assert_polynomial_equals(
+            polynomial.polynomial_multiply(p_0, p_1),
+            polynomial.naive_polynomial_multiply(p_0, p_1),
+        )
+
+    def test_negacyclic_multiply_broadcast(self):
+        N = 64
+        a = np.random.randint(-(2**31), 2**31, size=(3, N), dtype=np.int32)
+        digits = np.random.randint(-128, 128, size=(2, 1, N), dtype=np.int32)
+
+        prod = polynomial.negacyclic_multiply(digits, a)
+
+        self.assertEqual(prod.shape, (2, 3, N))
+        for i in range(2):
+            for j in range(3):
+                self.assert_polynomial_equals(
+                    polynomial.Polynomial(N=N, coeff=prod[i, j]),
+                    polynomial.naive_polynomial_multiply(
+                        polynomial.Polynomial(N=N, coeff=digits[i, 0]),
+                        polynomial.Polynomial(N=N, coeff=a[j]),
+                    ),
+                )
+
+    def test_fft_into(self):
+        a = np.random.normal(size=(3, 8)) + 1j * np.random.normal(size=(3, 8))
+
+        # Also check the fallback for numpy versions without the out argument.
+        fft_has_out = polynomial._FFT_HAS_OUT
+        try:
+            for polynomial._FFT_HAS_OUT in [fft_has_out, False]:
+                out = np.empty_like(a)
+                self.assertIs(polynomial.fft_into(a, out, axis=0), out)
+                np.testing.assert_allclose(out, np.fft.fft(a, axis=0))
+
+                self.assertIs(polynomial.ifft_into(out, out, axis=0), out)
+                np.testing.assert_allclose(out, a)
+        finally:
+            polynomial._FFT_HAS_OUT = fft_has_out
+
+    def test_monomial_multiply(self):
+        N = 16
+        p = polynomial.Polynomial(
+            N=N,
+            coeff=np.random.randint(-(2**31), 2**31, size=N, dtype=np.int32),
+        )
+
+        for k in [0, 1, 5, N, N + 3, 2 * N - 1, -1, -N - 2, 5 * N + 7]:
+            self.assert_polynomial_equals(
+                polynomial.monomial_multiply(p, k),
+                polynomial.polynomial_multiply(
+                    polynomial.build_monomial(1, k, N), p
+                ),
+            )
+
+    def test_negacyclic_rotate_batch(self):
+        N = 16
+        coeff = np.random.randint(
+            -(2**31), 2**31, size=(3, 2, N), dtype=np.int32
+        )
+        k = np.array([3, -7, 20])
+
+        rotated = polynomial.negacyclic_rotate(coeff, k[:, None])
+
+        for i in range(3):
+            for j in range(2):
+                self.assert_polynomial_equals(
+                    polynomial.Polynomial(N=N, coeff=rotated[i, j]),
+                    polynomial.monomial_multiply(
+                        polynomial.Polynomial(N=N, coeff=coeff[i, j]), k[i]
+                    ),
+                )
+
     def test_polynomial_add(self):
         # p_0 = 1 + 2x + 3x^2 + 4x^3
         p_0 = polynomial.Polynomial(
@@ -85,6 +168,42 @@ class TestPolynomial(unittest.TestCase):
             polynomial.polynomial_subtract(p_0, p_1), p_diff
         )
 
+    def test_polynomial_add_into(self):
+        p_0 = polynomial.Polynomial(
+            N=4, coeff=np.array([1, 2, 3, 4], dtype=np.int32)
+        )
+        p_1 = polynomial.Polynomial(
+            N=4, coeff=np.array([0, 1, 0, 2], dtype=np.int32)
+        )
+        coeff = p_0.coeff
+
+        self.assertIs(polynomial.polynomial_add_into(p_0, p_1), p_0)
+        self.assertIs(p_0.coeff, coeff)
+        self.assertEqual(p_0.coeff.tolist(), [1, 3, 3, 6])
+
+        polynomial.polynomial_subtract_into(p_0, p_1)
+        polynomial.polynomial_subtract_into(p_0, p_1)
+        self.assertEqual(p_0.coeff.tolist(), [1, 1, 3, 2])
+
+    def test_polynomial_mac(self):
+        N = 1024
+        p_0, p_1, acc = (
+            polynomial.Polynomial(
+                N=N,
+                coeff=np.random.randint(
+                    -(2**31), 2**31, size=N, dtype=np.int32
+                ),
+            )
+            for _ in range(3)
+        )
+        expected = polynomial.polynomial_add(
+            acc, polynomial.polynomial_multiply(p_0, p_1)
+        )
+
+        self.assertIs(polynomial.polynomial_mac(acc, p_0, p_1), acc)
+        self.assertEqual(acc.coeff.dtype, np.int32)
+        self.assert_polynomial_equals(acc, expected)
+
     def test_zero_polynomial(self):
         p_0 = polynomial.Polynomial(
             N=4, coeff=np.array([0, 0, 0, 0], dtype=np.int32)
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from tfhe import (
+    bootstrap,
+    config,
+    gsw,
+    lwe,
+    nand,
+    polynomial,
+    profiling,
+    rlwe,
+)
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_by_default(self):
+        coeff = np.random.randint(-(2**31), 2**31, size=(3, 16), dtype=np.int32)
+        polynomial.negacyclic_multiply(coeff, coeff)
+
+        self.assertFalse(profiling.is_enabled())
+        self.assertEqual(profiling.counters(), {})
+        self.assertEqual(profiling.summary(), {})
+
+    def test_counters(self):
+        coeff = np.random.randint(-(2**31), 2**31, size=(3, 16), dtype=np.int32)
+        with profiling.profile():
+            polynomial.negacyclic_multiply(coeff, coeff[0])
+        counters = profiling.counters()
+
+        self.assertFalse(profiling.is_enabled())
+        self.assertEqual(counters["polynomial_multiply"], 3)
+        # Both arguments are split into two halves and transformed.
+        self.assertEqual(counters["fft"], 8)
+        self.assertEqual(counters["ifft"], 6)
+        self.assertGreater(counters["allocated_bytes"], 0)
+        self.assertEqual(
+            profiling.allocation_summary(),
+            {
+                "allocations": counters["allocations"],
+                "allocated_bytes": counters["allocated_bytes"],
+            },
+        )
+
+    def test_polynomial_mac_counter(self):
+        p = polynomial.Polynomial(
+            N=16,
+            coeff=np.random.randint(-(2**31), 2**31, size=16, dtype=np.int32),
+        )
+        acc = polynomial.Polynomial(N=16, coeff=np.zeros(16, dtype=np.int32))
+        with profiling.profile():
+            polynomial.polynomial_mac(acc, p, p)
+
+        self.assertEqual(profiling.counters()["polynomial_multiply"], 1)
+
+    def test_nand_trace(self):
+        lwe_config = lwe.LweConfig(dimension=8, noise_std=2 ** (-24))
+        lwe_key = lwe.generate_lwe_key(lwe_config)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(
+            rlwe.generate_rlwe_key(config.RLWE_CONFIG), config.GSW_CONFIG
+        )
+        bootstrap_key = bootstrap.generate_bootstrap_key(lwe_key, gsw_key)
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode_bool(True), lwe_key)
+
+        with profiling.profile():
+            nand.lwe_nand(ciphertext, ciphertext, bootstrap_key)
+        summary = profiling.summary()
+
+        self.assertEqual(summary["lwe_nand"]["count"], 1)
+        self.assertEqual(summary["bootstrap"]["count"], 1)
+        self.assertEqual(summary["blind_rotate"]["count"], 1)
+        self.assertEqual(summary["extract_sample"]["count"], 1)
+        for name in ["monomial_rotate", "decompose", "external_product"]:
+            self.assertEqual(summary[name]["count"], lwe_config.dimension)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            profiling.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+
+        events = trace["traceEvents"]
+        self.assertEqual(len(events), sum(s["count"] for s in summary.values()))
+        (nand_event,) = [e for e in events if e["name"] == "lwe_nand"]
+        for event in events:
+            self.assertEqual(event["ph"], "X")
+            self.assertGreaterEqual(event["ts"], nand_event["ts"])
+            self.assertLessEqual(
+                event["ts"] + event["dur"],
+                nand_event["ts"] + nand_event["dur"] + 1e-3,
+            )
+        self.assertIn("polynomial_multiply", trace["otherData"]["counters"])
+
+
+if __name__ == "__main__":
+    unittest.main()
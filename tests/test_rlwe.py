@@ -110,6 +110,45 @@ class TestRlwe(unittest.TestCase):
             rlwe.rlwe_decode(rlwe.rlwe_decrypt(ciphertext, key)), p
         )
 
+    def test_encrypt_batch(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        N = config.RLWE_CONFIG.degree
+        polynomials = [
+            polynomial.Polynomial(
+                N=N, coeff=np.random.randint(-4, 4, size=N, dtype=np.int32)
+            )
+            for _ in range(3)
+        ]
+
+        ciphertexts = rlwe.rlwe_encrypt_batch(
+            [rlwe.rlwe_encode(p, config.RLWE_CONFIG) for p in polynomials], key
+        )
+
+        self.assertEqual(len(ciphertexts), 3)
+        for ciphertext, p in zip(ciphertexts, polynomials):
+            self.assertEqual(ciphertext.data.shape, (2, N))
+            self.assert_polynomial_equal(
+                rlwe.rlwe_decode(rlwe.rlwe_decrypt(ciphertext, key)), p
+            )
+
+    def test_encrypt_seeded(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        p = polynomial.build_monomial(c=3, i=5, N=config.RLWE_CONFIG.degree)
+
+        ciphertext = rlwe.rlwe_encrypt_seeded(
+            rlwe.rlwe_encode(p, config.RLWE_CONFIG), key
+        )
+
+        # The mask is expanded from the seed each time it is read.
+        self.assert_polynomial_equal(ciphertext.a, ciphertext.a)
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(ciphertext, key)), p
+        )
+        compact = rlwe.convert_rlwe_to_compact(ciphertext)
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(compact, key)), p
+        )
+
     def test_add(self):
         key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
 
@@ -148,6 +187,52 @@ class TestRlwe(unittest.TestCase):
             polynomial.polynomial_subtract(p_0, p_1),
         )
 
+    def test_add_inplace(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+
+        p_0 = polynomial.build_monomial(c=1, i=0, N=config.RLWE_CONFIG.degree)
+        p_1 = polynomial.build_monomial(c=2, i=1, N=config.RLWE_CONFIG.degree)
+
+        ciphertext_1 = rlwe.rlwe_encrypt(rlwe.rlwe_encode(p_1, config), key)
+        for convert in [lambda c: c, rlwe.convert_rlwe_to_compact]:
+            accumulator = convert(
+                rlwe.rlwe_encrypt(rlwe.rlwe_encode(p_0, config), key)
+            )
+
+            self.assertIs(
+                rlwe.rlwe_add_inplace(accumulator, convert(ciphertext_1)),
+                accumulator,
+            )
+            rlwe.rlwe_add_inplace(accumulator, ciphertext_1)
+            rlwe.rlwe_subtract_inplace(accumulator, convert(ciphertext_1))
+
+            self.assert_polynomial_equal(
+                rlwe.rlwe_decode(rlwe.rlwe_decrypt(accumulator, key)),
+                polynomial.polynomial_add(p_0, p_1),
+            )
+
+    def test_add_inplace_seeded(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+
+        p_0 = polynomial.build_monomial(c=1, i=0, N=config.RLWE_CONFIG.degree)
+        p_1 = polynomial.build_monomial(c=2, i=1, N=config.RLWE_CONFIG.degree)
+
+        seeded = rlwe.rlwe_encrypt_seeded(rlwe.rlwe_encode(p_0, config), key)
+        ciphertext = rlwe.rlwe_encrypt(rlwe.rlwe_encode(p_1, config), key)
+
+        with self.assertRaises(TypeError):
+            rlwe.rlwe_add_inplace(seeded, ciphertext)
+        with self.assertRaises(TypeError):
+            rlwe.rlwe_subtract_inplace(seeded, ciphertext)
+
+        accumulator = rlwe.rlwe_add_inplace(
+            rlwe.convert_rlwe_to_compact(seeded), ciphertext
+        )
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(accumulator, key)),
+            polynomial.polynomial_add(p_0, p_1),
+        )
+
     def test_plaintext_multiply(self):
         key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
 
@@ -199,6 +284,62 @@ class TestRlwe(unittest.TestCase):
             cm_decoded, polynomial.polynomial_multiply(c, m)
         )
 
+    def test_monomial_multiply(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        N = config.RLWE_CONFIG.degree
+
+        # m(x) = 2x^2
+        m = polynomial.build_monomial(2, 2, N=N)
+        m_ciphertext = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(m, config.RLWE_CONFIG), key
+        )
+
+        # x^(N-1) * 2x^2 = -2x
+        rotated_ciphertext = rlwe.rlwe_monomial_multiply(m_ciphertext, N - 1)
+
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(rotated_ciphertext, key)),
+            polynomial.build_monomial(-2, 1, N=N),
+        )
+
+    def test_compact_ciphertext(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        N = config.RLWE_CONFIG.degree
+
+        p_0 = polynomial.build_monomial(c=1, i=0, N=N)
+        p_1 = polynomial.build_monomial(c=2, i=1, N=N)
+
+        ciphertext_0 = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(p_0, config.RLWE_CONFIG), key
+        )
+        ciphertext_1 = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(p_1, config.RLWE_CONFIG), key
+        )
+
+        compact_0 = rlwe.convert_rlwe_to_compact(ciphertext_0)
+        compact_1 = rlwe.convert_rlwe_to_compact(ciphertext_1)
+
+        self.assertEqual(compact_0.data.shape, (2, N))
+        self.assert_polynomial_equal(compact_0.a, ciphertext_0.a)
+        self.assert_polynomial_equal(compact_0.b, ciphertext_0.b)
+
+        compact_sum = rlwe.rlwe_add(compact_0, compact_1)
+        compact_diff = rlwe.rlwe_subtract(compact_0, compact_1)
+
+        self.assertIsInstance(compact_sum, rlwe.CompactRlweCiphertext)
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(compact_sum, key)),
+            polynomial.polynomial_add(p_0, p_1),
+        )
+        self.assert_polynomial_equal(
+            rlwe.rlwe_decode(rlwe.rlwe_decrypt(compact_diff, key)),
+            polynomial.polynomial_subtract(p_0, p_1),
+        )
+
+        # The a and b attributes are views into the buffer.
+        compact_0.b = compact_1.b
+        self.assertTrue(np.all(compact_0.data[1] == ciphertext_1.b.coeff))
+
     def test_rlwe_trivial_ciphertext(self):
         key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
 
@@ -0,0 +1,188 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from tfhe import bootstrap, config, gsw, lwe, polynomial, rlwe, serialization
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "data.tfhe")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lwe(self):
+        key = lwe.generate_lwe_key(config.LWE_CONFIG)
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(3), key)
+
+        serialization.save(self.path, key)
+        loaded_key = serialization.load(self.path)
+        serialization.save(self.path, ciphertext)
+        loaded_ciphertext = serialization.load(self.path)
+
+        self.assertEqual(loaded_key.config, key.config)
+        self.assertTrue(np.all(loaded_key.key == key.key))
+        self.assertEqual(
+            lwe.lwe_decode(lwe.lwe_decrypt(loaded_ciphertext, loaded_key)), 3
+        )
+
+    def test_rlwe(self):
+        key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        f = polynomial.build_monomial(c=2, i=1, N=config.RLWE_CONFIG.degree)
+        ciphertext = rlwe.rlwe_encrypt(
+            rlwe.rlwe_encode(f, config.RLWE_CONFIG), key
+        )
+
+        serialization.save(self.path, key)
+        loaded_key = serialization.load(self.path)
+        serialization.save(self.path, ciphertext)
+        loaded_ciphertext = serialization.load(self.path, mmap_mode="r")
+
+        self.assertEqual(loaded_key.config, key.config)
+        self.assertTrue(
+            np.all(
+                rlwe.rlwe_decode(
+                    rlwe.rlwe_decrypt(loaded_ciphertext, loaded_key)
+                ).coeff
+                == f.coeff
+            )
+        )
+
+    def test_gsw(self):
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        ciphertext = gsw.gsw_encrypt(
+            gsw.GswPlaintext(
+                config=config.GSW_CONFIG,
+                message=polynomial.build_monomial(1, 0, rlwe_key.config.degree),
+            ),
+            key,
+        )
+
+        serialization.save(self.path, key)
+        loaded_key = serialization.load(self.path)
+        serialization.save(self.path, ciphertext)
+        loaded_ciphertext = serialization.load(self.path)
+
+        self.assertEqual(loaded_key.config, config.GSW_CONFIG)
+        self.assertTrue(np.all(loaded_key.key.coeff == key.key.coeff))
+        self.assertTrue(
+            np.all(
+                loaded_ciphertext.data
+                == gsw.convert_gsw_to_compact(ciphertext).data
+            )
+        )
+
+    def test_bootstrap_key_memmap(self):
+        lwe_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+        serialization.save(self.path, bootstrap_key)
+        loaded_key = serialization.load(self.path, mmap_mode="r")
+
+        self.assertIsInstance(loaded_key, bootstrap.FourierBootstrapKey)
+        self.assertEqual(loaded_key.config, bootstrap_key.config)
+        self.assertEqual(
+            len(loaded_key.gsw_ciphertexts), len(bootstrap_key.gsw_ciphertexts)
+        )
+        self.assertIsInstance(
+            loaded_key.gsw_ciphertexts[0].data.base, np.memmap
+        )
+
+        ciphertext = lwe.lwe_encrypt(lwe.lwe_encode(-3), lwe_key)
+        bootstrap_ciphertext = bootstrap.bootstrap(
+            ciphertext, loaded_key, scale=lwe.lwe_encode(2).message
+        )
+        self.assertEqual(
+            lwe.lwe_decode(lwe.lwe_decrypt(bootstrap_ciphertext, lwe_key)), 2
+        )
+
+    def test_seeded(self):
+        lwe_key = lwe.generate_lwe_key(config.SMALL_LWE_CONFIG)
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        keys = [
+            bootstrap.generate_bootstrap_key(
+                lwe_key, gsw_key, seed=1, seeded=seeded
+            )
+            for seeded in [False, True]
+        ]
+        sizes = []
+        for key in keys:
+            serialization.save(self.path, key)
+            sizes.append(os.path.getsize(self.path))
+
+        # The seeded key is half the size and expands to an equivalent key.
+        self.assertLess(sizes[1], 0.51 * sizes[0])
+        loaded_key = serialization.load(self.path)
+        self.assertIsInstance(
+            loaded_key.gsw_ciphertexts[0], gsw.SeededGswCiphertext
+        )
+        ciphertext = lwe.lwe_encrypt_seeded(lwe.lwe_encode(-3), lwe_key)
+        serialization.save(self.path, ciphertext)
+        loaded_ciphertext = serialization.load(self.path)
+        self.assertIsInstance(loaded_ciphertext, lwe.SeededLweCiphertext)
+
+        bootstrap_ciphertext = bootstrap.bootstrap(
+            loaded_ciphertext,
+            bootstrap.convert_bootstrap_key_to_fourier(loaded_key),
+            scale=lwe.lwe_encode(2).message,
+        )
+        self.assertEqual(
+            lwe.lwe_decode(
+                lwe.lwe_decrypt(
+                    bootstrap_ciphertext, rlwe.convert_rlwe_key_to_lwe(rlwe_key)
+                )
+            ),
+            2,
+        )
+
+    def test_unrolled(self):
+        lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=9, noise_std=2 ** (-24))
+        )
+        gsw_key = gsw.convert_rlwe_key_to_gsw(
+            rlwe.generate_rlwe_key(config.RLWE_CONFIG), config.GSW_CONFIG
+        )
+        bootstrap_key = bootstrap.generate_bootstrap_key(
+            lwe_key, gsw_key, seeded=True, unrolled=True
+        )
+
+        for key, type_name in [
+            (bootstrap_key, "UnrolledSeededBootstrapKey"),
+            (
+                bootstrap.convert_bootstrap_key_to_fourier(bootstrap_key),
+                "UnrolledFourierBootstrapKey",
+            ),
+        ]:
+            # Readers without unrolled keys must not load them as normal keys.
+            self.assertEqual(serialization.to_arrays(key)[0], type_name)
+            serialization.save(self.path, key)
+            loaded_key = serialization.load(self.path)
+
+            self.assertIsInstance(loaded_key, type(key))
+            self.assertTrue(loaded_key.unrolled)
+            self.assertEqual(
+                len(loaded_key.gsw_ciphertexts), len(key.gsw_ciphertexts)
+            )
+
+    def test_bad_magic(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\x00" * 64)
+
+        with self.assertRaises(ValueError):
+            serialization.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from tfhe import utils
 
 
@@ -19,6 +21,21 @@ class TestUtils(unittest.TestCase):
         self.assertFalse(utils.decode_bool(utils.encode(0)))
         self.assertTrue(utils.decode_bool(utils.encode(2)))
 
+    def test_encode_decode_bool_array(self):
+        bits = np.array([[False, True], [True, True]])
+        encoded = utils.encode_bool_array(bits)
+
+        self.assertEqual(encoded.dtype, np.int32)
+        self.assertEqual(
+            encoded.tolist(),
+            [[utils.encode_bool(b) for b in row] for row in bits.tolist()],
+        )
+        self.assertTrue(np.array_equal(utils.decode_bool_array(encoded), bits))
+        self.assertEqual(
+            utils.decode_array(np.array([2**31 - 1, utils.encode(3)])).tolist(),
+            [-4, 3],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from tfhe import bootstrap, circuit, config, gsw, lwe, rlwe, worker_pool
+from tfhe.circuit import Op
+
+
+class TestWorkerPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lwe_key = lwe.generate_lwe_key(
+            lwe.LweConfig(dimension=32, noise_std=2 ** (-24))
+        )
+        rlwe_key = rlwe.generate_rlwe_key(config.RLWE_CONFIG)
+        gsw_key = gsw.convert_rlwe_key_to_gsw(rlwe_key, config.GSW_CONFIG)
+        cls.bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+            bootstrap.generate_bootstrap_key(
+                cls.lwe_key, gsw_key, keyswitch_config=config.KEYSWITCH_CONFIG
+            )
+        )
+
+    def test_shared_bootstrap_key(self):
+        with worker_pool.SharedBootstrapKey(self.bootstrap_key) as shared_key:
+            block, key = worker_pool.attach_key(shared_key.handle)
+
+            self.assertTrue(
+                np.array_equal(
+                    [c.data for c in key.gsw_ciphertexts],
+                    [c.data for c in self.bootstrap_key.gsw_ciphertexts],
+                )
+            )
+            self.assertTrue(
+                np.array_equal(
+                    key.keyswitch_key.a, self.bootstrap_key.keyswitch_key.a
+                )
+            )
+
+            del key
+            block.close()
+
+    def test_worker_pool_backend(self):
+        messages = [True, False, True, True, False]
+        ciphertexts = [
+            lwe.lwe_encrypt(lwe.lwe_encode_bool(m), self.lwe_key)
+            for m in messages
+        ]
+        batch_backend = circuit.BatchBootstrapBackend(self.bootstrap_key)
+
+        with worker_pool.WorkerPoolBackend(
+            self.bootstrap_key, num_workers=2
+        ) as backend:
+            outputs = backend(ciphertexts)
+
+            # The workers compute the same bootstraps as a single batch.
+            for c, expected in zip(outputs, batch_backend(ciphertexts)):
+                self.assertEqual(c.config, expected.config)
+                self.assertTrue(np.array_equal(c.a, expected.a))
+                self.assertEqual(c.b, expected.b)
+
+            builder = circuit.CircuitBuilder(num_inputs=2)
+            c = builder.build(
+                [
+                    builder.add_gate(Op.XOR, 0, 1),
+                    builder.add_gate(Op.AND, 0, 1),
+                    builder.add_gate(Op.NOR, 0, 1),
+                ]
+            )
+            output_ciphertexts = circuit.evaluate_circuit(
+                c, ciphertexts[2:4], backend
+            )
+
+        self.assertEqual(
+            [
+                lwe.lwe_decode_bool(lwe.lwe_decrypt(c, self.lwe_key))
+                for c in output_ciphertexts
+            ],
+            [False, True, False],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,16 @@
+import concurrent.futures
 import dataclasses
-from collections.abc import Sequence
+import itertools
+from collections.abc import Callable, Sequence
+from typing import Optional, Union
 
 import numpy as np
 
-from tfhe import gsw, lwe, polynomial, rlwe
+from tfhe import gsw, keyswitch, lwe, polynomial, profiling, rlwe, utils
+
+# A function on the messages in [0, 4), either as a callable or as the
+# sequence of its 4 values. The values are integers in [-4, 4).
+LookupTable = Union[Callable[[int], int], Sequence[int]]
 
 
 @dataclasses.dataclass
@@ -11,33 +18,234 @@ class BootstrapKey:
     config: gsw.GswConfig
     gsw_ciphertexts: Sequence[gsw.GswCiphertext]
 
+    # If set, bootstrapped ciphertexts are switched back to the LWE key.
+    keyswitch_key: Optional[keyswitch.KeySwitchKey] = None
+
+    # If True, the GSW ciphertexts encrypt the products of pairs of key bits
+    # returned by _unrolled_key_bits.
+    unrolled: bool = False
+
+
+def _unrolled_key_bits(key: np.ndarray) -> np.ndarray:
+    """Return the values encrypted by an unrolled bootstrap key.
+
+    The key bits are paired as (s_0, s_1), (s_2, s_3), ... and an odd key is
+    padded with a 0 bit. Each pair (s_i, s_j) is replaced by the three values
+    s_i * s_j, s_i * (1 - s_j) and (1 - s_i) * s_j. At most one of them is 1,
+    which selects the rotation by X^-(a_i + a_j), X^-a_i or X^-a_j.
+    """
+    pairs = np.zeros(2 * (-(-len(key) // 2)), dtype=np.int32)
+    pairs[: len(key)] = key
+    s_i, s_j = pairs[0::2], pairs[1::2]
+    return np.stack([s_i * s_j, s_i * (1 - s_j), (1 - s_i) * s_j], axis=-1)
+
+
+def _encrypt_key_bit(
+    b: np.int32,
+    gsw_key: gsw.GswEncryptionKey,
+    seed_sequence: Optional[np.random.SeedSequence] = None,
+    seeded: bool = False,
+) -> gsw.GswCiphertext:
+    """GSW encrypt a bit of an LWE key.
+
+    If seed_sequence is not None then the randomness is drawn from a generator
+    seeded with it. If seeded is True then the output is a
+    gsw.SeededGswCiphertext.
+    """
+    rng = None
+    if seed_sequence is not None:
+        rng = np.random.default_rng(seed_sequence)
+
+    b_plaintext = rlwe.build_monomial_rlwe_plaintext(
+        b, 0, gsw_key.config.rlwe_config
+    )
+    encrypt = gsw.gsw_encrypt_seeded if seeded else gsw.gsw_encrypt_compact
+    return encrypt(b_plaintext, gsw_key, rng=rng)
+
 
 def generate_bootstrap_key(
-    lwe_key: lwe.LweEncryptionKey, gsw_key: gsw.GswEncryptionKey
+    lwe_key: lwe.LweEncryptionKey,
+    gsw_key: gsw.GswEncryptionKey,
+    keyswitch_config: Optional[keyswitch.KeySwitchConfig] = None,
+    seed: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    seeded: bool = False,
+    unrolled: bool = False,
 ) -> BootstrapKey:
-    bootstrap_key = BootstrapKey(config=gsw_key.config, gsw_ciphertexts=[])
+    """Generate a key for bootstrapping LWE ciphertexts encrypted with lwe_key.
 
-    for b in lwe_key.key:
-        b_plaintext = rlwe.build_monomial_rlwe_plaintext(
-            b, 0, gsw_key.config.rlwe_config
-        )
-        bootstrap_key.gsw_ciphertexts.append(
-            gsw.gsw_encrypt(b_plaintext, gsw_key)
+    Bootstrapping outputs LWE ciphertexts of dimension N encrypted with the
+    coefficients of gsw_key. If keyswitch_config is provided then the key
+    also contains a key switching key from gsw_key back to lwe_key. This
+    allows the LWE dimension to be smaller than N.
+
+    By default the randomness is drawn from the global numpy RNG. If seed or
+    num_workers is provided then each key bit is encrypted with its own
+    np.random.Generator spawned from np.random.SeedSequence(seed). If
+    num_workers is provided, the key bits are encrypted in parallel by a pool
+    of num_workers processes. For a fixed seed, the output does not depend on
+    num_workers.
+
+    If seeded is True then the GSW ciphertexts are gsw.SeededGswCiphertext,
+    which halves the size of the key when it is saved. The seeds are expanded
+    by convert_bootstrap_key_to_fourier.
+
+    If unrolled is True then the key encrypts three products of each pair of
+    key bits, so that the blind rotation handles two mask coefficients per
+    step. This halves the number of sequential steps at the cost of a key
+    that is 1.5 times larger and of 1.5 times as many external products. An
+    unrolled key must be converted with convert_bootstrap_key_to_fourier
+    before it is used.
+    """
+    key_bits = lwe_key.key
+    if unrolled:
+        key_bits = _unrolled_key_bits(key_bits).reshape(-1)
+    seed_sequences = [None] * (len(key_bits) + 1)
+    if seed is not None or num_workers is not None:
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(key_bits) + 1)
+
+    bootstrap_key = BootstrapKey(
+        config=gsw_key.config, gsw_ciphertexts=[], unrolled=unrolled
+    )
+
+    if keyswitch_config is not None:
+        keyswitch_rng = None
+        if seed_sequences[-1] is not None:
+            keyswitch_rng = np.random.default_rng(seed_sequences[-1])
+
+        bootstrap_key.keyswitch_key = keyswitch.generate_keyswitch_key(
+            input_key=rlwe.convert_rlwe_key_to_lwe(
+                gsw.convert_gws_key_to_rlwe(gsw_key)
+            ),
+            output_key=lwe_key,
+            config=keyswitch_config,
+            rng=keyswitch_rng,
         )
 
+    bit_seed_sequences = seed_sequences[:-1]
+    if num_workers is None:
+        bootstrap_key.gsw_ciphertexts = [
+            _encrypt_key_bit(b, gsw_key, s, seeded)
+            for b, s in zip(key_bits, bit_seed_sequences)
+        ]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(num_workers) as executor:
+            bootstrap_key.gsw_ciphertexts = list(
+                executor.map(
+                    _encrypt_key_bit,
+                    key_bits,
+                    itertools.repeat(gsw_key),
+                    bit_seed_sequences,
+                    itertools.repeat(seeded),
+                    chunksize=max(1, len(key_bits) // (4 * num_workers)),
+                )
+            )
+
     return bootstrap_key
 
 
+@dataclasses.dataclass
+class FourierBootstrapKey:
+    """A bootstrap key with GSW ciphertexts stored in the Fourier domain.
+
+    If the key is unrolled then each Fourier GSW ciphertext holds the rows of
+    the three ciphertexts of a pair of key bits, stacked along the row axis.
+    The sum of their three external products is then a single product of the
+    stacked rows with the digits of the three rotations.
+    """
+
+    config: gsw.GswConfig
+    gsw_ciphertexts: Sequence[gsw.FourierGswCiphertext]
+    keyswitch_key: Optional[keyswitch.KeySwitchKey] = None
+    unrolled: bool = False
+
+
+def convert_bootstrap_key_to_fourier(
+    bootstrap_key: BootstrapKey,
+) -> FourierBootstrapKey:
+    gsw_ciphertexts = [
+        gsw.convert_gsw_to_fourier(c) for c in bootstrap_key.gsw_ciphertexts
+    ]
+    if bootstrap_key.unrolled:
+        gsw_ciphertexts = [
+            gsw.FourierGswCiphertext(
+                config=bootstrap_key.config,
+                data=np.concatenate(
+                    [c.data for c in gsw_ciphertexts[i : i + 3]], axis=1
+                ),
+            )
+            for i in range(0, len(gsw_ciphertexts), 3)
+        ]
+
+    return FourierBootstrapKey(
+        config=bootstrap_key.config,
+        gsw_ciphertexts=gsw_ciphertexts,
+        keyswitch_key=bootstrap_key.keyswitch_key,
+        unrolled=bootstrap_key.unrolled,
+    )
+
+
+def _unrolled_rotations(scaled_lwe_a: np.ndarray) -> np.ndarray:
+    """Return the exponents of the rotations of an unrolled blind rotation.
+
+    scaled_lwe_a has shape (..., n). The output has shape (..., ceil(n/2), 3)
+    and holds -(a_i + a_j), -a_i and -a_j for each pair of mask coefficients,
+    in the order of the values of _unrolled_key_bits.
+    """
+    *batch_shape, n = scaled_lwe_a.shape
+    pairs = np.zeros((*batch_shape, 2 * (-(-n // 2))), dtype=np.int64)
+    pairs[..., :n] = scaled_lwe_a
+    a_i, a_j = pairs[..., 0::2], pairs[..., 1::2]
+    return -np.stack([a_i + a_j, a_i, a_j], axis=-1)
+
+
+def _unrolled_cmux(
+    fourier_gsw_ciphertext: gsw.FourierGswCiphertext,
+    accumulator: np.ndarray,
+    rotations: np.ndarray,
+) -> np.ndarray:
+    """Apply one step of an unrolled blind rotation to the accumulators.
+
+    accumulator is an int32 array of shape (..., 2, N) and rotations has shape
+    (..., 3). The output is accumulator plus the external products of the
+    three GSW ciphertexts with the differences X^k * accumulator - accumulator
+    for the three rotations k.
+    """
+    config = fourier_gsw_ciphertext.config
+    with profiling.span("monomial_rotate"):
+        diff = np.subtract(
+            polynomial.negacyclic_rotate(
+                accumulator[..., None, :, :], rotations[..., None]
+            ),
+            accumulator[..., None, :, :],
+            dtype=np.int32,
+        )
+    with profiling.span("decompose"):
+        digits = gsw.gadget_decompose(diff, config.log_p, levels=config.levels)
+    with profiling.span("external_product"):
+        return np.add(
+            accumulator,
+            gsw.fourier_external_product(
+                digits.reshape(digits.shape[:-3] + (-1, digits.shape[-1])),
+                fourier_gsw_ciphertext.data,
+            ),
+            dtype=np.int32,
+        )
+
+
 def blind_rotate(
     lwe_ciphertext: lwe.LweCiphertext,
     rlwe_ciphertext: rlwe.RlweCiphertext,
-    bootstrap_key: BootstrapKey,
+    bootstrap_key: Union[BootstrapKey, FourierBootstrapKey],
 ) -> rlwe.RlweCiphertext:
     """Homomorphically evaluate the function: Rotate(i, f(x)) = x^i * f(x).
 
     Suppose lwe_ciphertext is an encryption of i and rlwe_ciphertext is an
     encryption of a polynomial f(x). Then the output will be an encryption
     of x^i * f(x).
+
+    An unrolled bootstrap key must be a FourierBootstrapKey, since its steps
+    multiply the stacked Fourier rows of three GSW ciphertexts.
     """
     N = rlwe_ciphertext.config.degree
 
@@ -46,29 +254,61 @@ def blind_rotate(
     scaled_lwe_b = np.int32(np.rint(lwe_ciphertext.b * (N * 2 ** (-31))))
 
     # Initialize the rotation by X^b
-    rotated_rlwe_ciphertext = rlwe.rlwe_plaintext_multiply(
-        rlwe.build_monomial_rlwe_plaintext(
-            1, scaled_lwe_b, rlwe_ciphertext.config
-        ),
-        rlwe_ciphertext,
+    rotated_rlwe_ciphertext = rlwe.rlwe_monomial_multiply(
+        rlwe.convert_rlwe_to_compact(rlwe_ciphertext), scaled_lwe_b
     )
 
+    if bootstrap_key.unrolled:
+        if not isinstance(bootstrap_key, FourierBootstrapKey):
+            raise TypeError(
+                "An unrolled blind rotation requires a FourierBootstrapKey. "
+                "Convert the key once with convert_bootstrap_key_to_fourier."
+            )
+
+        # Rotate by one of X^-(a_i + a_j), X^-a_i or X^-a_j unless
+        # s_i = s_j = 0.
+        for gsw_ciphertext, rotations in zip(
+            bootstrap_key.gsw_ciphertexts, _unrolled_rotations(scaled_lwe_a)
+        ):
+            rotated_rlwe_ciphertext = rlwe.CompactRlweCiphertext(
+                rotated_rlwe_ciphertext.config,
+                _unrolled_cmux(
+                    gsw_ciphertext, rotated_rlwe_ciphertext.data, rotations
+                ),
+            )
+        return rotated_rlwe_ciphertext
+
     # Rotate by X^-a_i if s_i = 1
     for i, a_i in enumerate(scaled_lwe_a):
+        with profiling.span("monomial_rotate"):
+            rotated_i = rlwe.rlwe_monomial_multiply(
+                rotated_rlwe_ciphertext, -a_i
+            )
         rotated_rlwe_ciphertext = gsw.cmux(
-            bootstrap_key.gsw_ciphertexts[i],
-            rotated_rlwe_ciphertext,
-            rlwe.rlwe_plaintext_multiply(
-                rlwe.build_monomial_rlwe_plaintext(
-                    1, -a_i, rlwe_ciphertext.config
-                ),
-                rotated_rlwe_ciphertext,
-            ),
+            bootstrap_key.gsw_ciphertexts[i], rotated_rlwe_ciphertext, rotated_i
         )
 
     return rotated_rlwe_ciphertext
 
 
+def estimate_blind_rotate_noise(
+    config: gsw.GswConfig, lwe_dimension: int, unrolled: bool = False
+) -> float:
+    """Estimate the std of the noise of a blind rotation.
+
+    The blind rotation is lwe_dimension CMuxes that each add the noise of one
+    external product, as estimated by gsw.estimate_external_product_noise.
+    An unrolled blind rotation computes three external products for each pair
+    of mask coefficients. Like the noise_std of the configs, the std is a
+    fraction of 2^31. Bootstrapping is reliable while it is well below 1/8,
+    which is half the distance between the encodings of two messages.
+    """
+    num_products = 3 * (-(-lwe_dimension // 2)) if unrolled else lwe_dimension
+    return float(
+        np.sqrt(num_products) * gsw.estimate_external_product_noise(config)
+    )
+
+
 def extract_sample(
     i: int, rlwe_ciphertext: rlwe.RlweCiphertext
 ) -> lwe.LweCiphertext:
@@ -92,7 +332,7 @@ def extract_sample(
     return lwe.LweCiphertext(lwe_config, a, b)
 
 
-def _build_test_polynomial(N: int) -> polynomial.Polynomial:
+def build_test_polynomial(N: int) -> polynomial.Polynomial:
     p = polynomial.Polynomial(N=N, coeff=np.ones(N, dtype=np.int32))
     p.coeff[: N // 2] = -1
     return p
@@ -100,7 +340,7 @@ def _build_test_polynomial(N: int) -> polynomial.Polynomial:
 
 def bootstrap(
     lwe_ciphertext: lwe.LweCiphertext,
-    bootstrap_key: BootstrapKey,
+    bootstrap_key: Union[BootstrapKey, FourierBootstrapKey],
     scale: np.int32,
 ) -> lwe.LweCiphertext:
     """Bootstrap the LWE ciphertext.
@@ -109,24 +349,279 @@ def bootstrap(
     If -2^30 < i <= 2^30 then return an LWE encryption of the scale argument.
     Otherwise return an LWE encryption of 0. In both cases the ciphertext noise
     will be bounded and independent of the lwe_ciphertext noise.
+
+    If the bootstrap key has a key switching key then the output is switched
+    back to the key of lwe_ciphertext.
     """
     N = bootstrap_key.config.rlwe_config.degree
-    test_polynomial = polynomial.polynomial_constant_multiply(
-        scale // 2, _build_test_polynomial(N)
-    )
-    test_rlwe_ciphertext = rlwe.rlwe_trivial_ciphertext(
-        test_polynomial, bootstrap_key.config.rlwe_config
+    with profiling.span("bootstrap", n=len(lwe_ciphertext.a), N=N):
+        with profiling.span("test_polynomial"):
+            test_polynomial = polynomial.polynomial_constant_multiply(
+                scale // 2, build_test_polynomial(N)
+            )
+            test_rlwe_ciphertext = rlwe.rlwe_trivial_ciphertext(
+                test_polynomial, bootstrap_key.config.rlwe_config
+            )
+
+        with profiling.span("blind_rotate"):
+            rotated_rlwe_ciphertext = blind_rotate(
+                lwe_ciphertext, test_rlwe_ciphertext, bootstrap_key
+            )
+
+        with profiling.span("extract_sample"):
+            sample_lwe_ciphertext = extract_sample(0, rotated_rlwe_ciphertext)
+
+            offset_lwe_ciphertext = lwe.lwe_trivial_ciphertext(
+                plaintext=lwe.LwePlaintext(scale // 2),
+                config=sample_lwe_ciphertext.config,
+            )
+
+            output_lwe_ciphertext = lwe.lwe_add_inplace(
+                sample_lwe_ciphertext, offset_lwe_ciphertext
+            )
+
+        if bootstrap_key.keyswitch_key is not None:
+            with profiling.span("keyswitch"):
+                output_lwe_ciphertext = keyswitch.keyswitch(
+                    output_lwe_ciphertext, bootstrap_key.keyswitch_key
+                )
+
+    return output_lwe_ciphertext
+
+
+def _lookup_table_values(lookup_table: LookupTable) -> np.ndarray:
+    """Return the encoded values of a lookup table on the messages [0, 4)."""
+    if callable(lookup_table):
+        values = [lookup_table(m) for m in range(4)]
+    else:
+        values = list(lookup_table)
+
+    if len(values) != 4:
+        raise ValueError(
+            f"A lookup table must have 4 values but got {len(values)}."
+        )
+
+    return np.array([utils.encode(v) for v in values], dtype=np.int32)
+
+
+def build_multi_lookup_table_polynomial(
+    lookup_tables: Sequence[LookupTable], N: int
+) -> polynomial.Polynomial:
+    """Build a test polynomial that evaluates k lookup tables at once.
+
+    The message m is rotated to the phase m * N/4. Each message window is
+    split into k sub-windows of size S = N // 4k, and the phase is shifted
+    by (k-1) * S + S/2 so that a message sits in the middle of a sub-window.
+    The constant coefficient of x^u * T(x) is T_0 for u = 0 and -T_(N-u) for
+    0 < u < N. Coefficient j*S of the rotated polynomial therefore reads
+    sub-window k-1-j, which holds the values of lookup table j.
+    """
+    k = len(lookup_tables)
+    S = N // (4 * k)
+    if S == 0:
+        raise ValueError(
+            f"Cannot pack {k} lookup tables into a polynomial of degree {N}."
+        )
+
+    values = [_lookup_table_values(t) for t in lookup_tables]
+
+    window_values = np.zeros(N, dtype=np.int32)
+    for m in range(4):
+        for j in range(k):
+            start = m * (N // 4) + (k - 1 - j) * S
+            window_values[start : start + S] = values[j][m]
+
+    coeff = np.empty(N, dtype=np.int32)
+    coeff[0] = window_values[0]
+    coeff[1:] = -window_values[:0:-1]
+
+    return polynomial.monomial_multiply(
+        polynomial.Polynomial(N=N, coeff=coeff), (k - 1) * S + S // 2
     )
 
-    rotated_rlwe_ciphertext = blind_rotate(
-        lwe_ciphertext, test_rlwe_ciphertext, bootstrap_key
+
+def build_lookup_table_polynomial(
+    lookup_table: LookupTable, N: int
+) -> polynomial.Polynomial:
+    """Build the test polynomial of a programmable bootstrap.
+
+    Each message gets a window of N/4 coefficients. See
+    build_multi_lookup_table_polynomial.
+    """
+    return build_multi_lookup_table_polynomial([lookup_table], N)
+
+
+def multi_output_bootstrap(
+    lwe_ciphertext: lwe.LweCiphertext,
+    bootstrap_key: Union[BootstrapKey, FourierBootstrapKey],
+    lookup_tables: Sequence[LookupTable],
+) -> Sequence[lwe.LweCiphertext]:
+    """Evaluate several lookup tables on a ciphertext with one blind rotation.
+
+    The output is a list with one ciphertext per lookup table, as described in
+    programmable_bootstrap. The tables share the test polynomial, so the
+    noise that the input may have without an error shrinks by a factor of
+    len(lookup_tables).
+    """
+    rlwe_config = bootstrap_key.config.rlwe_config
+    N = rlwe_config.degree
+    k = len(lookup_tables)
+    with profiling.span("programmable_bootstrap", num_outputs=k):
+        with profiling.span("test_polynomial"):
+            test_rlwe_ciphertext = rlwe.rlwe_trivial_ciphertext(
+                build_multi_lookup_table_polynomial(lookup_tables, N),
+                rlwe_config,
+            )
+
+        with profiling.span("blind_rotate"):
+            rotated_rlwe_ciphertext = blind_rotate(
+                lwe_ciphertext, test_rlwe_ciphertext, bootstrap_key
+            )
+
+        with profiling.span("extract_sample"):
+            S = N // (4 * k)
+            samples = [
+                extract_sample(j * S, rotated_rlwe_ciphertext) for j in range(k)
+            ]
+
+        if bootstrap_key.keyswitch_key is None:
+            return samples
+
+        # Switch all of the samples with a single matrix product.
+        with profiling.span("keyswitch"):
+            switched = keyswitch.keyswitch(
+                lwe.LweCiphertext(
+                    samples[0].config,
+                    np.stack([c.a for c in samples]),
+                    np.array([c.b for c in samples], dtype=np.int32),
+                ),
+                bootstrap_key.keyswitch_key,
+            )
+
+    return [
+        lwe.LweCiphertext(switched.config, a, b)
+        for a, b in zip(switched.a, switched.b)
+    ]
+
+
+def programmable_bootstrap(
+    lwe_ciphertext: lwe.LweCiphertext,
+    bootstrap_key: Union[BootstrapKey, FourierBootstrapKey],
+    lookup_table: LookupTable,
+) -> lwe.LweCiphertext:
+    """Bootstrap the LWE ciphertext while evaluating a lookup table.
+
+    Suppose that lwe_ciphertext is an encryption of encode(m) and g is the
+    function described by lookup_table. If 0 <= m < 4 then return an LWE
+    encryption of encode(g(m)). Since x^N = -1, if -4 <= m < 0 then the output
+    is an encryption of encode(-g(m + 4)).
+
+    If the bootstrap key has a key switching key then the output is switched
+    back to the key of lwe_ciphertext.
+    """
+    (output_lwe_ciphertext,) = multi_output_bootstrap(
+        lwe_ciphertext, bootstrap_key, [lookup_table]
     )
+    return output_lwe_ciphertext
+
+
+def bootstrap_batch(
+    lwe_ciphertexts: Sequence[lwe.LweCiphertext],
+    bootstrap_key: FourierBootstrapKey,
+    scale: np.int32,
+) -> Sequence[lwe.LweCiphertext]:
+    """Bootstrap a batch of LWE ciphertexts.
 
-    sample_lwe_ciphertext = extract_sample(0, rotated_rlwe_ciphertext)
+    The output is the same as calling bootstrap on each ciphertext. The B
+    accumulators are stacked into an array of shape (B, 2, N) so that each
+    step of the blind rotation is a single vectorized external product over
+    the whole batch.
 
-    offset_lwe_ciphertext = lwe.lwe_trivial_ciphertext(
-        plaintext=lwe.LwePlaintext(scale // 2),
-        config=sample_lwe_ciphertext.config,
+    The key must be a FourierBootstrapKey. Converting a BootstrapKey costs
+    more than bootstrapping a batch, so it is converted once by the caller.
+    """
+    if not isinstance(bootstrap_key, FourierBootstrapKey):
+        raise TypeError(
+            "bootstrap_batch requires a FourierBootstrapKey. Convert the key "
+            "once with convert_bootstrap_key_to_fourier."
+        )
+    if not lwe_ciphertexts:
+        return []
+
+    with profiling.span("bootstrap_batch", batch_size=len(lwe_ciphertexts)):
+        return _bootstrap_batch(lwe_ciphertexts, bootstrap_key, scale)
+
+
+def _bootstrap_batch(
+    lwe_ciphertexts: Sequence[lwe.LweCiphertext],
+    bootstrap_key: FourierBootstrapKey,
+    scale: np.int32,
+) -> Sequence[lwe.LweCiphertext]:
+    rlwe_config = bootstrap_key.config.rlwe_config
+    log_p = bootstrap_key.config.log_p
+    N = rlwe_config.degree
+    B = len(lwe_ciphertexts)
+
+    # scale the lwe ciphertexts by N / 2^31 so that the messages are between
+    # -N and N
+    batch = lwe.stack_lwe_ciphertexts(lwe_ciphertexts)
+    scaled_lwe_a = np.rint(batch.a * (N * 2 ** (-31))).astype(np.int64)
+    scaled_lwe_b = np.rint(batch.b * (N * 2 ** (-31))).astype(np.int64)
+
+    # Initialize the accumulators with trivial encryptions of the test
+    # polynomial rotated by X^b.
+    test_polynomial = polynomial.polynomial_constant_multiply(
+        scale // 2, build_test_polynomial(N)
+    )
+    accumulator = np.zeros((B, 2, N), dtype=np.int32)
+    accumulator[:, 1] = test_polynomial.coeff
+    accumulator = polynomial.negacyclic_rotate(
+        accumulator, scaled_lwe_b[:, None]
     )
 
-    return lwe.lwe_add(offset_lwe_ciphertext, sample_lwe_ciphertext)
+    if bootstrap_key.unrolled:
+        # Each step handles a pair of mask coefficients.
+        for gsw_ciphertext, rotations in zip(
+            bootstrap_key.gsw_ciphertexts,
+            np.moveaxis(_unrolled_rotations(scaled_lwe_a), 1, 0),
+        ):
+            accumulator = _unrolled_cmux(gsw_ciphertext, accumulator, rotations)
+    else:
+        # CMux between the accumulators and their rotations by X^-a_i.
+        for i, gsw_ciphertext in enumerate(bootstrap_key.gsw_ciphertexts):
+            with profiling.span("monomial_rotate"):
+                diff = np.subtract(
+                    polynomial.negacyclic_rotate(
+                        accumulator, -scaled_lwe_a[:, i, None]
+                    ),
+                    accumulator,
+                    dtype=np.int32,
+                )
+            with profiling.span("decompose"):
+                digits = gsw.gadget_decompose(
+                    diff, log_p, levels=bootstrap_key.config.levels
+                )
+            with profiling.span("external_product"):
+                accumulator = np.add(
+                    accumulator,
+                    gsw.fourier_external_product(digits, gsw_ciphertext.data),
+                    dtype=np.int32,
+                )
+
+    # Extract the constant coefficients and add the offset.
+    with profiling.span("extract_sample"):
+        sample_a = np.concatenate(
+            [accumulator[:, 0, :1], -accumulator[:, 0, :0:-1]], axis=-1
+        )
+        sample_b = np.add(accumulator[:, 1, 0], scale // 2, dtype=np.int32)
+
+    lwe_config = lwe.LweConfig(dimension=N, noise_std=rlwe_config.noise_std)
+    output_lwe_ciphertext = lwe.LweCiphertext(lwe_config, sample_a, sample_b)
+
+    if bootstrap_key.keyswitch_key is not None:
+        with profiling.span("keyswitch"):
+            output_lwe_ciphertext = keyswitch.keyswitch(
+                output_lwe_ciphertext, bootstrap_key.keyswitch_key
+            )
+
+    return lwe.unstack_lwe_ciphertexts(output_lwe_ciphertext)
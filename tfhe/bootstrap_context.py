@@ -0,0 +1,319 @@
+"""A reusable context for bootstrapping with preallocated buffers.
+
+bootstrap.bootstrap_batch allocates new arrays for every step of the blind
+rotation: the rotated accumulators, the digits, their transforms and the
+products. A BootstrapContext is bound to one bootstrap key and owns all of
+these buffers, sized for a maximum batch size. Each CMux of the blind
+rotation writes into the buffers with the out= arguments of numpy, so the
+blind rotation does not allocate any arrays. The test polynomials are cached
+per scale. numpy supports the out= argument of its FFTs since version 2.0, and
+with earlier versions each FFT of a step allocates its output.
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import numpy as np
+
+from tfhe import bootstrap, gsw, keyswitch, lwe, polynomial, profiling
+
+
+class BootstrapContext:
+    """Bootstrap batches of up to max_batch_size LWE ciphertexts.
+
+    The outputs are the same as those of bootstrap.bootstrap_batch. Larger
+    batches are bootstrapped in chunks of max_batch_size. A context is not
+    thread safe since the calls share its buffers.
+    """
+
+    def __init__(
+        self,
+        bootstrap_key: Union[
+            bootstrap.BootstrapKey, bootstrap.FourierBootstrapKey
+        ],
+        max_batch_size: int = 1,
+    ):
+        if isinstance(bootstrap_key, bootstrap.BootstrapKey):
+            bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+                bootstrap_key
+            )
+        self.bootstrap_key = bootstrap_key
+        self.max_batch_size = max_batch_size
+
+        config = bootstrap_key.config
+        rlwe_config = config.rlwe_config
+        N = rlwe_config.degree
+        B = max_batch_size
+        F = N // 2
+        level_rows = 2 * gsw.gsw_num_levels(config)
+        num_steps = len(bootstrap_key.gsw_ciphertexts)
+
+        # An unrolled step multiplies three rotations of the accumulators with
+        # the stacked rows of three GSW ciphertexts, for two mask coefficients.
+        self._num_rotations = 3 if bootstrap_key.unrolled else 1
+        num_rows = self._num_rotations * level_rows
+        n = 2 * num_steps if bootstrap_key.unrolled else num_steps
+
+        self._sample_config = lwe.LweConfig(
+            dimension=N, noise_std=rlwe_config.noise_std
+        )
+        self._test_polynomials = {}
+        self._twists = {}
+        self._fourier_data = [
+            c.data.reshape(F, num_rows, 4)
+            for c in bootstrap_key.gsw_ciphertexts
+        ]
+        self._log_p = config.log_p
+        self._digit_offset = gsw.digit_offset(config.log_p, level_rows // 2)
+        self._digit_shifts = [
+            np.uint32(shift)
+            for shift in gsw.gadget_shifts(config.log_p, config.levels)
+        ]
+
+        # The scaled LWE ciphertexts, as the shifts of the rotations of the
+        # blind rotation into _extended. The masks of an unrolled key with an
+        # odd LWE dimension are padded with a zero.
+        self._lwe_a = np.zeros((B, n), dtype=np.int32)
+        self._lwe_b = np.empty(B, dtype=np.int32)
+        self._scaling = np.empty((B, n), dtype=np.float64)
+        self._scaled_lwe_a = np.empty((B, n), dtype=np.int64)
+        self._shifts = np.empty(
+            (B, num_steps, self._num_rotations), dtype=np.int64
+        )
+        self._body_shifts = np.empty(B, dtype=np.int64)
+
+        # The accumulators and the buffers of a CMux step. _extended holds
+        # [c, -c, c] for each accumulator polynomial c, so that every
+        # rotation of c is a slice of it.
+        self._accumulator = np.empty((B, 2, N), dtype=np.int32)
+        self._rotated = np.empty((self._num_rotations, B, 2, N), dtype=np.int32)
+        self._negated = np.empty((B, 2, N), dtype=np.int32)
+        self._extended = np.empty((B, 2, 3 * N), dtype=np.int32)
+        self._digits = np.empty(
+            (self._num_rotations, B, level_rows, N), dtype=np.int32
+        )
+        self._product_sum = np.empty((B, 2, N), dtype=np.int32)
+
+        # The transforms have the frequency axis first, as in the Fourier GSW
+        # ciphertexts. They are flat so that the first b entries of the batch
+        # axis can be viewed as contiguous arrays.
+        self._folded = np.empty(F * B * num_rows, dtype=np.complex128)
+        self._digits_fft = np.empty(F * B * num_rows, dtype=np.complex128)
+        self._product_fft = np.empty(F * B * 4, dtype=np.complex128)
+        self._product_real = np.empty(F * B * 4, dtype=np.float64)
+        self._product = np.empty(F * B * 4, dtype=np.int64)
+
+        for array in vars(self).values():
+            if isinstance(array, np.ndarray):
+                profiling.count_allocation(array)
+
+    def test_polynomial(self, scale: np.int32) -> np.ndarray:
+        """Return the cached coefficients of the test polynomial for scale."""
+        scale = int(scale)
+        if scale not in self._test_polynomials:
+            N = self.bootstrap_key.config.rlwe_config.degree
+            self._test_polynomials[scale] = (
+                polynomial.polynomial_constant_multiply(
+                    scale // 2, bootstrap.build_test_polynomial(N)
+                ).coeff
+            )
+        return self._test_polynomials[scale]
+
+    def bootstrap(
+        self, lwe_ciphertext: lwe.LweCiphertext, scale: np.int32
+    ) -> lwe.LweCiphertext:
+        """Bootstrap one ciphertext as in bootstrap.bootstrap."""
+        return self.bootstrap_batch([lwe_ciphertext], scale)[0]
+
+    def bootstrap_batch(
+        self, lwe_ciphertexts: Sequence[lwe.LweCiphertext], scale: np.int32
+    ) -> list[lwe.LweCiphertext]:
+        """Bootstrap a batch of ciphertexts as in bootstrap.bootstrap_batch."""
+        outputs = []
+        for start in range(0, len(lwe_ciphertexts), self.max_batch_size):
+            chunk = lwe_ciphertexts[start : start + self.max_batch_size]
+            with profiling.span("bootstrap_batch", batch_size=len(chunk)):
+                outputs.extend(self._bootstrap_chunk(chunk, scale))
+        return outputs
+
+    def _twist(self, b: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return the negacyclic twists broadcast to a batch of size b.
+
+        numpy allocates buffers for ufuncs with broadcast operands, so the
+        twists are expanded to the full shapes of the transforms.
+        """
+        if b not in self._twists:
+            F, num_rows, _ = self._fourier_data[0].shape
+            twist = polynomial.negacyclic_twist(2 * F)[:, None, None]
+            self._twists[b] = (
+                np.broadcast_to(twist, (F, b, num_rows)).copy(),
+                np.broadcast_to(np.conj(twist), (F, b, 4)).copy(),
+            )
+            for array in self._twists[b]:
+                profiling.count_allocation(array)
+        return self._twists[b]
+
+    def _rotate(self, source: np.ndarray, shifts: np.ndarray, out: np.ndarray):
+        """Write the polynomials of source times x^-shifts into out.
+
+        source and out have shape (b, 2, N) and shifts has shape (b,) with
+        entries in [0, 2N).
+        """
+        b, _, N = source.shape
+        extended = self._extended[:b]
+        negated = self._negated[:b]
+
+        np.negative(source, out=negated)
+        np.copyto(extended[..., :N], source)
+        np.copyto(extended[..., N : 2 * N], negated)
+        np.copyto(extended[..., 2 * N :], source)
+
+        # Since x^N = -1, the j-th coefficient of x^-k * f(x) is coefficient
+        # j + k of [f, -f, f].
+        for j in range(b):
+            shift = shifts[j]
+            np.copyto(out[j], extended[j, :, shift : shift + N])
+
+    def _decompose(self, source: np.ndarray, digits: np.ndarray):
+        """Write gsw.gadget_decompose(source) into digits."""
+        b, _, N = source.shape
+        digits_uint32 = digits.view(np.uint32)
+        levels = digits.reshape(b, 2, -1, N).view(np.uint32)
+        offset_source = self._product_sum[:b].view(np.uint32)
+        shifted = self._negated[:b].view(np.uint32)
+
+        # These are the steps of gsw.gadget_decompose, with a loop over the
+        # levels in place of the broadcasts. numpy also allocates buffers for
+        # ufuncs with strided outputs, so the digits of each level are
+        # computed in a contiguous buffer and copied.
+        np.add(source.view(np.uint32), self._digit_offset, out=offset_source)
+        for i, shift in enumerate(self._digit_shifts):
+            np.right_shift(offset_source, shift, out=shifted)
+            np.copyto(levels[:, :, i], shifted)
+        np.bitwise_and(
+            digits_uint32, np.uint32(2**self._log_p - 1), out=digits_uint32
+        )
+        np.subtract(digits, np.int32(2 ** (self._log_p - 1)), out=digits)
+
+    def _external_product_add(
+        self, fourier_data: np.ndarray, accumulator: np.ndarray
+    ):
+        """Add the product of the digits and a GSW ciphertext to accumulator.
+
+        This is gsw.fourier_external_product written into the buffers.
+        """
+        b = len(accumulator)
+        F, num_rows, _ = fourier_data.shape
+        level_rows = self._digits.shape[2]
+        folded = self._folded[: F * b * num_rows].reshape(F, b, num_rows)
+        digits_fft = self._digits_fft[: F * b * num_rows].reshape(
+            F, b, num_rows
+        )
+        product_fft = self._product_fft[: F * b * 4].reshape(F, b, 4)
+        product_real = self._product_real[: F * b * 4].reshape(F, b, 4)
+        product = self._product[: F * b * 4].reshape(F, b, 4)
+        halves = product.reshape(F, b, 2, 2)
+        product_sum = self._product_sum[:b]
+        twist, conj_twist = self._twist(b)
+
+        # The FFT writes to a second buffer since an in place FFT along a
+        # contiguous axis copies its input.
+        for k, digits in enumerate(self._digits[:, :b]):
+            rows = folded[..., k * level_rows : (k + 1) * level_rows]
+            rows.real = digits[..., :F].transpose(2, 0, 1)
+            rows.imag = digits[..., F:].transpose(2, 0, 1)
+        np.multiply(folded, twist, out=folded)
+        polynomial.fft_into(folded, digits_fft, axis=0)
+
+        # Multiply the digits with the GSW rows one frequency at a time.
+        np.matmul(digits_fft, fourier_data, out=product_fft)
+
+        polynomial.ifft_into(product_fft, product_fft, axis=0)
+        np.multiply(product_fft, conj_twist, out=product_fft)
+
+        # The last axis holds the lo and hi halves of the a and b products.
+        # The hi halves are shifted by 16 bits and added to the lo halves.
+        for part, coefficients in [
+            (product_fft.real, product_sum[..., :F]),
+            (product_fft.imag, product_sum[..., F:]),
+        ]:
+            np.rint(part, out=product_real)
+            np.copyto(product, product_real, casting="unsafe")
+            np.left_shift(halves[..., 1], 16, out=halves[..., 1])
+            np.add(halves[..., 0], halves[..., 1], out=halves[..., 0])
+            np.copyto(
+                coefficients,
+                halves[..., 0].transpose(1, 2, 0),
+                casting="unsafe",
+            )
+        np.add(accumulator, product_sum, out=accumulator)
+
+    def _bootstrap_chunk(
+        self, lwe_ciphertexts: Sequence[lwe.LweCiphertext], scale: np.int32
+    ) -> list[lwe.LweCiphertext]:
+        N = self.bootstrap_key.config.rlwe_config.degree
+        b = len(lwe_ciphertexts)
+        accumulator = self._accumulator[:b]
+        rotated = self._rotated[:, :b]
+        digits = self._digits[:, :b]
+
+        # scale the lwe ciphertexts by N / 2^31 so that the messages are
+        # between -N and N. The rotations by X^b and X^-a_i are the shifts
+        # -b and a_i mod 2N.
+        lwe_a = self._lwe_a[:b]
+        lwe_b = self._lwe_b[:b]
+        for i, c in enumerate(lwe_ciphertexts):
+            lwe_a[i, : len(c.a)] = c.a
+            lwe_b[i] = c.b
+        scaling = self._scaling[:b]
+        scaled_lwe_a = self._scaled_lwe_a[:b]
+        shifts = self._shifts[:b]
+        body_shifts = self._body_shifts[:b]
+        np.multiply(lwe_a, N * 2 ** (-31), out=scaling)
+        np.rint(scaling, out=scaling)
+        np.copyto(scaled_lwe_a, scaling, casting="unsafe")
+        if self.bootstrap_key.unrolled:
+            # The rotations by X^-(a_i + a_j), X^-a_i and X^-a_j of each pair,
+            # as in an unrolled bootstrap.blind_rotate.
+            a_i, a_j = scaled_lwe_a[:, 0::2], scaled_lwe_a[:, 1::2]
+            np.add(a_i, a_j, out=shifts[..., 0])
+            np.copyto(shifts[..., 1], a_i)
+            np.copyto(shifts[..., 2], a_j)
+        else:
+            np.copyto(shifts[..., 0], scaled_lwe_a)
+        np.remainder(shifts, 2 * N, out=shifts)
+        np.multiply(lwe_b, -N * 2 ** (-31), out=scaling[:, 0])
+        np.rint(scaling[:, 0], out=scaling[:, 0])
+        np.copyto(body_shifts, scaling[:, 0], casting="unsafe")
+        np.remainder(body_shifts, 2 * N, out=body_shifts)
+
+        # Initialize the accumulators with trivial encryptions of the test
+        # polynomial rotated by X^b.
+        rotated[0, :, 0] = 0
+        rotated[0, :, 1] = self.test_polynomial(scale)
+        self._rotate(rotated[0], body_shifts, accumulator)
+
+        # CMux between the accumulators and their rotations by X^-a_i.
+        with profiling.span("blind_rotate"):
+            for i, fourier_data in enumerate(self._fourier_data):
+                for k in range(self._num_rotations):
+                    self._rotate(accumulator, shifts[:, i, k], rotated[k])
+                    np.subtract(rotated[k], accumulator, out=rotated[k])
+                    self._decompose(rotated[k], digits[k])
+                self._external_product_add(fourier_data, accumulator)
+
+        # Extract the constant coefficients and add the offset. These are the
+        # only arrays allocated per call, since they are returned.
+        sample_a = np.empty((b, N), dtype=np.int32)
+        sample_a[:, 0] = accumulator[:, 0, 0]
+        np.negative(accumulator[:, 0, :0:-1], out=sample_a[:, 1:])
+        sample_b = np.add(accumulator[:, 1, 0], scale // 2, dtype=np.int32)
+        output = lwe.LweCiphertext(self._sample_config, sample_a, sample_b)
+
+        if self.bootstrap_key.keyswitch_key is not None:
+            with profiling.span("keyswitch"):
+                output = keyswitch.keyswitch(
+                    output, self.bootstrap_key.keyswitch_key
+                )
+
+        return lwe.unstack_lwe_ciphertexts(output)
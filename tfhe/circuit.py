@@ -0,0 +1,376 @@
+"""Boolean circuits over LWE ciphertexts.
+
+A circuit is stored as flat arrays with integer wire ids rather than as one
+Python object per gate. Wires 0, ..., num_inputs-1 are the circuit inputs and
+gate g drives wire num_inputs + g. The gates are topologically ordered, i.e.
+the inputs of gate g are wires smaller than num_inputs + g.
+
+evaluate_circuit levelizes the circuit by bootstrap depth and bootstraps the
+gates of each level together with a batched backend.
+"""
+
+import array
+import collections
+import dataclasses
+import enum
+import itertools
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+from tfhe import bootstrap, gates, lwe, profiling
+
+# Bootstraps a batch of LWE ciphertexts to encodings of booleans as in
+# gates.lwe_gate.
+Backend = Callable[[Sequence[lwe.LweCiphertext]], Sequence[lwe.LweCiphertext]]
+
+
+class Op(enum.IntEnum):
+    AND = 0
+    NAND = 1
+    OR = 2
+    NOR = 3
+    XOR = 4
+    XNOR = 5
+    ANDNY = 6
+    ANDYN = 7
+    ORNY = 8
+    ORYN = 9
+    NOT = 10
+    MUX = 11  # MUX(select, true, false)
+    FALSE = 12
+    TRUE = 13
+
+
+TWO_INPUT_OPS = frozenset(Op(i) for i in range(Op.ORYN + 1))
+
+# The number of inputs and bootstraps of each op, indexed by Op.
+NUM_INPUTS = np.array([2] * len(TWO_INPUT_OPS) + [1, 3, 0, 0], dtype=np.int8)
+NUM_BOOTSTRAPS = np.array(
+    [1] * len(TWO_INPUT_OPS) + [0, 2, 0, 0], dtype=np.int8
+)
+
+_PLAINTEXT_FUNCTIONS = {
+    Op.AND: lambda x, y, z: x & y,
+    Op.NAND: lambda x, y, z: ~(x & y),
+    Op.OR: lambda x, y, z: x | y,
+    Op.NOR: lambda x, y, z: ~(x | y),
+    Op.XOR: lambda x, y, z: x ^ y,
+    Op.XNOR: lambda x, y, z: ~(x ^ y),
+    Op.ANDNY: lambda x, y, z: ~x & y,
+    Op.ANDYN: lambda x, y, z: x & ~y,
+    Op.ORNY: lambda x, y, z: ~x | y,
+    Op.ORYN: lambda x, y, z: x | ~y,
+    Op.NOT: lambda x, y, z: ~x,
+    Op.MUX: lambda x, y, z: np.where(x, y, z),
+}
+
+
+# The truth table of each op except FALSE and TRUE indexed by 4x + 2y + z.
+OP_TRUTH_TABLES = {
+    op: tuple(
+        bool(f(np.bool_(x), np.bool_(y), np.bool_(z)))
+        for x, y, z in itertools.product([False, True], repeat=3)
+    )
+    for op, f in _PLAINTEXT_FUNCTIONS.items()
+}
+
+# Maps a truth table (f(0,0), f(0,1), f(1,0), f(1,1)) to its two-input op.
+# These are all of the two-input functions that depend on both inputs.
+TWO_INPUT_OPS_BY_TRUTH_TABLE = {
+    tuple(
+        OP_TRUTH_TABLES[op][4 * x + 2 * y] for x in (0, 1) for y in (0, 1)
+    ): op
+    for op in TWO_INPUT_OPS
+}
+
+
+@dataclasses.dataclass
+class Circuit:
+    num_inputs: int
+    ops: np.ndarray  # A uint8 array of Op values with shape (num_gates,)
+
+    # An int32 array of shape (num_gates, 3). Unused inputs are -1.
+    gate_inputs: np.ndarray
+
+    outputs: np.ndarray  # An int32 array of output wires.
+
+    @property
+    def num_gates(self) -> int:
+        return len(self.ops)
+
+    @property
+    def num_wires(self) -> int:
+        return self.num_inputs + self.num_gates
+
+
+class CircuitBuilder:
+    """Incrementally build a Circuit.
+
+    The gates are stored in compact arrays so that large netlists can be
+    streamed into a circuit without creating an object per gate.
+    """
+
+    def __init__(self, num_inputs: int):
+        self.num_inputs = num_inputs
+        self._ops = array.array("B")
+        self._gate_inputs = array.array("i")
+
+    @property
+    def num_wires(self) -> int:
+        return self.num_inputs + len(self._ops)
+
+    def add_gate(self, op: Op, *inputs: int) -> int:
+        """Add a gate and return the id of its output wire."""
+        if len(inputs) != NUM_INPUTS[op]:
+            raise ValueError(
+                f"{Op(op).name} takes {NUM_INPUTS[op]} inputs but got "
+                f"{len(inputs)}."
+            )
+        num_wires = self.num_wires
+        for wire in inputs:
+            if not 0 <= wire < num_wires:
+                raise ValueError(f"Wire {wire} is not defined.")
+
+        self._ops.append(op)
+        self._gate_inputs.extend(inputs)
+        self._gate_inputs.extend([-1] * (3 - len(inputs)))
+        return num_wires
+
+    def add_gates(self, ops: np.ndarray, gate_inputs: np.ndarray) -> np.ndarray:
+        """Add an array of gates and return the ids of their output wires.
+
+        gate_inputs has shape (len(ops), 3) and unused inputs are -1. The
+        gates are validated together, which is much faster than add_gate.
+        """
+        ops = np.asarray(ops, dtype=np.uint8)
+        gate_inputs = np.asarray(gate_inputs, dtype=np.int32).reshape(-1, 3)
+        wires = self.num_wires + np.arange(len(ops), dtype=np.int32)
+
+        if np.any(ops > max(Op)):
+            raise ValueError("Unknown op.")
+        used = np.arange(3) < NUM_INPUTS[ops][:, None]
+        defined = (gate_inputs >= 0) & (gate_inputs < wires[:, None])
+        if np.any(used & ~defined) or np.any(~used & (gate_inputs != -1)):
+            raise ValueError("The gate inputs must be defined wires.")
+
+        self._ops.frombytes(ops.tobytes())
+        self._gate_inputs.frombytes(gate_inputs.tobytes())
+        return wires
+
+    def build(self, outputs: Sequence[int]) -> Circuit:
+        outputs = np.array(outputs, dtype=np.int32)
+        if np.any((outputs < 0) | (outputs >= self.num_wires)):
+            raise ValueError("The outputs must be defined wires.")
+
+        return Circuit(
+            num_inputs=self.num_inputs,
+            ops=np.frombuffer(self._ops, dtype=np.uint8).copy(),
+            gate_inputs=np.frombuffer(self._gate_inputs, dtype=np.int32)
+            .reshape(-1, 3)
+            .copy(),
+            outputs=outputs,
+        )
+
+
+def levelize(circuit: Circuit) -> np.ndarray:
+    """Return the bootstrap depth of every wire.
+
+    The inputs have depth 0. A gate that bootstraps has depth one more than
+    its deepest input, and a NOT or constant gate has the depth of its
+    deepest input.
+    """
+    num_bootstraps = NUM_BOOTSTRAPS[circuit.ops].tolist()
+
+    # The extra last entry is read by the unused inputs, which are -1.
+    depths = [0] * (circuit.num_wires + 1)
+    wire = circuit.num_inputs
+    for (x, y, z), n in zip(circuit.gate_inputs.tolist(), num_bootstraps):
+        depths[wire] = max(depths[x], depths[y], depths[z]) + (n > 0)
+        wire += 1
+
+    return np.array(depths[:-1], dtype=np.int32)
+
+
+def circuit_depth(circuit: Circuit) -> int:
+    """Return the number of sequential bootstraps needed by the circuit."""
+    return int(levelize(circuit).max(initial=0))
+
+
+def count_bootstraps(circuit: Circuit) -> int:
+    return int(NUM_BOOTSTRAPS[circuit.ops].sum(dtype=np.int64))
+
+
+def evaluate_plaintext(circuit: Circuit, inputs: Sequence[bool]) -> np.ndarray:
+    """Evaluate the circuit on plaintext booleans.
+
+    inputs is a boolean array of shape (num_inputs, ...). The circuit is
+    evaluated on each entry of the trailing axes and the output has shape
+    (num_outputs, ...).
+    """
+    inputs = np.asarray(inputs, dtype=bool)
+    values = [None] * circuit.num_wires
+    values[: circuit.num_inputs] = list(inputs)
+
+    wire = circuit.num_inputs
+    for op, (x, y, z) in zip(
+        circuit.ops.tolist(), circuit.gate_inputs.tolist()
+    ):
+        if op == Op.FALSE or op == Op.TRUE:
+            values[wire] = np.full(inputs.shape[1:], op == Op.TRUE)
+        else:
+            values[wire] = _PLAINTEXT_FUNCTIONS[op](
+                values[x], values[y], values[z]
+            )
+        wire += 1
+
+    return np.array([values[w] for w in circuit.outputs], dtype=bool)
+
+
+@dataclasses.dataclass
+class BatchBootstrapBackend:
+    """Bootstrap batches with bootstrap.bootstrap_batch."""
+
+    bootstrap_key: bootstrap.FourierBootstrapKey
+
+    def __post_init__(self):
+        if isinstance(self.bootstrap_key, bootstrap.BootstrapKey):
+            self.bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+                self.bootstrap_key
+            )
+
+    def __call__(
+        self, lwe_ciphertexts: Sequence[lwe.LweCiphertext]
+    ) -> Sequence[lwe.LweCiphertext]:
+        return bootstrap.bootstrap_batch(
+            lwe_ciphertexts,
+            self.bootstrap_key,
+            scale=lwe.lwe_encode_bool(True).message,
+        )
+
+
+def _linear_combinations(
+    op: Op, x: int, y: int, z: int, values: dict[int, lwe.LweCiphertext]
+) -> list[lwe.LweCiphertext]:
+    if op == Op.MUX:
+        # MUX(s, a, b) = AND(s, a) + ANDNY(s, b)
+        return [
+            gates.gate_linear_combination("and", values[x], values[y]),
+            gates.gate_linear_combination("andny", values[x], values[z]),
+        ]
+
+    return [
+        gates.gate_linear_combination(op.name.lower(), values[x], values[y])
+    ]
+
+
+def evaluate_circuit(
+    circuit: Circuit,
+    input_ciphertexts: Sequence[lwe.LweCiphertext],
+    backend: Backend,
+    max_batch_size: int = 64,
+) -> list[lwe.LweCiphertext]:
+    """Homomorphically evaluate a circuit on encryptions of booleans.
+
+    The gates are grouped into levels by their bootstrap depth. The
+    bootstrapping gates of a level are independent and their linear
+    combinations are sent to the backend in batches of at most max_batch_size
+    ciphertexts. A MUX gate has two combinations, which may be sent in
+    different batches. A wire is freed as soon as the last gate that reads it
+    has been evaluated.
+
+    Constant gates are trivial encryptions with the configuration of the
+    first input ciphertext.
+    """
+    if len(input_ciphertexts) != circuit.num_inputs:
+        raise ValueError(
+            f"The circuit has {circuit.num_inputs} inputs but got "
+            f"{len(input_ciphertexts)} ciphertexts."
+        )
+
+    depths = levelize(circuit)[circuit.num_inputs :]
+    ops = [Op(op) for op in circuit.ops.tolist()]
+    gate_inputs = circuit.gate_inputs.tolist()
+
+    # The number of gates and outputs that still need to read each wire.
+    used_inputs = circuit.gate_inputs[circuit.gate_inputs >= 0]
+    ref_counts = np.bincount(used_inputs, minlength=circuit.num_wires)
+    ref_counts += np.bincount(circuit.outputs, minlength=circuit.num_wires)
+    ref_counts = ref_counts.tolist()
+
+    values = {
+        w: c for w, c in enumerate(input_ciphertexts) if ref_counts[w] > 0
+    }
+    lwe_config = input_ciphertexts[0].config if input_ciphertexts else None
+
+    def store(gate, ciphertext):
+        wire = circuit.num_inputs + gate
+        if ref_counts[wire] > 0:
+            values[wire] = ciphertext
+
+    def release(gate):
+        for wire in gate_inputs[gate]:
+            if wire >= 0:
+                ref_counts[wire] -= 1
+                if ref_counts[wire] == 0:
+                    del values[wire]
+
+    order = np.argsort(depths, kind="stable")
+    level_starts = np.searchsorted(
+        depths[order], np.arange(depths.max(initial=0) + 2)
+    )
+
+    for level in range(len(level_starts) - 1):
+        level_gates = order[level_starts[level] : level_starts[level + 1]]
+        bootstrap_gates = [
+            g for g in level_gates.tolist() if NUM_BOOTSTRAPS[ops[g]]
+        ]
+        free_gates = [
+            g for g in level_gates.tolist() if not NUM_BOOTSTRAPS[ops[g]]
+        ]
+
+        with profiling.span(
+            "circuit_level", level=level, gates=len(level_gates)
+        ):
+            combinations = (
+                c
+                for g in bootstrap_gates
+                for c in _linear_combinations(ops[g], *gate_inputs[g], values)
+            )
+            pending_gates = collections.deque(bootstrap_gates)
+            outputs = collections.deque()
+            while True:
+                batch = list(itertools.islice(combinations, max_batch_size))
+                if not batch:
+                    break
+                outputs.extend(backend(batch))
+
+                # Store the gates whose bootstraps have all been computed.
+                while pending_gates:
+                    g = pending_gates[0]
+                    if len(outputs) < NUM_BOOTSTRAPS[ops[g]]:
+                        break
+                    pending_gates.popleft()
+                    output = outputs.popleft()
+                    if ops[g] == Op.MUX:
+                        output = lwe.lwe_add(output, outputs.popleft())
+                    store(g, output)
+                    release(g)
+
+            # NOT and constant gates may read other gates of the same level,
+            # so they are evaluated in topological order after the
+            # bootstraps.
+            for g in free_gates:
+                op = ops[g]
+                if op == Op.NOT:
+                    store(g, gates.lwe_not(values[gate_inputs[g][0]]))
+                else:
+                    store(
+                        g,
+                        lwe.lwe_trivial_ciphertext(
+                            lwe.lwe_encode_bool(op == Op.TRUE), lwe_config
+                        ),
+                    )
+                release(g)
+
+    return [values[w] for w in circuit.outputs.tolist()]
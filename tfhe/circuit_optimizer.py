@@ -0,0 +1,334 @@
+"""Optimization passes that reduce the bootstraps and depth of a circuit.
+
+The passes rewrite a circuit.Circuit gate by gate. While rewriting, the value
+of each wire is a literal: a constant, a wire of the new circuit, or the
+negation of a wire of the new circuit. A literal is encoded as an int:
+
+    FALSE = -2, TRUE = -1, wire w = 2w, NOT(wire w) = 2w + 1
+
+so that negation is always literal ^ 1.
+
+Every gate is simplified with the truth table of its function on the distinct
+new wires that it reads. This folds constants, removes gates that read the
+same wire twice and maps the function back onto a single two-input op. Since
+the two-input ops realize each of the 10 two-input functions that depend on
+both inputs, a NOT in front of a gate is absorbed by switching to another op.
+"""
+
+import dataclasses
+import heapq
+import itertools
+from collections.abc import Mapping
+from typing import Optional
+
+import numpy as np
+
+from tfhe import circuit
+from tfhe.circuit import Op
+
+_FALSE = -2
+_TRUE = -1
+
+# The ops with f(x, f(y, z)) = f(f(x, y), z).
+_ASSOCIATIVE_OPS = frozenset([Op.AND, Op.OR, Op.XOR])
+
+
+@dataclasses.dataclass
+class OptimizationReport:
+    gates_before: int
+    gates_after: int
+    bootstraps_before: int
+    bootstraps_after: int
+    depth_before: int
+    depth_after: int
+
+    @property
+    def bootstraps_saved(self) -> int:
+        return self.bootstraps_before - self.bootstraps_after
+
+
+class _Rewriter:
+    """Emit simplified gates into a new circuit."""
+
+    def __init__(
+        self,
+        num_inputs: int,
+        eliminate_common_subexpressions: bool,
+        absorb_nots: bool,
+    ):
+        self.builder = circuit.CircuitBuilder(num_inputs)
+        self.depths = [0] * num_inputs
+        self.eliminate_common_subexpressions = eliminate_common_subexpressions
+        self.absorb_nots = absorb_nots
+        self._gates = {}
+
+    def emit(self, op: Op, *wires: int) -> int:
+        """Add a gate unless an identical one exists and return its wire."""
+        key = (op,) + wires
+        if key in self._gates:
+            return self._gates[key]
+
+        wire = self.builder.add_gate(op, *wires)
+        free = circuit.NUM_BOOTSTRAPS[op] == 0
+        self.depths.append(
+            max((self.depths[w] for w in wires), default=0) + (not free)
+        )
+        # NOT and constant gates are always shared since they are free.
+        if self.eliminate_common_subexpressions or free:
+            self._gates[key] = wire
+        return wire
+
+    def materialize(self, literal: int) -> int:
+        """Return a wire of the new circuit holding the literal."""
+        if literal == _FALSE:
+            return self.emit(Op.FALSE)
+        elif literal == _TRUE:
+            return self.emit(Op.TRUE)
+        elif literal & 1:
+            return self.emit(Op.NOT, literal >> 1)
+
+        return literal >> 1
+
+    def negate(self, literal: int) -> int:
+        if self.absorb_nots or literal < 0:
+            return literal ^ 1
+
+        return 2 * self.materialize(literal ^ 1)
+
+    def gate(self, op: Op, literals: list[int]) -> int:
+        """Return a literal with the value of op applied to the literals."""
+        if op == Op.FALSE:
+            return _FALSE
+        elif op == Op.TRUE:
+            return _TRUE
+        elif op == Op.NOT:
+            return self.negate(literals[0])
+
+        literals = literals + [_FALSE] * (3 - len(literals))
+        wires = sorted({literal >> 1 for literal in literals if literal >= 0})
+
+        # The truth table of the gate on the distinct wires that it reads.
+        table = {}
+        for bits in itertools.product([0, 1], repeat=len(wires)):
+            wire_values = dict(zip(wires, bits))
+            x, y, z = (
+                (
+                    literal == _TRUE
+                    if literal < 0
+                    else wire_values[literal >> 1] ^ (literal & 1)
+                )
+                for literal in literals
+            )
+            table[bits] = circuit.OP_TRUTH_TABLES[op][4 * x + 2 * y + z]
+
+        # Drop the wires that the function does not depend on.
+        for i in reversed(range(len(wires))):
+            if all(
+                v == table[bits[:i] + (1 - bits[i],) + bits[i + 1 :]]
+                for bits, v in table.items()
+            ):
+                del wires[i]
+                table = {
+                    bits[:i] + bits[i + 1 :]: v
+                    for bits, v in table.items()
+                    if bits[i] == 0
+                }
+
+        if not wires:
+            return _TRUE if table[()] else _FALSE
+        elif len(wires) == 1:
+            literal = 2 * wires[0]
+            return literal if table[(1,)] else self.negate(literal)
+        elif len(wires) == 2:
+            two_input_op = circuit.TWO_INPUT_OPS_BY_TRUTH_TABLE[
+                tuple(table.values())
+            ]
+            return 2 * self.emit(two_input_op, *wires)
+
+        # Only a MUX reads three wires, and then each of its inputs is a
+        # distinct wire or its negation.
+        select, true, false = literals
+        if select & 1:
+            select, true, false = select ^ 1, false, true
+        return 2 * self.emit(
+            Op.MUX,
+            select >> 1,
+            self.materialize(true),
+            self.materialize(false),
+        )
+
+
+def _rewrite(
+    c: circuit.Circuit,
+    known_inputs: Optional[Mapping[int, bool]] = None,
+    eliminate_common_subexpressions: bool = False,
+    absorb_nots: bool = False,
+) -> circuit.Circuit:
+    rewriter = _Rewriter(
+        c.num_inputs, eliminate_common_subexpressions, absorb_nots
+    )
+    known_inputs = known_inputs or {}
+    literals = [
+        (_TRUE if known_inputs[w] else _FALSE) if w in known_inputs else 2 * w
+        for w in range(c.num_inputs)
+    ]
+
+    for op, inputs, n in zip(
+        c.ops.tolist(),
+        c.gate_inputs.tolist(),
+        circuit.NUM_INPUTS[c.ops].tolist(),
+    ):
+        literals.append(
+            rewriter.gate(Op(op), [literals[w] for w in inputs[:n]])
+        )
+
+    outputs = [rewriter.materialize(literals[w]) for w in c.outputs.tolist()]
+    return remove_dead_gates(rewriter.builder.build(outputs))
+
+
+def remove_dead_gates(c: circuit.Circuit) -> circuit.Circuit:
+    """Remove the gates that no output depends on."""
+    # The extra last entry is marked by the unused inputs, which are -1.
+    live = [False] * (c.num_wires + 1)
+    for wire in c.outputs.tolist():
+        live[wire] = True
+    gate_inputs = c.gate_inputs.tolist()
+    for g in reversed(range(c.num_gates)):
+        if live[c.num_inputs + g]:
+            for wire in gate_inputs[g]:
+                live[wire] = True
+
+    live = np.array(live)
+    live_gates = live[c.num_inputs : -1]
+    live[: c.num_inputs] = True
+
+    # Map the old wire ids to the new ones. Unused inputs stay -1.
+    new_wires = np.append(np.cumsum(live[:-1]) - 1, -1).astype(np.int32)
+    gate_inputs = c.gate_inputs[live_gates]
+    return circuit.Circuit(
+        num_inputs=c.num_inputs,
+        ops=c.ops[live_gates],
+        gate_inputs=new_wires[gate_inputs],
+        outputs=new_wires[c.outputs],
+    )
+
+
+def fold_constants(
+    c: circuit.Circuit, known_inputs: Optional[Mapping[int, bool]] = None
+) -> circuit.Circuit:
+    """Propagate constant gates and plaintext inputs through the circuit.
+
+    known_inputs maps input wires to their plaintext values. The inputs remain
+    in the circuit but nothing reads them.
+    """
+    return _rewrite(c, known_inputs)
+
+
+def eliminate_common_subexpressions(c: circuit.Circuit) -> circuit.Circuit:
+    """Merge gates that compute the same function of the same wires."""
+    return _rewrite(c, eliminate_common_subexpressions=True)
+
+
+def absorb_nots(c: circuit.Circuit) -> circuit.Circuit:
+    """Absorb NOT gates into the ops of the gates that read them.
+
+    A NOT gate remains only where an output or a MUX input needs it.
+    """
+    return _rewrite(c, absorb_nots=True)
+
+
+def rebalance(c: circuit.Circuit) -> circuit.Circuit:
+    """Reduce the depth of chains of AND, OR and XOR gates.
+
+    A gate is inside a chain if its only reader is a gate with the same
+    associative op. Each chain is rebuilt as a tree that always combines the
+    two shallowest operands, which minimizes the depth of the chain.
+    """
+    ops = c.ops.tolist()
+    gate_inputs = c.gate_inputs.tolist()
+    num_inputs = c.num_inputs
+
+    fanouts = np.bincount(
+        c.gate_inputs[c.gate_inputs >= 0], minlength=c.num_wires
+    )
+    fanouts += np.bincount(c.outputs, minlength=c.num_wires)
+    fanouts = fanouts.tolist()
+
+    # Whether a gate is inside a chain and does not need a wire of its own.
+    internal = [False] * c.num_gates
+    for g in range(c.num_gates):
+        if ops[g] in _ASSOCIATIVE_OPS:
+            for wire in gate_inputs[g][:2]:
+                h = wire - num_inputs
+                if h >= 0 and ops[h] == ops[g] and fanouts[wire] == 1:
+                    internal[h] = True
+
+    rewriter = _Rewriter(
+        num_inputs, eliminate_common_subexpressions=False, absorb_nots=False
+    )
+    new_wires = list(range(num_inputs))
+
+    def chain_operands(g):
+        operands = []
+        stack = [g]
+        while stack:
+            for wire in gate_inputs[stack.pop()][:2]:
+                h = wire - num_inputs
+                if h >= 0 and internal[h] and ops[h] == ops[g]:
+                    stack.append(h)
+                else:
+                    operands.append(new_wires[wire])
+        return operands
+
+    for g in range(c.num_gates):
+        op = Op(ops[g])
+        if internal[g]:
+            new_wires.append(-1)
+        elif op in _ASSOCIATIVE_OPS:
+            heap = [
+                (rewriter.depths[w], i, w)
+                for i, w in enumerate(chain_operands(g))
+            ]
+            heapq.heapify(heap)
+            counter = len(heap)
+            while len(heap) > 1:
+                _, _, left = heapq.heappop(heap)
+                _, _, right = heapq.heappop(heap)
+                wire = rewriter.emit(op, left, right)
+                heapq.heappush(heap, (rewriter.depths[wire], counter, wire))
+                counter += 1
+            new_wires.append(heap[0][2])
+        else:
+            n = circuit.NUM_INPUTS[op]
+            new_wires.append(
+                rewriter.emit(op, *(new_wires[w] for w in gate_inputs[g][:n]))
+            )
+
+    outputs = [new_wires[w] for w in c.outputs.tolist()]
+    return rewriter.builder.build(outputs)
+
+
+def optimize_circuit(
+    c: circuit.Circuit, known_inputs: Optional[Mapping[int, bool]] = None
+) -> tuple[circuit.Circuit, OptimizationReport]:
+    """Run all of the passes and report the bootstraps and depth saved."""
+    optimized = _rewrite(
+        c,
+        known_inputs,
+        eliminate_common_subexpressions=True,
+        absorb_nots=True,
+    )
+    optimized = rebalance(optimized)
+    optimized = _rewrite(
+        optimized, eliminate_common_subexpressions=True, absorb_nots=True
+    )
+
+    report = OptimizationReport(
+        gates_before=c.num_gates,
+        gates_after=optimized.num_gates,
+        bootstraps_before=circuit.count_bootstraps(c),
+        bootstraps_after=circuit.count_bootstraps(optimized),
+        depth_before=circuit.circuit_depth(c),
+        depth_after=circuit.circuit_depth(optimized),
+    )
+    return optimized, report
@@ -1,4 +1,5 @@
 from tfhe import gsw
+from tfhe import keyswitch
 from tfhe import lwe
 from tfhe import rlwe
 
@@ -7,3 +8,10 @@ LWE_CONFIG = lwe.LweConfig(dimension=1024, noise_std=2 ** (-24))
 RLWE_CONFIG = rlwe.RlweConfig(degree=1024, noise_std=2 ** (-24))
 
 GSW_CONFIG = gsw.GswConfig(rlwe_config=RLWE_CONFIG, log_p=8)
+
+# Parameters for bootstrapping with key switching. LWE ciphertexts are encrypted
+# with a key of dimension 630 and bootstrapped ciphertexts are switched back to
+# it from the RLWE key of dimension 1024.
+SMALL_LWE_CONFIG = lwe.LweConfig(dimension=630, noise_std=2 ** (-15))
+
+KEYSWITCH_CONFIG = keyswitch.KeySwitchConfig(log_base=2, levels=8)
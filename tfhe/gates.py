@@ -0,0 +1,228 @@
+"""Homomorphic boolean gates.
+
+Booleans are encoded with utils.encode_bool, i.e. False is encode(0) and True
+is encode(2). Every two-input gate computes a linear combination
+
+    encode(offset) + c_left * m_left + c_right * m_right
+
+of the input messages and bootstraps it to an encoding of True if the
+combination is in [3, 5] and to an encoding of False if it is in [-1, 1]. Each
+of these gates costs a single bootstrap.
+"""
+
+import dataclasses
+
+from tfhe import bootstrap, keyswitch, lwe, profiling, utils
+
+# The (offset, c_left, c_right) coefficients of each two-input gate. The
+# ANDNY, ANDYN, ORNY and ORYN gates negate the input marked with N.
+GATE_LINEAR_FORMS = {
+    "and": (-1, 1, 1),
+    "nand": (-3, -1, -1),
+    "or": (1, 1, 1),
+    "nor": (3, -1, -1),
+    "xor": (0, 2, 2),
+    "xnor": (4, 2, 2),
+    "andny": (1, -1, 1),
+    "andyn": (1, 1, -1),
+    "orny": (3, -1, 1),
+    "oryn": (3, 1, -1),
+}
+
+
+def gate_linear_combination(
+    gate: str,
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+) -> lwe.LweCiphertext:
+    """Compute the linear combination of the inputs of a gate.
+
+    Bootstrapping the output to an encoding of True evaluates the gate.
+    """
+    offset, c_left, c_right = GATE_LINEAR_FORMS[gate]
+
+    # The scaled left input is a new ciphertext with the shape of the inputs,
+    # which may be batches, so the other terms are added to it in place.
+    combination = lwe.lwe_plaintext_multiply(c_left, lwe_ciphertext_left)
+    lwe.lwe_add_inplace(
+        combination, lwe.lwe_plaintext_multiply(c_right, lwe_ciphertext_right)
+    )
+    return lwe.lwe_add_inplace(
+        combination,
+        lwe.lwe_trivial_ciphertext(
+            plaintext=lwe.lwe_encode(offset), config=lwe_ciphertext_left.config
+        ),
+    )
+
+
+def lwe_gate(
+    gate: str,
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate the two-input gate with the given name.
+
+    gate must be a key of GATE_LINEAR_FORMS.
+    """
+    with profiling.span(f"lwe_{gate}"):
+        return bootstrap.bootstrap(
+            gate_linear_combination(
+                gate, lwe_ciphertext_left, lwe_ciphertext_right
+            ),
+            bootstrap_key,
+            scale=utils.encode_bool(True),
+        )
+
+
+def lwe_and(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    return lwe_gate(
+        "and", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_or(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    return lwe_gate(
+        "or", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_nor(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    return lwe_gate(
+        "nor", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_xor(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate the XOR function.
+
+    The inputs are doubled so that True + True wraps around to False.
+    """
+    return lwe_gate(
+        "xor", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_xnor(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    return lwe_gate(
+        "xnor", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_andny(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate AND(NOT(b_left), b_right)."""
+    return lwe_gate(
+        "andny", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_andyn(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate AND(b_left, NOT(b_right))."""
+    return lwe_gate(
+        "andyn", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_orny(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate OR(NOT(b_left), b_right)."""
+    return lwe_gate(
+        "orny", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_oryn(
+    lwe_ciphertext_left: lwe.LweCiphertext,
+    lwe_ciphertext_right: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate OR(b_left, NOT(b_right))."""
+    return lwe_gate(
+        "oryn", lwe_ciphertext_left, lwe_ciphertext_right, bootstrap_key
+    )
+
+
+def lwe_not(lwe_ciphertext: lwe.LweCiphertext) -> lwe.LweCiphertext:
+    """Homomorphically evaluate the NOT function without bootstrapping.
+
+    Since the encodings of False and True are 0 and encode(2), NOT(b) is
+    encode(2) - b.
+    """
+    return lwe.lwe_subtract(
+        lwe.lwe_trivial_ciphertext(
+            plaintext=lwe.lwe_encode_bool(True), config=lwe_ciphertext.config
+        ),
+        lwe_ciphertext,
+    )
+
+
+def lwe_mux(
+    lwe_ciphertext_select: lwe.LweCiphertext,
+    lwe_ciphertext_true: lwe.LweCiphertext,
+    lwe_ciphertext_false: lwe.LweCiphertext,
+    bootstrap_key: bootstrap.BootstrapKey,
+) -> lwe.LweCiphertext:
+    """Homomorphically evaluate MUX(b_select, b_true, b_false).
+
+    The output is an encryption of b_true if b_select is True and of b_false
+    otherwise. It is computed as AND(b_select, b_true) + ANDNY(b_select,
+    b_false) with two bootstraps. At most one of the terms is True, so their
+    sum is an encoding of a boolean. If the bootstrap key has a key switching
+    key then the sum is key switched once instead of switching both terms.
+    """
+    with profiling.span("lwe_mux"):
+        key_without_keyswitch = dataclasses.replace(
+            bootstrap_key, keyswitch_key=None
+        )
+        terms = [
+            bootstrap.bootstrap(
+                gate_linear_combination(
+                    gate, lwe_ciphertext_select, lwe_ciphertext_input
+                ),
+                key_without_keyswitch,
+                scale=utils.encode_bool(True),
+            )
+            for gate, lwe_ciphertext_input in [
+                ("and", lwe_ciphertext_true),
+                ("andny", lwe_ciphertext_false),
+            ]
+        ]
+        output_lwe_ciphertext = lwe.lwe_add(*terms)
+
+        if bootstrap_key.keyswitch_key is not None:
+            output_lwe_ciphertext = keyswitch.keyswitch(
+                output_lwe_ciphertext, bootstrap_key.keyswitch_key
+            )
+
+        return output_lwe_ciphertext
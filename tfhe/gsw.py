@@ -1,9 +1,11 @@
 import dataclasses
+import functools
 from collections.abc import Sequence
+from typing import Optional, Union
 
 import numpy as np
 
-from tfhe import lwe, polynomial, rlwe
+from tfhe import lwe, polynomial, profiling, rlwe, utils
 
 
 @dataclasses.dataclass
@@ -11,6 +13,11 @@ class GswConfig:
     rlwe_config: rlwe.RlweConfig
     log_p: int  # Homomorphic multiplication will use the base-2^log_p representation.
 
+    # The number of most significant base-2^log_p digits kept by the gadget
+    # decomposition. The lower digits are rounded away. If None, all
+    # base_p_num_powers(log_p) digits are kept.
+    levels: Optional[int] = None
+
 
 @dataclasses.dataclass
 class GswPlaintext:
@@ -24,6 +31,70 @@ class GswCiphertext:
     rlwe_ciphertexts: Sequence[rlwe.RlweCiphertext]
 
 
+class CompactGswCiphertext:
+    """A GSW ciphertext stored in a single int32 array of shape (2L, 2, N).
+
+    data[i] contains the a and b components of the i-th RLWE ciphertext.
+    """
+
+    __slots__ = ("config", "data")
+
+    def __init__(self, config: GswConfig, data: np.ndarray):
+        self.config = config
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"CompactGswCiphertext(config={self.config}, data={self.data})"
+
+    @property
+    def rlwe_ciphertexts(self) -> Sequence[rlwe.CompactRlweCiphertext]:
+        return [
+            rlwe.CompactRlweCiphertext(self.config.rlwe_config, row)
+            for row in self.data
+        ]
+
+
+class SeededGswCiphertext:
+    """A GSW ciphertext that stores one seed in place of the a components.
+
+    b is an int32 array of shape (2L, N) with the b components of the rows.
+    The a components are expanded from the seed as an array of shape (2L, N)
+    with utils.expand_seed. Seeded ciphertexts are expanded by
+    convert_gsw_to_compact.
+    """
+
+    __slots__ = ("config", "seed", "b")
+
+    def __init__(self, config: GswConfig, seed: int, b: np.ndarray):
+        self.config = config
+        self.seed = seed
+        self.b = b
+
+    def __repr__(self) -> str:
+        return (
+            f"SeededGswCiphertext(config={self.config}, seed={self.seed}, "
+            f"b={self.b})"
+        )
+
+    @property
+    def rlwe_ciphertexts(self) -> Sequence[rlwe.CompactRlweCiphertext]:
+        return convert_gsw_to_compact(self).rlwe_ciphertexts
+
+
+@dataclasses.dataclass
+class FourierGswCiphertext:
+    """A GSW ciphertext whose rows are stored in the Fourier domain.
+
+    data is a complex array of shape (N/2, 2L, 2, 2). The entry data[:, i, j, k]
+    is the negacyclic FFT of half k (see polynomial.split_int32) of component j
+    (a or b) of the i-th RLWE ciphertext. The frequency axis comes first so that
+    the external product is a batch of small matrix products.
+    """
+
+    config: GswConfig
+    data: np.ndarray
+
+
 @dataclasses.dataclass
 class GswEncryptionKey:
     config: GswConfig
@@ -35,43 +106,190 @@ def base_p_num_powers(log_p: int):
     return 32 // log_p
 
 
-def array_to_base_p(a: np.ndarray, log_p: int) -> Sequence[np.ndarray]:
+def gsw_num_levels(config: GswConfig) -> int:
+    """Return the number L of digits kept by the gadget decomposition."""
+    num_powers = base_p_num_powers(config.log_p)
+    if config.levels is None:
+        return num_powers
+    elif not 0 < config.levels <= num_powers:
+        raise ValueError(
+            f"levels must be between 1 and {num_powers}: {config.levels}"
+        )
+
+    return config.levels
+
+
+@functools.lru_cache
+def gadget_shifts(log_p: int, levels: Optional[int]) -> np.ndarray:
+    """Return the shifts of the digits kept by the gadget decomposition.
+
+    Digit i is the coefficient of 2^shifts[i]. These are the powers
+    2^(j * log_p) for the top levels values of j. The output is cached and
+    read only.
+    """
+    num_powers = base_p_num_powers(log_p)
+    levels = num_powers if levels is None else levels
+    shifts = np.arange(num_powers - levels, num_powers, dtype=np.uint32) * (
+        np.uint32(log_p)
+    )
+    shifts.setflags(write=False)
+    return shifts
+
+
+@functools.lru_cache
+def digit_offset(log_p: int, levels: int) -> np.uint32:
+    """Return the offset added to the coefficients before digit extraction."""
+    shifts = gadget_shifts(log_p, levels).tolist()
+
+    # Adding half_p to every digit shifts the digits from [-p/2, p/2) to [0, p).
+    # Adding half of the lowest power rounds away the dropped digits.
+    offset = 2 ** (log_p - 1) * sum(2**shift for shift in shifts)
+    if shifts[0] > 0:
+        offset += 2 ** (shifts[0] - 1)
+    return np.uint32(offset % 2**32)
+
+
+def _gadget_scales(config: GswConfig) -> np.ndarray:
+    """Return the int64 scales 2^shifts[i] of the rows of a GSW ciphertext."""
+    return np.left_shift(
+        1, gadget_shifts(config.log_p, gsw_num_levels(config)).astype(np.int64)
+    )
+
+
+def estimate_external_product_noise(config: GswConfig) -> float:
+    """Estimate the std of the noise added by an external product.
+
+    This is the noise added to an RLWE ciphertext, with a uniform binary key,
+    when it is multiplied by a GSW encryption of a bit. Like
+    rlwe.RlweConfig.noise_std, it is a fraction of 2^31.
+
+    The estimate has two terms:
+      * The 2L digit polynomials times the noise of the GSW rows. The digits
+        are roughly uniform in [-p/2, p/2).
+      * The rounding error of the dropped digits of a and b, which is uniform
+        in [-q/2, q/2) where q = 2^(lowest kept shift). It reaches the message
+        as error(b) - error(a) * key.
+    """
+    N = config.rlwe_config.degree
+    levels = gsw_num_levels(config)
+    digit_variance = 2 ** (2 * config.log_p) / 12
+    gsw_variance = (
+        2 * levels * N * digit_variance * config.rlwe_config.noise_std**2
+    )
+
+    lowest_shift = int(gadget_shifts(config.log_p, levels)[0])
+    rounding_variance = 0.0
+    if lowest_shift > 0:
+        rounding_variance = (1 + N / 2) * 2 ** (2 * (lowest_shift - 31)) / 12
+
+    return float(np.sqrt(gsw_variance + rounding_variance))
+
+
+def _signed_digits(
+    a: np.ndarray, shifts: np.ndarray, log_p: int, out: np.ndarray
+) -> np.ndarray:
+    """Write the signed base 2^log_p digits (a >> shifts) of a into out.
+
+    shifts must be the output of gadget_shifts, reshaped to broadcast against
+    a, and the shape of out must be the broadcast shape of a and shifts. If
+    the lowest shift is positive then a is rounded to a multiple of 2^shift
+    before it is decomposed.
+    """
+    half_p = 2 ** (log_p - 1)
+    mask = np.uint32(2**log_p - 1)
+
+    # The offset a is broadcast into out and the digits are extracted in
+    # place, so that no temporary arrays are allocated.
+    out_uint32 = out.view(np.uint32)
+    np.add(
+        np.asarray(a, dtype=np.int32).view(np.uint32),
+        digit_offset(log_p, shifts.size),
+        out=out_uint32,
+    )
+    np.right_shift(out_uint32, shifts, out=out_uint32)
+    np.bitwise_and(out_uint32, mask, out=out_uint32)
+    np.subtract(out, np.int32(half_p), out=out)
+    return out
+
+
+def array_to_base_p(
+    a: np.ndarray, log_p: int, levels: Optional[int] = None
+) -> np.ndarray:
     """Compute the base 2^log_p representation of each element in a.
 
     a: An array of type int32
     log_p: Compute the representation in base 2^log_p
+    levels: If not None, only the levels most significant digits of a rounded
+            to a multiple of the lowest kept power are computed.
+
+    Returns an int32 array of shape (num_powers,) + a.shape whose i-th entry
+    contains the coefficients of 2^(i * log_p). If levels is not None then
+    num_powers = levels and the i-th entry contains the coefficients of
+    2^((base_p_num_powers(log_p) - levels + i) * log_p).
     """
-    num_powers = base_p_num_powers(log_p)
-    half_p = np.int32(2 ** (log_p - 1))
-    offset = half_p * sum(2 ** (i * log_p) for i in range(num_powers))
-    mask = 2 ** (log_p) - 1
+    shifts = gadget_shifts(log_p, levels)
+    num_powers = len(shifts)
+    shifts = shifts.reshape((num_powers,) + (1,) * np.ndim(a))
 
-    a_offset = (a + offset).astype(np.uint32)
+    output = np.empty((num_powers,) + np.shape(a), dtype=np.int32)
+    return _signed_digits(a, shifts, log_p, out=output)
 
-    output = []
-    for i in range(num_powers):
-        output.append(
-            (np.right_shift(a_offset, i * log_p) & mask).astype(np.int32)
-            - half_p
-        )
 
-    return output
+def gadget_decompose(
+    a: np.ndarray,
+    log_p: int,
+    out: Optional[np.ndarray] = None,
+    levels: Optional[int] = None,
+) -> np.ndarray:
+    """Compute the base 2^log_p representation of RLWE ciphertext components.
 
+    a: An int32 array of shape (..., 2, N) containing the a and b components of
+       one or more RLWE ciphertexts.
+    log_p: Compute the representation in base 2^log_p
+    out: An optional int32 array of shape (..., 2L, N) to write the output to.
+    levels: The number of most significant digits to keep as in
+            array_to_base_p.
 
-def base_p_to_array(a_base_p: Sequence[np.ndarray], log_p) -> np.ndarray:
-    """Reconstruct an array of int32s from its base 2^log_p representation."""
-    return sum(2 ** (i * log_p) * x for i, x in enumerate(a_base_p)).astype(
-        np.int32
+    Returns an int32 array of shape (..., 2L, N) where L = levels, or
+    base_p_num_powers(log_p) if levels is None. Row j*L + i contains the
+    coefficients of digit i of component j.
+    """
+    shifts = gadget_shifts(log_p, levels)
+    num_powers = len(shifts)
+    N = a.shape[-1]
+    if out is None:
+        out = np.empty(a.shape[:-2] + (2 * num_powers, N), dtype=np.int32)
+        profiling.count_allocation(out)
+
+    _signed_digits(
+        a[..., None, :],
+        shifts[:, None],
+        log_p,
+        out=out.reshape(a.shape[:-2] + (2, num_powers, N)),
     )
+    return out
+
+
+def base_p_to_array(a_base_p: Sequence[np.ndarray], log_p) -> np.ndarray:
+    """Reconstruct an array of int32s from its base 2^log_p representation.
+
+    If a_base_p has fewer than base_p_num_powers(log_p) entries then they are
+    the most significant digits, as computed by array_to_base_p with levels.
+    """
+    shifts = gadget_shifts(log_p, len(a_base_p)).tolist()
+    return sum(
+        (2**shift) * np.asarray(x, dtype=np.int64)
+        for shift, x in zip(shifts, a_base_p)
+    ).astype(np.int32)
 
 
 def polynomial_to_base_p(
-    f: polynomial.Polynomial, log_p: int
+    f: polynomial.Polynomial, log_p: int, levels: Optional[int] = None
 ) -> Sequence[polynomial.Polynomial]:
     """Compute the base 2^log_p of the polynomial f."""
     return [
         polynomial.Polynomial(coeff=v, N=f.N)
-        for v in array_to_base_p(f.coeff, log_p=log_p)
+        for v in array_to_base_p(f.coeff, log_p=log_p, levels=levels)
     ]
 
 
@@ -81,9 +299,10 @@ def base_p_to_polynomial(
     """Recover the polynomial f from its base 2^log_p representation."""
     f = polynomial.zero_polynomial(f_base_p[0].N)
 
-    for i, level in enumerate(f_base_p):
-        p_i = 2 ** (i * log_p)
-        f = polynomial.polynomial_add(
+    shifts = gadget_shifts(log_p, len(f_base_p)).tolist()
+    for shift, level in zip(shifts, f_base_p):
+        p_i = 2**shift
+        polynomial.polynomial_add_into(
             f, polynomial.polynomial_constant_multiply(p_i, level)
         )
 
@@ -116,76 +335,231 @@ def convert_gws_key_to_rlwe(
 
 
 def gsw_encrypt(
-    plaintext: GswPlaintext, key: GswEncryptionKey
+    plaintext: GswPlaintext,
+    key: GswEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
 ) -> GswCiphertext:
+    """Encrypt a plaintext as a list of RLWE ciphertexts.
+
+    The ciphertexts are views into the array of gsw_encrypt_compact.
+    """
+    rlwe_config = key.config.rlwe_config
+    N = rlwe_config.degree
+    data = gsw_encrypt_compact(plaintext, key, rng=rng).data
+    return GswCiphertext(
+        config=key.config,
+        rlwe_ciphertexts=[
+            rlwe.RlweCiphertext(
+                config=rlwe_config,
+                a=polynomial.Polynomial(N=N, coeff=a),
+                b=polynomial.Polynomial(N=N, coeff=b),
+            )
+            for a, b in data
+        ],
+    )
+
+
+def gsw_encrypt_compact(
+    plaintext: GswPlaintext,
+    key: GswEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> CompactGswCiphertext:
+    """Encrypt a plaintext with all rows in a single array."""
     gsw_config = key.config
-    num_powers = base_p_num_powers(log_p=gsw_config.log_p)
+    num_powers = gsw_num_levels(gsw_config)
+    N = gsw_config.rlwe_config.degree
 
-    # Create 2 RLWE encryptions of 0 for each element of a base-p representation.
+    # Create 2 RLWE encryptions of 0 for each element of a base-p
+    # representation with one batched encryption.
     rlwe_key = convert_gws_key_to_rlwe(key)
-    rlwe_plaintext_zero = rlwe.build_zero_rlwe_plaintext(gsw_config.rlwe_config)
-    rlwe_ciphertexts = [
-        rlwe.rlwe_encrypt(rlwe_plaintext_zero, rlwe_key)
-        for _ in range(2 * num_powers)
-    ]
+    data = rlwe._rlwe_encrypt_array(
+        np.zeros((2 * num_powers, N), dtype=np.int32), rlwe_key, rng=rng
+    )
+
+    # Add the multiples p^i * message to the a components of the first L
+    # ciphertexts and to the b components of the last L. If digits are
+    # dropped, p^i are the scales of the kept digits.
+    scaled_messages = np.multiply(
+        _gadget_scales(gsw_config)[:, None], plaintext.message.coeff
+    ).astype(np.int32)
+    data[:num_powers, 0] += scaled_messages
+    data[num_powers:, 1] += scaled_messages
+
+    return CompactGswCiphertext(gsw_config, data)
+
+
+def gsw_encrypt_seeded(
+    plaintext: GswPlaintext,
+    key: GswEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> SeededGswCiphertext:
+    """Encrypt a plaintext with the a components expanded from a fresh seed.
+
+    gsw_encrypt_compact adds p^i * message to the uniform a component of row
+    i < L. Since a + p^i * message is uniform as well, here row i < L is
+    instead an RLWE encryption of -p^i * message * key with a mask from the
+    seed. Both rows decrypt to the same value and have the same distribution.
+    """
+    gsw_config = key.config
+    num_powers = gsw_num_levels(gsw_config)
+    N = gsw_config.rlwe_config.degree
+
+    scaled_messages = np.multiply(
+        _gadget_scales(gsw_config)[:, None], plaintext.message.coeff
+    ).astype(np.int32)
+    messages = np.concatenate(
+        [
+            -polynomial.negacyclic_multiply(scaled_messages, key.key.coeff),
+            scaled_messages,
+        ]
+    )
+
+    seed = utils.sample_seed(rng)
+    data = rlwe._rlwe_encrypt_array(
+        messages,
+        convert_gws_key_to_rlwe(key),
+        rng=rng,
+        a=utils.expand_seed(seed, (2 * num_powers, N)),
+    )
+    return SeededGswCiphertext(gsw_config, seed, data[:, 1])
+
 
-    # Add multiples p^i * message to the rlwe ciphertexts
-    for i in range(num_powers):
-        p_i = 2 ** (i * gsw_config.log_p)
-        scaled_message = polynomial.polynomial_constant_multiply(
-            p_i, plaintext.message
+def convert_gsw_to_compact(
+    gsw_ciphertext: GswCiphertext,
+) -> CompactGswCiphertext:
+    """Store a GSW ciphertext in a single array.
+
+    Compact ciphertexts are returned as is and seeded ciphertexts are expanded.
+    """
+    if isinstance(gsw_ciphertext, CompactGswCiphertext):
+        return gsw_ciphertext
+    elif isinstance(gsw_ciphertext, SeededGswCiphertext):
+        a = utils.expand_seed(gsw_ciphertext.seed, gsw_ciphertext.b.shape)
+        return CompactGswCiphertext(
+            config=gsw_ciphertext.config,
+            data=np.stack([a, gsw_ciphertext.b], axis=1),
         )
 
-        rlwe_ciphertexts[i].a = polynomial.polynomial_add(
-            rlwe_ciphertexts[i].a, scaled_message
+    return CompactGswCiphertext(
+        config=gsw_ciphertext.config,
+        data=np.array(
+            [[c.a.coeff, c.b.coeff] for c in gsw_ciphertext.rlwe_ciphertexts],
+            dtype=np.int32,
+        ),
+    )
+
+
+def convert_gsw_to_fourier(
+    gsw_ciphertext: Union[GswCiphertext, CompactGswCiphertext],
+) -> FourierGswCiphertext:
+    """Transform the rows of a GSW ciphertext to the Fourier domain."""
+    rows = convert_gsw_to_compact(gsw_ciphertext).data
+    data = polynomial.negacyclic_fft(
+        np.stack(polynomial.split_int32(rows), axis=-2)
+    )
+    data = np.ascontiguousarray(np.moveaxis(data, -1, 0))
+    return FourierGswCiphertext(config=gsw_ciphertext.config, data=data)
+
+
+def fourier_external_product(
+    digits: np.ndarray, fourier_data: np.ndarray
+) -> np.ndarray:
+    """Multiply a row vector of digit polynomials with a Fourier GSW matrix.
+
+    digits: An int32 array of shape (..., 2L, N) containing small polynomials.
+    fourier_data: The data of a FourierGswCiphertext.
+
+    Returns an int32 array of shape (..., 2, N) containing the a and b
+    components of the product. The products are accumulated in the Fourier
+    domain so that each output half is inverse transformed once.
+    """
+    batch_shape = digits.shape[:-2]
+    num_freqs, num_rows = fourier_data.shape[:2]
+    if profiling.is_enabled():
+        profiling.count(
+            "polynomial_multiply", 2 * digits.size // digits.shape[-1]
         )
 
-        b_idx = i + num_powers
-        rlwe_ciphertexts[b_idx].b = polynomial.polynomial_add(
-            rlwe_ciphertexts[b_idx].b, scaled_message
+    # Move the frequency axis to the front and multiply the digits with the GSW
+    # rows one frequency at a time.
+    digits_fft = np.moveaxis(polynomial.negacyclic_fft(digits), -1, 0)
+    prod_fft = np.matmul(
+        digits_fft.reshape(num_freqs, -1, num_rows),
+        fourier_data.reshape(num_freqs, num_rows, 4),
+    )
+    prod_fft = np.moveaxis(
+        prod_fft.reshape((num_freqs,) + batch_shape + (2, 2)), 0, -1
+    )
+    prod = polynomial.negacyclic_ifft(prod_fft)
+    lo, hi = prod[..., 0, :], prod[..., 1, :]
+    np.left_shift(hi, 16, out=hi)
+    return np.add(lo, hi, dtype=np.int32, casting="unsafe")
+
+
+def _external_product(
+    gsw_ciphertext: Union[
+        GswCiphertext, CompactGswCiphertext, FourierGswCiphertext
+    ],
+    rlwe_data: np.ndarray,
+) -> np.ndarray:
+    """Multiply a GSW ciphertext with the (2, N) array of an RLWE ciphertext."""
+    # The rows of rlwe_base_p are the base-p representations of rlwe_data[0]
+    # followed by those of rlwe_data[1].
+    with profiling.span("decompose"):
+        rlwe_base_p = gadget_decompose(
+            rlwe_data,
+            log_p=gsw_ciphertext.config.log_p,
+            levels=gsw_ciphertext.config.levels,
         )
 
-    return GswCiphertext(gsw_config, rlwe_ciphertexts)
+    with profiling.span("external_product"):
+        if isinstance(gsw_ciphertext, FourierGswCiphertext):
+            return fourier_external_product(rlwe_base_p, gsw_ciphertext.data)
+
+        # Multiply the row vector rlwe_base_p with the
+        # len(rlwe_base_p)x2 matrix gsw_ciphertext.rlwe_ciphertexts, adding
+        # the products of each row into a single accumulator.
+        gsw_rows = convert_gsw_to_compact(gsw_ciphertext).data
+        N = rlwe_data.shape[-1]
+        acc = polynomial.Polynomial(N=N, coeff=np.zeros((2, N), dtype=np.int32))
+        for digit, row in zip(rlwe_base_p, gsw_rows):
+            polynomial.polynomial_mac(
+                acc,
+                polynomial.Polynomial(N=N, coeff=digit),
+                polynomial.Polynomial(N=N, coeff=row),
+            )
+        return acc.coeff
 
 
 def gsw_multiply(
-    gsw_ciphertext: GswCiphertext, rlwe_ciphertext: rlwe.RlweCiphertext
+    gsw_ciphertext: Union[
+        GswCiphertext, CompactGswCiphertext, FourierGswCiphertext
+    ],
+    rlwe_ciphertext: rlwe.RlweCiphertext,
 ) -> rlwe.RlweCiphertext:
-    gsw_config = gsw_ciphertext.config
+    """Homomorphically multiply an RLWE ciphertext by a GSW ciphertext.
+
+    If rlwe_ciphertext is compact then the output is compact as well.
+    """
     rlwe_config = rlwe_ciphertext.config
+    prod = _external_product(
+        gsw_ciphertext, rlwe.convert_rlwe_to_compact(rlwe_ciphertext).data
+    )
 
-    # Concatenate the base-p representations of rlwe_ciphertext.a and rlwe_ciphertext.b
-    rlwe_base_p = polynomial_to_base_p(
-        rlwe_ciphertext.a, log_p=gsw_config.log_p
-    ) + polynomial_to_base_p(rlwe_ciphertext.b, log_p=gsw_config.log_p)
+    if isinstance(rlwe_ciphertext, rlwe.CompactRlweCiphertext):
+        return rlwe.CompactRlweCiphertext(config=rlwe_config, data=prod)
 
-    # Multiply the row vector rlwe_base_p with the
-    # len(rlwe_base_p)x2 matrix gsw_ciphertext.rlwe_ciphertexts.
-    rlwe_ciphertext = rlwe.RlweCiphertext(
+    return rlwe.RlweCiphertext(
         config=rlwe_config,
-        a=polynomial.zero_polynomial(rlwe_config.degree),
-        b=polynomial.zero_polynomial(rlwe_config.degree),
+        a=polynomial.Polynomial(N=rlwe_config.degree, coeff=prod[0]),
+        b=polynomial.Polynomial(N=rlwe_config.degree, coeff=prod[1]),
     )
 
-    for i, p in enumerate(rlwe_base_p):
-        rlwe_ciphertext.a = polynomial.polynomial_add(
-            rlwe_ciphertext.a,
-            polynomial.polynomial_multiply(
-                p, gsw_ciphertext.rlwe_ciphertexts[i].a
-            ),
-        )
-        rlwe_ciphertext.b = polynomial.polynomial_add(
-            rlwe_ciphertext.b,
-            polynomial.polynomial_multiply(
-                p, gsw_ciphertext.rlwe_ciphertexts[i].b
-            ),
-        )
-
-    return rlwe_ciphertext
-
 
 def cmux(
-    gsw_ciphertext: GswCiphertext,
+    gsw_ciphertext: Union[
+        GswCiphertext, CompactGswCiphertext, FourierGswCiphertext
+    ],
     rlwe_ciphertext_0: rlwe.RlweCiphertext,
     rlwe_ciphertext_1: rlwe.RlweCiphertext,
 ) -> rlwe.RlweCiphertext:
@@ -196,7 +570,20 @@ def cmux(
     the output will be an RLWE encryption of l_0. Otherwise, the output will be
     an RLWE encryption of l_1.
     """
-    return rlwe.rlwe_add(
+    if isinstance(rlwe_ciphertext_0, rlwe.CompactRlweCiphertext) and isinstance(
+        rlwe_ciphertext_1, rlwe.CompactRlweCiphertext
+    ):
+        diff = np.subtract(
+            rlwe_ciphertext_1.data, rlwe_ciphertext_0.data, dtype=np.int32
+        )
+        prod = _external_product(gsw_ciphertext, diff)
+        np.add(prod, rlwe_ciphertext_0.data, out=prod)
+        return rlwe.CompactRlweCiphertext(
+            config=rlwe_ciphertext_0.config, data=prod
+        )
+
+    # The product is a new ciphertext, so the sum can be written into it.
+    return rlwe.rlwe_add_inplace(
         gsw_multiply(
             gsw_ciphertext,
             rlwe.rlwe_subtract(rlwe_ciphertext_1, rlwe_ciphertext_0),
@@ -0,0 +1,112 @@
+import dataclasses
+from typing import Optional
+
+import numpy as np
+
+from tfhe import lwe, utils
+
+
+@dataclasses.dataclass
+class KeySwitchConfig:
+    log_base: int  # Key switching will use the base-2^log_base representation.
+    levels: int  # The number of base-2^log_base digits to keep.
+
+
+@dataclasses.dataclass
+class KeySwitchKey:
+    """LWE encryptions of the input key bits under the output key.
+
+    Row i * levels + j of (a, b) is an encryption of
+    s_i * 2^(32 - (j+1)*log_base) where s_i is the i-th bit of the input key.
+    """
+
+    config: KeySwitchConfig
+    output_config: lwe.LweConfig
+    # An int32 array of shape (input dimension * levels, output dimension)
+    a: np.ndarray
+    b: np.ndarray  # An int32 array of size input dimension * levels
+
+
+def _keyswitch_gadget(config: KeySwitchConfig) -> np.ndarray:
+    """Return the int32 array [2^(32 - (j+1)*log_base) for j < levels]."""
+    powers = 32 - config.log_base * np.arange(1, config.levels + 1)
+    return (np.int64(1) << powers).astype(np.int32)
+
+
+def generate_keyswitch_key(
+    input_key: lwe.LweEncryptionKey,
+    output_key: lwe.LweEncryptionKey,
+    config: KeySwitchConfig,
+    rng: Optional[np.random.Generator] = None,
+) -> KeySwitchKey:
+    num_rows = input_key.config.dimension * config.levels
+
+    messages = np.multiply(
+        input_key.key[:, None], _keyswitch_gadget(config), dtype=np.int32
+    ).reshape(num_rows)
+
+    a = utils.uniform_sample_int32(
+        size=(num_rows, output_key.config.dimension), rng=rng
+    )
+    noise = utils.gaussian_sample_int32(
+        std=output_key.config.noise_std, size=num_rows, rng=rng
+    )
+
+    # b = (a, key) + message + noise
+    b = np.add(np.matmul(a, output_key.key), messages, dtype=np.int32)
+    b = np.add(b, noise, dtype=np.int32)
+
+    return KeySwitchKey(
+        config=config, output_config=output_key.config, a=a, b=b
+    )
+
+
+def keyswitch_decompose(a: np.ndarray, config: KeySwitchConfig) -> np.ndarray:
+    """Round each element of a to its top levels*log_base bits and decompose it.
+
+    a: An int32 array of shape (..., n).
+
+    Returns an int32 array d of shape (..., n * levels) with signed digits in
+    [-2^(log_base-1), 2^(log_base-1)) such that a[..., i] is approximately
+    sum_j d[..., i*levels + j] * 2^(32 - (j+1)*log_base).
+    """
+    num_bits = config.levels * config.log_base
+    base = 1 << config.log_base
+    half_base = base // 2
+
+    # Round to the top num_bits bits of the unsigned representation.
+    a_uint = np.asarray(a, dtype=np.int64) & 0xFFFFFFFF
+    dropped_bits = 32 - num_bits
+    a_rounded = (a_uint + ((1 << dropped_bits) >> 1)) >> dropped_bits
+
+    # Adding half_base to every digit shifts the digits from [-B/2, B/2) to
+    # [0, B).
+    offset = half_base * sum(base**k for k in range(config.levels))
+    a_offset = (a_rounded + offset) & ((1 << num_bits) - 1)
+
+    # Digit j is the coefficient of 2^(32 - (j+1)*log_base), so the most
+    # significant digit comes first.
+    shifts = config.log_base * np.arange(config.levels - 1, -1, -1)
+    digits = ((a_offset[..., None] >> shifts) & (base - 1)) - half_base
+    return digits.reshape(a_offset.shape[:-1] + (-1,)).astype(np.int32)
+
+
+def keyswitch(
+    ciphertext: lwe.LweCiphertext, keyswitch_key: KeySwitchKey
+) -> lwe.LweCiphertext:
+    """Switch an LWE ciphertext to the output key of the key switching key.
+
+    ciphertext.a may have leading batch axes, in which case every ciphertext
+    in the batch is switched with a single matrix product.
+    """
+    digits = keyswitch_decompose(ciphertext.a, keyswitch_key.config)
+
+    # Since a_i ~ sum_j d_ij * 2^(32 - (j+1)*log_base), subtracting the digit
+    # weighted encryptions of s_i * 2^(32 - (j+1)*log_base) from the trivial
+    # ciphertext (0, b) leaves an encryption of b - (a, s) under the output key.
+    a = np.negative(np.matmul(digits, keyswitch_key.a), dtype=np.int32)
+    b = np.subtract(
+        ciphertext.b, np.matmul(digits, keyswitch_key.b), dtype=np.int32
+    )
+
+    return lwe.LweCiphertext(config=keyswitch_key.output_config, a=a, b=b)
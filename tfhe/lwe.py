@@ -1,4 +1,6 @@
 import dataclasses
+from collections.abc import Sequence
+from typing import Optional
 
 import numpy as np
 
@@ -26,6 +28,34 @@ class LweCiphertext:
     b: np.int32
 
 
+class SeededLweCiphertext:
+    """An LWE ciphertext that stores the seed of its mask instead of a.
+
+    The mask is expanded from the seed with utils.expand_seed whenever a is
+    read, so a seeded ciphertext can be used wherever an LweCiphertext is
+    expected. If b has shape (M,) then a has shape (M, n).
+    """
+
+    __slots__ = ("config", "seed", "b")
+
+    def __init__(self, config: LweConfig, seed: int, b: np.ndarray):
+        self.config = config
+        self.seed = seed
+        self.b = b
+
+    def __repr__(self) -> str:
+        return (
+            f"SeededLweCiphertext(config={self.config}, seed={self.seed}, "
+            f"b={self.b})"
+        )
+
+    @property
+    def a(self) -> np.ndarray:
+        return utils.expand_seed(
+            self.seed, np.shape(self.b) + (self.config.dimension,)
+        )
+
+
 @dataclasses.dataclass
 class LweEncryptionKey:
     config: LweConfig
@@ -52,6 +82,16 @@ def lwe_decode_bool(plaintext: LwePlaintext) -> bool:
     return utils.decode_bool(plaintext.message)
 
 
+def lwe_encode_bool_batch(bits: np.ndarray) -> LwePlaintext:
+    """Encode an array of M booleans as an LWE plaintext of shape (M,)."""
+    return LwePlaintext(utils.encode_bool_array(bits))
+
+
+def lwe_decode_bool_batch(plaintext: LwePlaintext) -> np.ndarray:
+    """Decode an LWE plaintext of shape (M,) to an array of booleans."""
+    return utils.decode_bool_array(plaintext.message)
+
+
 def generate_lwe_key(config: LweConfig) -> LweEncryptionKey:
     return LweEncryptionKey(
         config=config,
@@ -62,10 +102,14 @@ def generate_lwe_key(config: LweConfig) -> LweEncryptionKey:
 
 
 def lwe_encrypt(
-    plaintext: LwePlaintext, key: LweEncryptionKey
+    plaintext: LwePlaintext,
+    key: LweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
 ) -> LweCiphertext:
-    a = utils.uniform_sample_int32(size=key.config.dimension)
-    noise = utils.gaussian_sample_int32(std=key.config.noise_std, size=None)
+    a = utils.uniform_sample_int32(size=key.config.dimension, rng=rng)
+    noise = utils.gaussian_sample_int32(
+        std=key.config.noise_std, size=None, rng=rng
+    )
 
     # b = (a, key) + message + noise
     b = np.add(np.dot(a, key.key), plaintext.message, dtype=np.int32)
@@ -82,6 +126,96 @@ def lwe_decrypt(
     )
 
 
+def lwe_encrypt_seeded(
+    plaintext: LwePlaintext,
+    key: LweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> SeededLweCiphertext:
+    """Encrypt a plaintext with a mask expanded from a fresh seed.
+
+    The message may be a single int32 or an array of shape (M,), in which case
+    the output is a batched ciphertext as in lwe_encrypt_batch.
+    """
+    message = np.asarray(plaintext.message, dtype=np.int32)
+    seed = utils.sample_seed(rng)
+    a = utils.expand_seed(seed, message.shape + (key.config.dimension,))
+    noise = utils.gaussian_sample_int32(
+        std=key.config.noise_std, size=message.shape or None, rng=rng
+    )
+
+    # b = (a, key) + message + noise
+    b = np.add(a @ key.key, message, dtype=np.int32)
+    b = np.add(b, noise, dtype=np.int32)
+
+    return SeededLweCiphertext(config=key.config, seed=seed, b=b)
+
+
+def expand_lwe_ciphertext(ciphertext: LweCiphertext) -> LweCiphertext:
+    """Expand the mask of a seeded ciphertext.
+
+    Other ciphertexts are returned as is.
+    """
+    if isinstance(ciphertext, SeededLweCiphertext):
+        return LweCiphertext(
+            config=ciphertext.config, a=ciphertext.a, b=ciphertext.b
+        )
+
+    return ciphertext
+
+
+def lwe_encrypt_batch(
+    plaintext: LwePlaintext,
+    key: LweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> LweCiphertext:
+    """Encrypt the M messages of a plaintext of shape (M,) at once.
+
+    The output is a batched ciphertext with a of shape (M, n) and b of shape
+    (M,). Row i is an encryption of message i.
+    """
+    messages = np.asarray(plaintext.message, dtype=np.int32)
+    a = utils.uniform_sample_int32(
+        size=(len(messages), key.config.dimension), rng=rng
+    )
+    noise = utils.gaussian_sample_int32(
+        std=key.config.noise_std, size=len(messages), rng=rng
+    )
+
+    # b = a @ key + message + noise
+    b = np.add(a @ key.key, messages, dtype=np.int32)
+    b = np.add(b, noise, dtype=np.int32)
+
+    return LweCiphertext(config=key.config, a=a, b=b)
+
+
+def lwe_decrypt_batch(
+    ciphertext: LweCiphertext, key: LweEncryptionKey
+) -> LwePlaintext:
+    """Decrypt a batched ciphertext to a plaintext of shape (M,)."""
+    return LwePlaintext(
+        np.subtract(ciphertext.b, ciphertext.a @ key.key, dtype=np.int32)
+    )
+
+
+def stack_lwe_ciphertexts(
+    ciphertexts: Sequence[LweCiphertext],
+) -> LweCiphertext:
+    """Stack LWE ciphertexts with the same config into a batched ciphertext."""
+    return LweCiphertext(
+        config=ciphertexts[0].config,
+        a=np.array([c.a for c in ciphertexts], dtype=np.int32),
+        b=np.array([c.b for c in ciphertexts], dtype=np.int32),
+    )
+
+
+def unstack_lwe_ciphertexts(ciphertext: LweCiphertext) -> list[LweCiphertext]:
+    """Split a batched ciphertext into a list of LWE ciphertexts."""
+    return [
+        LweCiphertext(config=ciphertext.config, a=a, b=b)
+        for a, b in zip(ciphertext.a, ciphertext.b)
+    ]
+
+
 def lwe_trivial_ciphertext(plaintext: LwePlaintext, config: LweConfig):
     """Generate a trivial encryption of the plaintext."""
     return LweCiphertext(
@@ -113,6 +247,51 @@ def lwe_subtract(
     )
 
 
+def lwe_add_inplace(
+    accumulator: LweCiphertext, ciphertext: LweCiphertext
+) -> LweCiphertext:
+    """Homomorphically add ciphertext to accumulator in place.
+
+    Returns accumulator. Its mask is overwritten, so it must not be shared with
+    another ciphertext that is still in use. A scalar body is replaced since
+    numpy scalars are immutable. The mask of a SeededLweCiphertext is expanded
+    on every access, so a seeded accumulator raises a TypeError. Expand it
+    first with expand_lwe_ciphertext.
+    """
+    _check_inplace_accumulator(accumulator)
+    np.add(accumulator.a, ciphertext.a, out=accumulator.a)
+    accumulator.b = _update_body(np.add, accumulator.b, ciphertext.b)
+    return accumulator
+
+
+def lwe_subtract_inplace(
+    accumulator: LweCiphertext, ciphertext: LweCiphertext
+) -> LweCiphertext:
+    """Homomorphically subtract ciphertext from accumulator in place.
+
+    Returns accumulator, which is overwritten as in lwe_add_inplace.
+    """
+    _check_inplace_accumulator(accumulator)
+    np.subtract(accumulator.a, ciphertext.a, out=accumulator.a)
+    accumulator.b = _update_body(np.subtract, accumulator.b, ciphertext.b)
+    return accumulator
+
+
+def _check_inplace_accumulator(accumulator: LweCiphertext):
+    if isinstance(accumulator, SeededLweCiphertext):
+        raise TypeError(
+            "Cannot update a SeededLweCiphertext in place. Expand it with "
+            "expand_lwe_ciphertext first."
+        )
+
+
+def _update_body(ufunc: np.ufunc, b, other_b):
+    """Apply ufunc to the bodies, in place if b is an array of a batch."""
+    if isinstance(b, np.ndarray) and b.ndim > 0:
+        return ufunc(b, other_b, out=b)
+    return ufunc(b, other_b, dtype=np.int32)
+
+
 def lwe_plaintext_multiply(c: int, ciphertext: LweCiphertext) -> LweCiphertext:
     """Homomorphically multiply an LWE ciphertext with a plaintext integer."""
     return LweCiphertext(
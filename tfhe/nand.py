@@ -1,6 +1,6 @@
 import numpy as np
 
-from tfhe import bootstrap, lwe, utils
+from tfhe import bootstrap, lwe, profiling, utils
 
 
 def lwe_nand(
@@ -15,20 +15,21 @@ def lwe_nand(
     of the boolean b_right. Then the the output is an LWE encryption of an encoding
     of NAND(b_left, b_right).
     """
-    # Compute an LWE encryption of: encode(-3) - m_left - m_right
-    initial_lwe_ciphertext = lwe.lwe_trivial_ciphertext(
-        plaintext=lwe.lwe_encode(-3),
-        config=lwe_ciphertext_left.config,
-    )
+    with profiling.span("lwe_nand"):
+        # Compute an LWE encryption of: encode(-3) - m_left - m_right
+        initial_lwe_ciphertext = lwe.lwe_trivial_ciphertext(
+            plaintext=lwe.lwe_encode(-3),
+            config=lwe_ciphertext_left.config,
+        )
 
-    test_lwe_ciphertext = lwe.lwe_subtract(
-        initial_lwe_ciphertext, lwe_ciphertext_left
-    )
-    test_lwe_ciphertext = lwe.lwe_subtract(
-        test_lwe_ciphertext, lwe_ciphertext_right
-    )
+        test_lwe_ciphertext = lwe.lwe_subtract(
+            initial_lwe_ciphertext, lwe_ciphertext_left
+        )
+        test_lwe_ciphertext = lwe.lwe_subtract(
+            test_lwe_ciphertext, lwe_ciphertext_right
+        )
 
-    # Bootstrap the test_lwe_ciphertext to an encoding of True.
-    return bootstrap.bootstrap(
-        test_lwe_ciphertext, bootstrap_key, scale=utils.encode_bool(True)
-    )
+        # Bootstrap the test_lwe_ciphertext to an encoding of True.
+        return bootstrap.bootstrap(
+            test_lwe_ciphertext, bootstrap_key, scale=utils.encode_bool(True)
+        )
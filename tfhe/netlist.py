@@ -0,0 +1,275 @@
+"""Load boolean netlists into circuit.Circuit.
+
+Two formats are supported:
+
+  * Bristol Fashion, as used for the circuits at
+    https://nigelsmart.github.io/MPC-Circuits/, with the gates XOR, AND, INV,
+    EQ, EQW and MAND.
+  * A combinational subset of BLIF: a single .model with .inputs, .outputs and
+    .names blocks with at most two inputs each.
+
+Bristol gates are streamed into a circuit.CircuitBuilder in chunks of lines,
+and wire ids are mapped with int32 arrays, so that large Bristol netlists load
+without a Python object per gate. BLIF blocks may appear in any order, so
+parse_blif holds the tokens of every .names block in memory before it adds
+them in topological order. This costs a few Python objects per gate.
+"""
+
+import itertools
+import re
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from tfhe import circuit
+from tfhe.circuit import Op
+
+# The gate names are replaced by negative codes, which mark the end of each
+# gate in the stream of numbers. MAND and EQW come first since they contain
+# the names AND and EQ.
+_BRISTOL_CODES = [
+    ("MAND", -1),
+    ("XOR", -2),
+    ("AND", -3),
+    ("INV", -4),
+    ("EQW", -5),
+    ("EQ", -6),
+]
+_MAND, _XOR, _AND, _INV, _EQW, _EQ = (code for _, code in _BRISTOL_CODES)
+
+# The number of lines parsed at a time.
+_CHUNK_SIZE = 1 << 16
+
+
+def _nonempty_lines(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        if line.strip():
+            yield line
+
+
+def _parse_bristol_chunk(
+    lines: list[str],
+    wires: np.ndarray,
+    builder: circuit.CircuitBuilder,
+):
+    """Add the gates on the lines to the builder and update the wire map."""
+    text = " ".join(lines)
+    for name, code in _BRISTOL_CODES:
+        text = text.replace(name, str(code))
+    unsupported = re.search(r"[A-Za-z]\w*", text)
+    if unsupported:
+        raise ValueError(f"Unsupported Bristol gate: {unsupported.group()}")
+
+    tokens = np.array(text.split(), dtype=np.int64)
+    ends = np.flatnonzero(tokens < 0)
+    if len(ends) != len(lines):
+        raise ValueError("Malformed Bristol gate.")
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    codes = tokens[ends]
+    num_inputs = tokens[starts]
+
+    # Every gate other than EQW adds one circuit gate per output. Expand the
+    # lines to the circuit gates, where gate i is output offsets[i] of line
+    # line_index[i].
+    gates_per_line = np.where(codes == _EQW, 0, tokens[starts + 1])
+    line_index = np.repeat(np.arange(len(lines)), gates_per_line)
+    offsets = np.arange(len(line_index)) - np.repeat(
+        np.cumsum(gates_per_line) - gates_per_line, gates_per_line
+    )
+    gate_starts = starts[line_index] + 2
+    gate_codes = codes[line_index]
+    gate_num_inputs = num_inputs[line_index]
+
+    output_wires = builder.num_wires + np.arange(len(line_index))
+    wires[tokens[gate_starts + gate_num_inputs + offsets]] = output_wires
+
+    # EQW copies a wire and may read the output of another EQW in the chunk.
+    for start in starts[codes == _EQW].tolist():
+        wires[tokens[start + 3]] = wires[tokens[start + 2]]
+
+    # The inputs of a MAND with 2m inputs are x_0..x_(m-1), y_0..y_(m-1).
+    x = tokens[gate_starts + offsets]
+    y = tokens[gate_starts + gate_num_inputs // 2 + offsets]
+    ops = np.select(
+        [
+            gate_codes == _XOR,
+            gate_codes == _INV,
+            (gate_codes == _EQ) & (x == 1),
+            gate_codes == _EQ,
+        ],
+        [Op.XOR, Op.NOT, Op.TRUE, Op.FALSE],
+        default=Op.AND,
+    )
+    num_op_inputs = circuit.NUM_INPUTS[ops]
+    gate_inputs = np.full((len(ops), 3), -1, dtype=np.int32)
+    gate_inputs[:, 0] = np.where(num_op_inputs > 0, wires[x], -1)
+    gate_inputs[:, 1] = np.where(num_op_inputs > 1, wires[y], -1)
+    builder.add_gates(ops, gate_inputs)
+
+
+def parse_bristol(lines: Iterable[str]) -> circuit.Circuit:
+    """Parse a circuit in the Bristol Fashion format.
+
+    The inputs of the circuit are the input wires of the netlist in order and
+    the outputs are its last output wires. The gates are parsed in chunks of
+    lines with numpy.
+    """
+    lines = _nonempty_lines(lines)
+    num_gates, num_wires = (int(t) for t in next(lines).split())
+    input_header = [int(t) for t in next(lines).split()]
+    output_header = [int(t) for t in next(lines).split()]
+    num_inputs = sum(input_header[1:])
+    num_outputs = sum(output_header[1:])
+
+    builder = circuit.CircuitBuilder(num_inputs)
+
+    # Maps the netlist wires to the circuit wires. Undefined wires are -1.
+    wires = np.full(num_wires, -1, dtype=np.int32)
+    wires[:num_inputs] = np.arange(num_inputs)
+
+    for start in range(0, num_gates, _CHUNK_SIZE):
+        chunk_size = min(_CHUNK_SIZE, num_gates - start)
+        chunk = list(itertools.islice(lines, chunk_size))
+        if len(chunk) < chunk_size:
+            raise ValueError(
+                f"The Bristol header has {num_gates} gates but the netlist "
+                f"has {start + len(chunk)}."
+            )
+        _parse_bristol_chunk(chunk, wires, builder)
+
+    return builder.build(wires[num_wires - num_outputs :])
+
+
+def load_bristol(path: str) -> circuit.Circuit:
+    with open(path) as f:
+        return parse_bristol(f)
+
+
+def _blif_lines(lines: Iterable[str]) -> Iterator[list[str]]:
+    """Yield the tokens of each logical line without comments."""
+    pending = []
+    for line in lines:
+        line = line.split("#", 1)[0].rstrip()
+        if line.endswith("\\"):
+            pending.append(line[:-1])
+            continue
+
+        tokens = " ".join(pending + [line]).split()
+        pending = []
+        if tokens:
+            yield tokens
+
+
+def _blif_truth_table(num_inputs: int, rows: list[list[str]]) -> list[bool]:
+    """Return the truth table of a .names block indexed by its input bits."""
+    # The rows list the on-set if their output is 1 and the off-set if it is
+    # 0, and all rows of a block have the same output.
+    on_set = not rows or rows[0][-1] == "1"
+    table = [not on_set] * (1 << num_inputs)
+    for row in rows:
+        pattern = row[0] if num_inputs else ""
+        for index, bits in enumerate(
+            itertools.product("01", repeat=num_inputs)
+        ):
+            if all(p in ("-", b) for p, b in zip(pattern, bits)):
+                table[index] = on_set
+    return table
+
+
+def parse_blif(lines: Iterable[str]) -> circuit.Circuit:
+    """Parse a combinational BLIF model.
+
+    The inputs and outputs of the circuit are the .inputs and .outputs of the
+    model in order. The .names blocks may appear in any order, so all of them
+    are read before the first gate is added.
+    """
+    input_names = []
+    output_names = []
+    # Maps a signal to the input signals and rows of its .names block.
+    blocks = {}
+    current = None
+    num_models = 0
+
+    for tokens in _blif_lines(lines):
+        keyword = tokens[0]
+        if keyword == ".model":
+            num_models += 1
+            if num_models > 1:
+                break
+        elif keyword == ".inputs":
+            input_names.extend(tokens[1:])
+        elif keyword == ".outputs":
+            output_names.extend(tokens[1:])
+        elif keyword == ".names":
+            if len(tokens) > 4:
+                raise ValueError(
+                    f"Only .names blocks with at most 2 inputs are "
+                    f"supported: {' '.join(tokens)}"
+                )
+            current = (tokens[1:-1], [])
+            blocks[tokens[-1]] = current
+        elif keyword == ".end":
+            break
+        elif keyword.startswith("."):
+            raise ValueError(f"Unsupported BLIF keyword: {keyword}")
+        elif current is None:
+            raise ValueError(f"Unexpected BLIF line: {' '.join(tokens)}")
+        else:
+            current[1].append(tokens)
+
+    builder = circuit.CircuitBuilder(len(input_names))
+    wires = {name: wire for wire, name in enumerate(input_names)}
+
+    def add_block(name):
+        block_inputs, rows = blocks[name]
+        table = _blif_truth_table(len(block_inputs), rows)
+        input_wires = [wires[n] for n in block_inputs]
+
+        if all(table) or not any(table):
+            return builder.add_gate(Op.TRUE if table[0] else Op.FALSE)
+        elif len(input_wires) == 1:
+            return (
+                input_wires[0]
+                if table[1]
+                else builder.add_gate(Op.NOT, input_wires[0])
+            )
+        elif table[0b00] == table[0b01] and table[0b10] == table[0b11]:
+            # The function only depends on the first input.
+            x = input_wires[0]
+            return x if table[0b10] else builder.add_gate(Op.NOT, x)
+        elif table[0b00] == table[0b10] and table[0b01] == table[0b11]:
+            y = input_wires[1]
+            return y if table[0b01] else builder.add_gate(Op.NOT, y)
+
+        op = circuit.TWO_INPUT_OPS_BY_TRUTH_TABLE[tuple(table)]
+        return builder.add_gate(op, *input_wires)
+
+    # Add the blocks in topological order with an iterative depth first
+    # search from the outputs. A block is expanded when its inputs have been
+    # added, and the blocks on the current search path are in_progress.
+    in_progress = set()
+    for output_name in output_names:
+        stack = [(output_name, False)]
+        while stack:
+            name, expanded = stack.pop()
+            if name in wires:
+                continue
+            elif expanded:
+                wires[name] = add_block(name)
+                in_progress.remove(name)
+                continue
+            elif name in in_progress:
+                raise ValueError(f"The netlist has a cycle at {name}.")
+            elif name not in blocks:
+                raise ValueError(f"Signal {name} is not defined.")
+
+            in_progress.add(name)
+            stack.append((name, True))
+            stack.extend((n, False) for n in blocks[name][0] if n not in wires)
+
+    return builder.build([wires[name] for name in output_names])
+
+
+def load_blif(path: str) -> circuit.Circuit:
+    with open(path) as f:
+        return parse_blif(f)
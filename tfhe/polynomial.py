@@ -1,5 +1,12 @@
-import numpy as np
 import dataclasses
+import functools
+
+import numpy as np
+
+from tfhe import profiling
+
+# The out argument of the np.fft functions was added in numpy 2.0.
+_FFT_HAS_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
 
 
 @dataclasses.dataclass
@@ -14,13 +21,141 @@ def polynomial_constant_multiply(c: int, p: Polynomial) -> Polynomial:
     return Polynomial(N=p.N, coeff=np.multiply(c, p.coeff, dtype=np.int32))
 
 
+@functools.lru_cache
+def negacyclic_twist(N: int) -> np.ndarray:
+    """Return the powers w^j for j < N/2 where w = exp(i*pi/N)."""
+    return np.exp(1j * np.pi * np.arange(N // 2) / N)
+
+
+def fft_into(a: np.ndarray, out: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Write np.fft.fft(a, axis=axis) into out and return out.
+
+    Versions of numpy before 2.0 do not support the out argument, so the
+    transform is computed in a new array and copied into out.
+    """
+    if _FFT_HAS_OUT:
+        return np.fft.fft(a, axis=axis, out=out)
+    np.copyto(out, np.fft.fft(a, axis=axis))
+    return out
+
+
+def ifft_into(a: np.ndarray, out: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Write np.fft.ifft(a, axis=axis) into out and return out.
+
+    See fft_into.
+    """
+    if _FFT_HAS_OUT:
+        return np.fft.ifft(a, axis=axis, out=out)
+    np.copyto(out, np.fft.ifft(a, axis=axis))
+    return out
+
+
+def negacyclic_fft(coeff: np.ndarray) -> np.ndarray:
+    """Evaluate negacyclic polynomials at the roots of x^N + 1.
+
+    coeff is an array of shape (..., N) of real polynomial coefficients. We fold
+    each polynomial into a complex polynomial of length N/2 by substituting
+    x^(N/2) = i, twist it by w^j where w = exp(i*pi/N) and apply an FFT of
+    length N/2. The output has shape (..., N/2) and products of polynomials
+    correspond to pointwise products of their transforms.
+    """
+    N = coeff.shape[-1]
+    folded = np.empty(coeff.shape[:-1] + (N // 2,), dtype=np.complex128)
+    folded.real = coeff[..., : N // 2]
+    folded.imag = coeff[..., N // 2 :]
+    folded *= negacyclic_twist(N)
+
+    profiling.count("fft", folded.size // (N // 2))
+    profiling.count_allocation(folded)
+    # Transforming in place saves allocating a second large array per batch.
+    return fft_into(folded, folded)
+
+
+def negacyclic_ifft(coeff_fft: np.ndarray) -> np.ndarray:
+    """Invert negacyclic_fft and round the result to an int64 array."""
+    N = 2 * coeff_fft.shape[-1]
+    folded = np.fft.ifft(coeff_fft, axis=-1)
+    folded *= np.conj(negacyclic_twist(N))
+
+    coeff = np.empty(coeff_fft.shape[:-1] + (N,), dtype=np.int64)
+    np.rint(folded.real, out=coeff[..., : N // 2], casting="unsafe")
+    np.rint(folded.imag, out=coeff[..., N // 2 :], casting="unsafe")
+
+    profiling.count("ifft", folded.size // (N // 2))
+    profiling.count_allocation(coeff)
+    return coeff
+
+
+def split_int32(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split an int32 array into 16 bit halves such that a = lo + 2^16 * hi.
+
+    Both halves are in the range [-2^15, 2^15] which keeps the FFT products
+    small enough to be computed exactly with float64.
+    """
+    a = a.astype(np.int64)
+    hi = (a + (1 << 15)) >> 16
+    lo = a - (hi << 16)
+    return lo, hi
+
+
+def negacyclic_multiply(a1: np.ndarray, a2: np.ndarray) -> np.ndarray:
+    """Multiply arrays of negacyclic polynomial coefficients mod 2^32.
+
+    a1 and a2 are int32 arrays whose last axis has length N. The leading axes
+    are broadcast against each other.
+    """
+    return _negacyclic_product(a1, a2).astype(np.int32)
+
+
+def _negacyclic_product(a1: np.ndarray, a2: np.ndarray) -> np.ndarray:
+    """Return an int64 array that is congruent to the product mod 2^32."""
+    if profiling.is_enabled():
+        profiling.count(
+            "polynomial_multiply",
+            int(np.prod(np.broadcast_shapes(a1.shape, a2.shape)[:-1])),
+        )
+    a1_lo, a1_hi = (negacyclic_fft(x) for x in split_int32(a1))
+    a2_lo, a2_hi = (negacyclic_fft(x) for x in split_int32(a2))
+
+    # The hi * hi product is a multiple of 2^32 and can be dropped.
+    lo = negacyclic_ifft(a1_lo * a2_lo)
+    mid = negacyclic_ifft(a1_lo * a2_hi + a1_hi * a2_lo)
+    np.left_shift(mid, 16, out=mid)
+    np.add(lo, mid, out=lo)
+    return lo
+
+
+def polynomial_mac(
+    acc: Polynomial, p1: Polynomial, p2: Polynomial
+) -> Polynomial:
+    """Add the product of p1 and p2 to acc in place and return acc.
+
+    The product is added to the coefficients of acc without first being
+    converted to a separate int32 polynomial.
+    """
+    np.add(
+        acc.coeff,
+        _negacyclic_product(p1.coeff, p2.coeff),
+        out=acc.coeff,
+        casting="unsafe",
+    )
+    return acc
+
+
 def polynomial_multiply(p1: Polynomial, p2: Polynomial) -> Polynomial:
     """Multiply two negacyclic polynomials.
 
-    Note that this is not an optimal implementation.
-    See
+    The product is computed with the FFT based algorithm described in
     https://www.jeremykun.com/2022/12/09/negacyclic-polynomial-multiplication/
-    for a more efficient version which uses FFTs.
+    and is exact modulo 2^32.
+    """
+    return Polynomial(N=p1.N, coeff=negacyclic_multiply(p1.coeff, p2.coeff))
+
+
+def naive_polynomial_multiply(p1: Polynomial, p2: Polynomial) -> Polynomial:
+    """Multiply two negacyclic polynomials in O(N^2) time.
+
+    This is a reference implementation of polynomial_multiply.
     """
     N = p1.N
 
@@ -35,6 +170,32 @@ def polynomial_multiply(p1: Polynomial, p2: Polynomial) -> Polynomial:
     return Polynomial(N=N, coeff=result)
 
 
+def negacyclic_rotate(coeff: np.ndarray, k) -> np.ndarray:
+    """Multiply arrays of negacyclic polynomial coefficients by x^k in O(N).
+
+    coeff: An int32 array of shape (..., N).
+    k: An integer or an integer array whose shape broadcasts against the
+       leading axes of coeff.
+    """
+    N = coeff.shape[-1]
+    extended_coeff = np.concatenate([coeff, -coeff], axis=-1)
+
+    # Since x^N = -1, the j-th coefficient of x^k * f(x) is coefficient
+    # (j - k mod 2N) of [f, -f].
+    index = (np.arange(N) - np.asarray(k)[..., None]) % (2 * N)
+    index = index.reshape((1,) * (coeff.ndim - index.ndim) + index.shape)
+    rotated = np.take_along_axis(extended_coeff, index, axis=-1)
+
+    profiling.count("monomial_rotate", rotated.size // N)
+    profiling.count_allocation(rotated)
+    return rotated
+
+
+def monomial_multiply(p: Polynomial, k: int) -> Polynomial:
+    """Multiply a polynomial by the monomial x^k."""
+    return Polynomial(N=p.N, coeff=negacyclic_rotate(p.coeff, k))
+
+
 def polynomial_add(p1: Polynomial, p2: Polynomial) -> Polynomial:
     return Polynomial(N=p1.N, coeff=np.add(p1.coeff, p2.coeff, dtype=np.int32))
 
@@ -45,6 +206,25 @@ def polynomial_subtract(p1: Polynomial, p2: Polynomial) -> Polynomial:
     )
 
 
+def polynomial_add_into(dst: Polynomial, p: Polynomial) -> Polynomial:
+    """Add p to dst in place and return dst.
+
+    The coefficients of dst are overwritten, so they must not be shared with
+    a polynomial that is still in use.
+    """
+    np.add(dst.coeff, p.coeff, out=dst.coeff, casting="unsafe")
+    return dst
+
+
+def polynomial_subtract_into(dst: Polynomial, p: Polynomial) -> Polynomial:
+    """Subtract p from dst in place and return dst.
+
+    The coefficients of dst are overwritten as in polynomial_add_into.
+    """
+    np.subtract(dst.coeff, p.coeff, out=dst.coeff, casting="unsafe")
+    return dst
+
+
 def zero_polynomial(N: int) -> Polynomial:
     return Polynomial(N=N, coeff=np.zeros(N, dtype=np.int32))
 
@@ -0,0 +1,173 @@
+"""Opt-in instrumentation of the bootstrapping hot path.
+
+Profiling is disabled by default. When it is disabled, count and span return
+immediately so the overhead is a function call per instrumented operation.
+
+Example:
+
+    with profiling.profile():
+        nand.lwe_nand(ciphertext_left, ciphertext_right, bootstrap_key)
+
+    print(profiling.counters())
+    print(profiling.summary())
+    profiling.export_chrome_trace("trace.json")
+
+The trace can be viewed in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+
+_enabled = False
+
+_counters: collections.Counter = collections.Counter()
+
+# Completed spans as tuples (name, start_ns, duration_ns, thread id, args).
+_spans: list[tuple[str, int, int, int, dict[str, Any]]] = []
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start_ns")
+
+    def __init__(self, name: str, args: dict[str, Any]):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        _spans.append(
+            (
+                self.name,
+                self.start_ns,
+                duration_ns,
+                threading.get_ident(),
+                self.args,
+            )
+        )
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Clear all counters and spans."""
+    _counters.clear()
+    _spans.clear()
+
+
+@contextlib.contextmanager
+def profile(reset_data: bool = True) -> Iterator[None]:
+    """Enable profiling in a with block."""
+    was_enabled = _enabled
+    if reset_data:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def count(name: str, n: int = 1):
+    """Increment the counter with the given name by n."""
+    if _enabled:
+        _counters[name] += n
+
+
+def count_allocation(array: np.ndarray):
+    """Count an array allocated by an instrumented operation."""
+    if _enabled:
+        _counters["allocations"] += 1
+        _counters["allocated_bytes"] += array.nbytes
+
+
+def span(name: str, **args):
+    """Return a context manager that records the time spent in a with block.
+
+    The keyword arguments are attached to the span in the exported trace.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+
+    return _Span(name, args)
+
+
+def counters() -> dict[str, int]:
+    return dict(_counters)
+
+
+def allocation_summary() -> dict[str, int]:
+    """Return the number of arrays and bytes recorded by count_allocation.
+
+    Only the arrays of the instrumented operations are counted.
+    """
+    return {
+        "allocations": _counters["allocations"],
+        "allocated_bytes": _counters["allocated_bytes"],
+    }
+
+
+def summary() -> dict[str, dict[str, float]]:
+    """Return the number of calls and total time of each span name."""
+    totals = collections.defaultdict(lambda: {"count": 0, "total_ms": 0.0})
+    for name, _, duration_ns, _, _ in _spans:
+        totals[name]["count"] += 1
+        totals[name]["total_ms"] += duration_ns / 1e6
+
+    return dict(totals)
+
+
+def chrome_trace() -> dict[str, Any]:
+    """Return the recorded spans in the Chrome trace event format."""
+    start_ns = min((s[1] for s in _spans), default=0)
+    pid = os.getpid()
+
+    events = [
+        {
+            "name": name,
+            "cat": "tfhe",
+            "ph": "X",
+            "ts": (span_start_ns - start_ns) / 1e3,
+            "dur": duration_ns / 1e3,
+            "pid": pid,
+            "tid": tid,
+            "args": args,
+        }
+        for name, span_start_ns, duration_ns, tid, args in _spans
+    ]
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"counters": counters()},
+    }
+
+
+def export_chrome_trace(path: str):
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
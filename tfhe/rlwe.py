@@ -1,8 +1,10 @@
 import dataclasses
+from collections.abc import Sequence
+from typing import Optional
 
 import numpy as np
 
-from tfhe import lwe, polynomial, utils
+from tfhe import lwe, polynomial, profiling, utils
 from tfhe.polynomial import Polynomial
 
 
@@ -31,9 +33,72 @@ class RlweCiphertext:
     b: Polynomial
 
 
+class CompactRlweCiphertext:
+    """An RLWE ciphertext stored in a single int32 array of shape (2, N).
+
+    data[0] contains the coefficients of a and data[1] the coefficients of b.
+    The a and b attributes are Polynomial views into data so that a compact
+    ciphertext can be used wherever an RlweCiphertext is expected.
+    """
+
+    __slots__ = ("config", "data")
+
+    def __init__(self, config: RlweConfig, data: np.ndarray):
+        self.config = config
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"CompactRlweCiphertext(config={self.config}, data={self.data})"
+
+    @property
+    def a(self) -> Polynomial:
+        return Polynomial(N=self.config.degree, coeff=self.data[0])
+
+    @a.setter
+    def a(self, p: Polynomial):
+        self.data[0] = p.coeff
+
+    @property
+    def b(self) -> Polynomial:
+        return Polynomial(N=self.config.degree, coeff=self.data[1])
+
+    @b.setter
+    def b(self, p: Polynomial):
+        self.data[1] = p.coeff
+
+
+class SeededRlweCiphertext:
+    """An RLWE ciphertext that stores the seed of its mask instead of a.
+
+    The a attribute is expanded from the seed with utils.expand_seed whenever
+    it is read, so a seeded ciphertext can be used wherever an RlweCiphertext
+    is expected.
+    """
+
+    __slots__ = ("config", "seed", "b")
+
+    def __init__(self, config: RlweConfig, seed: int, b: Polynomial):
+        self.config = config
+        self.seed = seed
+        self.b = b
+
+    def __repr__(self) -> str:
+        return (
+            f"SeededRlweCiphertext(config={self.config}, seed={self.seed}, "
+            f"b={self.b})"
+        )
+
+    @property
+    def a(self) -> Polynomial:
+        return Polynomial(
+            N=self.config.degree,
+            coeff=utils.expand_seed(self.seed, self.config.degree),
+        )
+
+
 def rlwe_encode(p: Polynomial, config: RlweConfig) -> RlwePlaintext:
     """Encode a polynomial with coefficients in [-4, 4) as an RLWE plaintext."""
-    encode_coeff = np.array([utils.encode(i) for i in p.coeff])
+    encode_coeff = utils.encode(np.asarray(p.coeff, dtype=np.int32))
     return RlwePlaintext(
         config=config, message=polynomial.Polynomial(N=p.N, coeff=encode_coeff)
     )
@@ -41,7 +106,7 @@ def rlwe_encode(p: Polynomial, config: RlweConfig) -> RlwePlaintext:
 
 def rlwe_decode(plaintext: RlwePlaintext) -> Polynomial:
     """Decode an RLWE plaintext to a polynomial with coefficients in [-4, 4) mod 8."""
-    decode_coeff = np.array([utils.decode(i) for i in plaintext.message.coeff])
+    decode_coeff = utils.decode_array(plaintext.message.coeff)
     return Polynomial(N=plaintext.message.N, coeff=decode_coeff)
 
 
@@ -83,28 +148,104 @@ def convert_lwe_key_to_rlwe(lwe_key: lwe.LweEncryptionKey) -> RlweEncryptionKey:
     )
 
 
+def convert_rlwe_key_to_lwe(
+    rlwe_key: RlweEncryptionKey,
+) -> lwe.LweEncryptionKey:
+    """Return the LWE key of the samples extracted from RLWE ciphertexts."""
+    lwe_config = lwe.LweConfig(
+        dimension=rlwe_key.config.degree, noise_std=rlwe_key.config.noise_std
+    )
+    return lwe.LweEncryptionKey(config=lwe_config, key=rlwe_key.key.coeff)
+
+
 def rlwe_encrypt(
-    plaintext: RlwePlaintext, key: RlweEncryptionKey
+    plaintext: RlwePlaintext,
+    key: RlweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
 ) -> RlweCiphertext:
     a = Polynomial(
         N=key.config.degree,
-        coeff=utils.uniform_sample_int32(size=key.config.degree),
+        coeff=utils.uniform_sample_int32(size=key.config.degree, rng=rng),
     )
     noise = Polynomial(
         N=key.config.degree,
         coeff=utils.gaussian_sample_int32(
-            std=key.config.noise_std, size=key.config.degree
+            std=key.config.noise_std, size=key.config.degree, rng=rng
         ),
     )
 
-    b = polynomial.polynomial_add(
-        polynomial.polynomial_multiply(a, key.key), plaintext.message
-    )
-    b = polynomial.polynomial_add(b, noise)
+    b = polynomial.polynomial_multiply(a, key.key)
+    polynomial.polynomial_add_into(b, plaintext.message)
+    polynomial.polynomial_add_into(b, noise)
 
     return RlweCiphertext(config=key.config, a=a, b=b)
 
 
+def rlwe_encrypt_batch(
+    plaintexts: Sequence[RlwePlaintext],
+    key: RlweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> list[CompactRlweCiphertext]:
+    """Encrypt K plaintexts with the same key at once.
+
+    The masks and noise of all K ciphertexts are sampled together and the
+    products with the key are one batched polynomial multiplication. The
+    outputs are views of a single int32 array of shape (K, 2, N).
+    """
+    N = key.config.degree
+    messages = np.array([p.message.coeff for p in plaintexts], dtype=np.int32)
+    return [
+        CompactRlweCiphertext(key.config, row)
+        for row in _rlwe_encrypt_array(messages.reshape(-1, N), key, rng)
+    ]
+
+
+def _rlwe_encrypt_array(
+    messages: np.ndarray,
+    key: RlweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+    a: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Encrypt an int32 array of K messages with shape (K, N).
+
+    Returns an int32 array of shape (K, 2, N) with the a and b components of
+    each ciphertext. If a is None then the masks are sampled from rng.
+    """
+    K, N = messages.shape
+    data = np.empty((K, 2, N), dtype=np.int32)
+    if a is None:
+        a = utils.uniform_sample_int32(size=(K, N), rng=rng)
+    data[:, 0] = a
+    noise = utils.gaussian_sample_int32(
+        std=key.config.noise_std, size=(K, N), rng=rng
+    )
+
+    # b = a * key + message + noise
+    b = polynomial.negacyclic_multiply(data[:, 0], key.key.coeff)
+    np.add(b, messages, out=data[:, 1])
+    np.add(data[:, 1], noise, out=data[:, 1])
+    return data
+
+
+def rlwe_encrypt_seeded(
+    plaintext: RlwePlaintext,
+    key: RlweEncryptionKey,
+    rng: Optional[np.random.Generator] = None,
+) -> SeededRlweCiphertext:
+    """Encrypt a plaintext with a mask expanded from a fresh seed."""
+    N = key.config.degree
+    seed = utils.sample_seed(rng)
+    data = _rlwe_encrypt_array(
+        np.asarray(plaintext.message.coeff, dtype=np.int32).reshape(1, N),
+        key,
+        rng=rng,
+        a=utils.expand_seed(seed, (1, N)),
+    )
+    return SeededRlweCiphertext(
+        config=key.config, seed=seed, b=Polynomial(N=N, coeff=data[0, 1])
+    )
+
+
 def rlwe_decrypt(
     ciphertext: RlweCiphertext, key: RlweEncryptionKey
 ) -> RlwePlaintext:
@@ -130,10 +271,37 @@ def rlwe_trivial_ciphertext(
     )
 
 
+def convert_rlwe_to_compact(
+    ciphertext: RlweCiphertext,
+) -> CompactRlweCiphertext:
+    """Store an RLWE ciphertext in a single array.
+
+    Compact ciphertexts are returned as is.
+    """
+    if isinstance(ciphertext, CompactRlweCiphertext):
+        return ciphertext
+
+    return CompactRlweCiphertext(
+        config=ciphertext.config,
+        data=np.stack([ciphertext.a.coeff, ciphertext.b.coeff]).astype(
+            np.int32
+        ),
+    )
+
+
 def rlwe_add(
     ciphertext_left: RlweCiphertext, ciphertext_right: RlweCiphertext
 ) -> RlweCiphertext:
     """Homomorphically add two RLWE ciphertexts."""
+    if isinstance(ciphertext_left, CompactRlweCiphertext) and isinstance(
+        ciphertext_right, CompactRlweCiphertext
+    ):
+        data = np.add(
+            ciphertext_left.data, ciphertext_right.data, dtype=np.int32
+        )
+        profiling.count_allocation(data)
+        return CompactRlweCiphertext(ciphertext_left.config, data)
+
     return RlweCiphertext(
         ciphertext_left.config,
         polynomial.polynomial_add(ciphertext_left.a, ciphertext_right.a),
@@ -145,6 +313,15 @@ def rlwe_subtract(
     ciphertext_left: RlweCiphertext, ciphertext_right: RlweCiphertext
 ) -> RlweCiphertext:
     """Homomorphically subtract two RLWE ciphertexts."""
+    if isinstance(ciphertext_left, CompactRlweCiphertext) and isinstance(
+        ciphertext_right, CompactRlweCiphertext
+    ):
+        data = np.subtract(
+            ciphertext_left.data, ciphertext_right.data, dtype=np.int32
+        )
+        profiling.count_allocation(data)
+        return CompactRlweCiphertext(ciphertext_left.config, data)
+
     return RlweCiphertext(
         ciphertext_left.config,
         polynomial.polynomial_subtract(ciphertext_left.a, ciphertext_right.a),
@@ -152,6 +329,57 @@ def rlwe_subtract(
     )
 
 
+def rlwe_add_inplace(
+    accumulator: RlweCiphertext, ciphertext: RlweCiphertext
+) -> RlweCiphertext:
+    """Homomorphically add ciphertext to accumulator in place.
+
+    Returns accumulator. Its polynomials are overwritten, so they must not be
+    shared with another ciphertext or plaintext that is still in use. The mask
+    of a SeededRlweCiphertext is expanded on every access, so a seeded
+    accumulator raises a TypeError. Expand it first with
+    convert_rlwe_to_compact.
+    """
+    _check_inplace_accumulator(accumulator)
+    if isinstance(accumulator, CompactRlweCiphertext) and isinstance(
+        ciphertext, CompactRlweCiphertext
+    ):
+        np.add(accumulator.data, ciphertext.data, out=accumulator.data)
+        return accumulator
+
+    # The polynomials of a compact accumulator are views of its data.
+    polynomial.polynomial_add_into(accumulator.a, ciphertext.a)
+    polynomial.polynomial_add_into(accumulator.b, ciphertext.b)
+    return accumulator
+
+
+def rlwe_subtract_inplace(
+    accumulator: RlweCiphertext, ciphertext: RlweCiphertext
+) -> RlweCiphertext:
+    """Homomorphically subtract ciphertext from accumulator in place.
+
+    Returns accumulator, which is overwritten as in rlwe_add_inplace.
+    """
+    _check_inplace_accumulator(accumulator)
+    if isinstance(accumulator, CompactRlweCiphertext) and isinstance(
+        ciphertext, CompactRlweCiphertext
+    ):
+        np.subtract(accumulator.data, ciphertext.data, out=accumulator.data)
+        return accumulator
+
+    polynomial.polynomial_subtract_into(accumulator.a, ciphertext.a)
+    polynomial.polynomial_subtract_into(accumulator.b, ciphertext.b)
+    return accumulator
+
+
+def _check_inplace_accumulator(accumulator: RlweCiphertext):
+    if isinstance(accumulator, SeededRlweCiphertext):
+        raise TypeError(
+            "Cannot update a SeededRlweCiphertext in place. Expand it with "
+            "convert_rlwe_to_compact first."
+        )
+
+
 def rlwe_plaintext_multiply(
     c: RlwePlaintext, ciphertext: RlweCiphertext
 ) -> RlweCiphertext:
@@ -161,3 +389,20 @@ def rlwe_plaintext_multiply(
         polynomial.polynomial_multiply(c.message, ciphertext.a),
         polynomial.polynomial_multiply(c.message, ciphertext.b),
     )
+
+
+def rlwe_monomial_multiply(
+    ciphertext: RlweCiphertext, k: int
+) -> RlweCiphertext:
+    """Homomorphically multiply an RLWE ciphertext by the monomial x^k."""
+    if isinstance(ciphertext, CompactRlweCiphertext):
+        return CompactRlweCiphertext(
+            ciphertext.config,
+            polynomial.negacyclic_rotate(ciphertext.data, k),
+        )
+
+    return RlweCiphertext(
+        ciphertext.config,
+        polynomial.monomial_multiply(ciphertext.a, k),
+        polynomial.monomial_multiply(ciphertext.b, k),
+    )
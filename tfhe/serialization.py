@@ -0,0 +1,366 @@
+"""A versioned binary format for keys and ciphertexts.
+
+A file consists of:
+  * A preamble containing the magic bytes b"TFHE", the format version and the
+    size of the header.
+  * A JSON header containing the object type, its configuration parameters and
+    the dtype, shape and offset of each array.
+  * The raw arrays, each aligned to 64 bytes.
+
+Since the arrays are stored uncompressed at aligned offsets they can be loaded
+with np.memmap. In particular, many processes that load the same bootstrap key
+share a single page cached copy of it.
+"""
+
+import dataclasses
+import json
+import struct
+from collections.abc import Mapping
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from tfhe import bootstrap, gsw, keyswitch, lwe, polynomial, rlwe
+
+FORMAT_VERSION = 1
+
+_MAGIC = b"TFHE"
+_PREAMBLE = struct.Struct("<4sIQ")  # magic, version, header size
+_ALIGNMENT = 64
+_UNROLLED_PREFIX = "Unrolled"
+_BOOTSTRAP_KEY_TYPES = (
+    "SeededBootstrapKey",
+    "BootstrapKey",
+    "FourierBootstrapKey",
+)
+
+
+def align(offset: int) -> int:
+    """Round an offset up to the alignment of the arrays in a file."""
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _gsw_config_from_dict(d: Mapping[str, Any]) -> gsw.GswConfig:
+    return gsw.GswConfig(
+        **{**d, "rlwe_config": rlwe.RlweConfig(**d["rlwe_config"])}
+    )
+
+
+def _keyswitch_key_to_arrays(
+    keyswitch_key: Optional[keyswitch.KeySwitchKey],
+) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    if keyswitch_key is None:
+        return {}, {}
+
+    metadata = {
+        "keyswitch_config": dataclasses.asdict(keyswitch_key.config),
+        "keyswitch_output_config": dataclasses.asdict(
+            keyswitch_key.output_config
+        ),
+    }
+    arrays = {"keyswitch_a": keyswitch_key.a, "keyswitch_b": keyswitch_key.b}
+    return metadata, arrays
+
+
+def _keyswitch_key_from_arrays(
+    metadata: Mapping[str, Any], arrays: Mapping[str, np.ndarray]
+) -> Optional[keyswitch.KeySwitchKey]:
+    if "keyswitch_config" not in metadata:
+        return None
+
+    return keyswitch.KeySwitchKey(
+        config=keyswitch.KeySwitchConfig(**metadata["keyswitch_config"]),
+        output_config=lwe.LweConfig(**metadata["keyswitch_output_config"]),
+        a=arrays["keyswitch_a"],
+        b=arrays["keyswitch_b"],
+    )
+
+
+def _bootstrap_key_to_arrays(
+    bootstrap_key: Union[bootstrap.BootstrapKey, bootstrap.FourierBootstrapKey],
+) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    metadata, arrays = _keyswitch_key_to_arrays(bootstrap_key.keyswitch_key)
+    metadata["config"] = dataclasses.asdict(bootstrap_key.config)
+    return metadata, arrays
+
+
+def _bootstrap_key_type_name(
+    bootstrap_key: Union[bootstrap.BootstrapKey, bootstrap.FourierBootstrapKey],
+    type_name: str,
+) -> str:
+    # Unrolled keys get their own type names so that readers which do not
+    # know about them reject the file instead of loading a normal key.
+    if bootstrap_key.unrolled:
+        return _UNROLLED_PREFIX + type_name
+    return type_name
+
+
+def to_arrays(obj: Any) -> tuple[str, dict[str, Any], dict[str, np.ndarray]]:
+    """Split a key or ciphertext into a type name, metadata and arrays.
+
+    The metadata is a JSON serializable dict containing the configuration of
+    the object. from_arrays reconstructs the object from the output.
+    """
+    if isinstance(obj, lwe.LweEncryptionKey):
+        return (
+            "LweEncryptionKey",
+            {"config": dataclasses.asdict(obj.config)},
+            {"key": obj.key},
+        )
+    elif isinstance(obj, lwe.SeededLweCiphertext):
+        return (
+            "SeededLweCiphertext",
+            {"config": dataclasses.asdict(obj.config), "seed": obj.seed},
+            {"b": np.asarray(obj.b, dtype=np.int32)},
+        )
+    elif isinstance(obj, lwe.LweCiphertext):
+        return (
+            "LweCiphertext",
+            {"config": dataclasses.asdict(obj.config)},
+            {"a": obj.a, "b": np.asarray(obj.b, dtype=np.int32)},
+        )
+    elif isinstance(obj, rlwe.RlweEncryptionKey):
+        return (
+            "RlweEncryptionKey",
+            {"config": dataclasses.asdict(obj.config)},
+            {"key": obj.key.coeff},
+        )
+    elif isinstance(obj, rlwe.SeededRlweCiphertext):
+        return (
+            "SeededRlweCiphertext",
+            {"config": dataclasses.asdict(obj.config), "seed": obj.seed},
+            {"b": obj.b.coeff},
+        )
+    elif isinstance(obj, (rlwe.RlweCiphertext, rlwe.CompactRlweCiphertext)):
+        return (
+            "RlweCiphertext",
+            {"config": dataclasses.asdict(obj.config)},
+            {"data": rlwe.convert_rlwe_to_compact(obj).data},
+        )
+    elif isinstance(obj, gsw.GswEncryptionKey):
+        return (
+            "GswEncryptionKey",
+            {"config": dataclasses.asdict(obj.config)},
+            {"key": obj.key.coeff},
+        )
+    elif isinstance(obj, gsw.SeededGswCiphertext):
+        return (
+            "SeededGswCiphertext",
+            {"config": dataclasses.asdict(obj.config), "seed": obj.seed},
+            {"b": obj.b},
+        )
+    elif isinstance(obj, (gsw.GswCiphertext, gsw.CompactGswCiphertext)):
+        return (
+            "GswCiphertext",
+            {"config": dataclasses.asdict(obj.config)},
+            {"data": gsw.convert_gsw_to_compact(obj).data},
+        )
+    elif isinstance(obj, bootstrap.BootstrapKey):
+        metadata, arrays = _bootstrap_key_to_arrays(obj)
+        if obj.gsw_ciphertexts and all(
+            isinstance(c, gsw.SeededGswCiphertext) for c in obj.gsw_ciphertexts
+        ):
+            metadata["seeds"] = [c.seed for c in obj.gsw_ciphertexts]
+            arrays["b"] = np.array(
+                [c.b for c in obj.gsw_ciphertexts], dtype=np.int32
+            )
+            return (
+                _bootstrap_key_type_name(obj, "SeededBootstrapKey"),
+                metadata,
+                arrays,
+            )
+
+        arrays["data"] = np.array(
+            [gsw.convert_gsw_to_compact(c).data for c in obj.gsw_ciphertexts],
+            dtype=np.int32,
+        )
+        return _bootstrap_key_type_name(obj, "BootstrapKey"), metadata, arrays
+    elif isinstance(obj, bootstrap.FourierBootstrapKey):
+        metadata, arrays = _bootstrap_key_to_arrays(obj)
+        arrays["data"] = np.array([c.data for c in obj.gsw_ciphertexts])
+        return (
+            _bootstrap_key_type_name(obj, "FourierBootstrapKey"),
+            metadata,
+            arrays,
+        )
+
+    raise TypeError(f"Unsupported type: {type(obj).__name__}")
+
+
+def from_arrays(
+    type_name: str,
+    metadata: Mapping[str, Any],
+    arrays: Mapping[str, np.ndarray],
+) -> Any:
+    """Reconstruct an object from the output of to_arrays.
+
+    The arrays are not copied, so the returned object is a view of them.
+    """
+    unrolled = (
+        type_name.startswith(_UNROLLED_PREFIX)
+        and type_name[len(_UNROLLED_PREFIX) :] in _BOOTSTRAP_KEY_TYPES
+    )
+    if unrolled:
+        type_name = type_name[len(_UNROLLED_PREFIX) :]
+
+    if type_name == "LweEncryptionKey":
+        return lwe.LweEncryptionKey(
+            config=lwe.LweConfig(**metadata["config"]), key=arrays["key"]
+        )
+    elif type_name == "LweCiphertext":
+        b = arrays["b"]
+        return lwe.LweCiphertext(
+            config=lwe.LweConfig(**metadata["config"]),
+            a=arrays["a"],
+            b=np.int32(b) if b.ndim == 0 else b,
+        )
+    elif type_name == "SeededLweCiphertext":
+        b = arrays["b"]
+        return lwe.SeededLweCiphertext(
+            config=lwe.LweConfig(**metadata["config"]),
+            seed=metadata["seed"],
+            b=np.int32(b) if b.ndim == 0 else b,
+        )
+    elif type_name == "RlweEncryptionKey":
+        config = rlwe.RlweConfig(**metadata["config"])
+        return rlwe.RlweEncryptionKey(
+            config=config,
+            key=polynomial.Polynomial(N=config.degree, coeff=arrays["key"]),
+        )
+    elif type_name == "RlweCiphertext":
+        return rlwe.CompactRlweCiphertext(
+            config=rlwe.RlweConfig(**metadata["config"]), data=arrays["data"]
+        )
+    elif type_name == "SeededRlweCiphertext":
+        config = rlwe.RlweConfig(**metadata["config"])
+        return rlwe.SeededRlweCiphertext(
+            config=config,
+            seed=metadata["seed"],
+            b=polynomial.Polynomial(N=config.degree, coeff=arrays["b"]),
+        )
+    elif type_name == "GswEncryptionKey":
+        config = _gsw_config_from_dict(metadata["config"])
+        return gsw.GswEncryptionKey(
+            config=config,
+            key=polynomial.Polynomial(
+                N=config.rlwe_config.degree, coeff=arrays["key"]
+            ),
+        )
+    elif type_name == "GswCiphertext":
+        return gsw.CompactGswCiphertext(
+            config=_gsw_config_from_dict(metadata["config"]),
+            data=arrays["data"],
+        )
+    elif type_name == "SeededGswCiphertext":
+        return gsw.SeededGswCiphertext(
+            config=_gsw_config_from_dict(metadata["config"]),
+            seed=metadata["seed"],
+            b=arrays["b"],
+        )
+    elif type_name == "SeededBootstrapKey":
+        config = _gsw_config_from_dict(metadata["config"])
+        return bootstrap.BootstrapKey(
+            config=config,
+            gsw_ciphertexts=[
+                gsw.SeededGswCiphertext(config=config, seed=seed, b=b)
+                for seed, b in zip(metadata["seeds"], arrays["b"])
+            ],
+            keyswitch_key=_keyswitch_key_from_arrays(metadata, arrays),
+            unrolled=unrolled,
+        )
+    elif type_name == "BootstrapKey":
+        config = _gsw_config_from_dict(metadata["config"])
+        return bootstrap.BootstrapKey(
+            config=config,
+            gsw_ciphertexts=[
+                gsw.CompactGswCiphertext(config=config, data=data)
+                for data in arrays["data"]
+            ],
+            keyswitch_key=_keyswitch_key_from_arrays(metadata, arrays),
+            unrolled=unrolled,
+        )
+    elif type_name == "FourierBootstrapKey":
+        config = _gsw_config_from_dict(metadata["config"])
+        return bootstrap.FourierBootstrapKey(
+            config=config,
+            gsw_ciphertexts=[
+                gsw.FourierGswCiphertext(config=config, data=data)
+                for data in arrays["data"]
+            ],
+            keyswitch_key=_keyswitch_key_from_arrays(metadata, arrays),
+            unrolled=unrolled,
+        )
+
+    raise ValueError(f"Unsupported type: {type_name}")
+
+
+def save(path: str, obj: Any):
+    """Save a key or ciphertext to a file."""
+    type_name, metadata, arrays = to_arrays(obj)
+
+    array_headers = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = align(offset)
+        array_headers[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += array.nbytes
+
+    header = json.dumps(
+        {"type": type_name, "metadata": metadata, "arrays": array_headers}
+    ).encode("utf-8")
+
+    # The array offsets in the header are relative to the aligned end of the
+    # header.
+    data_start = align(_PREAMBLE.size + len(header))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + array_headers[name]["offset"])
+            np.ascontiguousarray(array).tofile(f)
+
+
+def load(path: str, mmap_mode: Optional[str] = None) -> Any:
+    """Load a key or ciphertext from a file written by save.
+
+    If mmap_mode is not None then the arrays are memory mapped with np.memmap
+    using the given mode (e.g. "r") instead of being read into memory.
+    """
+    with open(path, "rb") as f:
+        magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a TFHE file.")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported format version {version} in {path}. "
+                f"The latest supported version is {FORMAT_VERSION}."
+            )
+        header = json.loads(f.read(header_size).decode("utf-8"))
+
+        data_start = align(_PREAMBLE.size + header_size)
+        arrays = {}
+        for name, array_header in header["arrays"].items():
+            dtype = np.dtype(array_header["dtype"])
+            shape = tuple(array_header["shape"])
+            offset = data_start + array_header["offset"]
+
+            if mmap_mode is not None:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode=mmap_mode,
+                    offset=offset,
+                    shape=shape,
+                )
+            else:
+                f.seek(offset)
+                arrays[name] = np.fromfile(
+                    f, dtype=dtype, count=int(np.prod(shape))
+                ).reshape(shape)
+
+    return from_arrays(header["type"], header["metadata"], arrays)
@@ -6,17 +6,31 @@ INT32_MIN = np.iinfo(np.int32).min
 INT32_MAX = np.iinfo(np.int32).max
 
 
-def uniform_sample_int32(size: int) -> np.ndarray:
-    return np.random.randint(
-        low=INT32_MIN,
-        high=INT32_MAX + 1,
-        size=size,
-        dtype=np.int32,
+def uniform_sample_int32(
+    size: int, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """Sample uniform int32s from rng or from the global numpy RNG."""
+    if rng is None:
+        return np.random.randint(
+            low=INT32_MIN,
+            high=INT32_MAX + 1,
+            size=size,
+            dtype=np.int32,
+        )
+
+    return rng.integers(
+        low=INT32_MIN, high=INT32_MAX, size=size, dtype=np.int32, endpoint=True
     )
 
 
-def gaussian_sample_int32(std: float, size: Optional[float]) -> np.ndarray:
-    return np.int32(INT32_MAX * np.random.normal(loc=0.0, scale=std, size=size))
+def gaussian_sample_int32(
+    std: float,
+    size: Optional[float],
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Sample scaled gaussian int32s from rng or from the global numpy RNG."""
+    normal = np.random.normal if rng is None else rng.normal
+    return np.int32(INT32_MAX * normal(loc=0.0, scale=std, size=size))
 
 
 def encode(i: int) -> np.int32:
@@ -37,3 +51,33 @@ def encode_bool(b: bool) -> np.int32:
 def decode_bool(i: np.int32) -> bool:
     """Decode an int32 to a bool."""
     return bool(decode(i) / 2)
+
+
+def decode_array(x: np.ndarray) -> np.ndarray:
+    """Decode an array of int32s to integers in the range [-4, 4) mod 8."""
+    d = np.rint(np.asarray(x) / (1 << 29)).astype(np.int64)
+    return ((d + 4) % 8) - 4
+
+
+def encode_bool_array(b: np.ndarray) -> np.ndarray:
+    """Encode an array of bits as int32s."""
+    return encode(2 * np.asarray(b, dtype=np.int32))
+
+
+def decode_bool_array(x: np.ndarray) -> np.ndarray:
+    """Decode an array of int32s to bools."""
+    return decode_array(x) != 0
+
+
+def sample_seed(rng: Optional[np.random.Generator] = None) -> int:
+    """Sample a 128 bit seed from rng or from the global numpy RNG."""
+    words = uniform_sample_int32(size=4, rng=rng).view(np.uint32)
+    return sum(int(w) << (32 * i) for i, w in enumerate(words))
+
+
+def expand_seed(seed: int, size) -> np.ndarray:
+    """Expand a seed to uniform int32s of the given size.
+
+    The output only depends on the seed and the size.
+    """
+    return uniform_sample_int32(size=size, rng=np.random.default_rng(seed))
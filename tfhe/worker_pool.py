@@ -0,0 +1,212 @@
+"""Bootstrap LWE ciphertexts in a pool of worker processes.
+
+The blind rotation is a long sequence of numpy operations on small arrays, so
+threads do not scale it across cores. Instead, a WorkerPoolBackend splits each
+batch of ciphertexts between worker processes. The bootstrap key is copied
+once into a block of shared memory. The workers attach to the block and view
+the key arrays in place, so only the LWE ciphertexts are sent to and from the
+workers.
+"""
+
+import concurrent.futures
+import dataclasses
+import os
+from collections.abc import Sequence
+from multiprocessing import shared_memory
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from tfhe import bootstrap, lwe, serialization
+
+
+@dataclasses.dataclass
+class SharedKeyHandle:
+    """The picklable information needed to attach to a shared key."""
+
+    shared_memory_name: str
+    type_name: str
+    metadata: dict[str, Any]
+    # Maps each array name to its dtype, shape and offset in the block.
+    array_headers: dict[str, tuple[str, tuple[int, ...], int]]
+
+
+class SharedBootstrapKey:
+    """A Fourier bootstrap key whose arrays live in shared memory.
+
+    The process that creates the key owns the shared memory block and must
+    call close to release it. Other processes attach with attach_key.
+    """
+
+    def __init__(
+        self,
+        bootstrap_key: Union[
+            bootstrap.BootstrapKey, bootstrap.FourierBootstrapKey
+        ],
+    ):
+        if isinstance(bootstrap_key, bootstrap.BootstrapKey):
+            bootstrap_key = bootstrap.convert_bootstrap_key_to_fourier(
+                bootstrap_key
+            )
+        type_name, metadata, arrays = serialization.to_arrays(bootstrap_key)
+
+        array_headers = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = serialization.align(offset)
+            array_headers[name] = (array.dtype.str, array.shape, offset)
+            offset += array.nbytes
+
+        self._shared_memory = shared_memory.SharedMemory(
+            create=True, size=max(offset, 1)
+        )
+        self.handle = SharedKeyHandle(
+            shared_memory_name=self._shared_memory.name,
+            type_name=type_name,
+            metadata=metadata,
+            array_headers=array_headers,
+        )
+        self.key = _view_key(self._shared_memory, self.handle)
+        for name, array in arrays.items():
+            _view_array(self._shared_memory, *array_headers[name])[...] = array
+
+    def close(self):
+        """Release the shared memory block."""
+        if self._shared_memory is None:
+            return
+
+        self.key = None
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def __enter__(self) -> "SharedBootstrapKey":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _view_array(
+    block: shared_memory.SharedMemory,
+    dtype: str,
+    shape: tuple[int, ...],
+    offset: int,
+) -> np.ndarray:
+    return np.ndarray(
+        shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset
+    )
+
+
+def _view_key(
+    block: shared_memory.SharedMemory, handle: SharedKeyHandle
+) -> bootstrap.FourierBootstrapKey:
+    arrays = {
+        name: _view_array(block, *header)
+        for name, header in handle.array_headers.items()
+    }
+    return serialization.from_arrays(handle.type_name, handle.metadata, arrays)
+
+
+def attach_key(
+    handle: SharedKeyHandle,
+) -> tuple[shared_memory.SharedMemory, bootstrap.FourierBootstrapKey]:
+    """Attach to a shared key without copying it.
+
+    The key is a view of the returned shared memory block, which must stay
+    open while the key is in use.
+    """
+    block = shared_memory.SharedMemory(name=handle.shared_memory_name)
+    return block, _view_key(block, handle)
+
+
+# The shared memory block and key of a worker process.
+_worker_block = None
+_worker_key = None
+
+
+def _initialize_worker(handle: SharedKeyHandle):
+    global _worker_block, _worker_key
+    _worker_block, _worker_key = attach_key(handle)
+
+
+def _bootstrap_in_worker(
+    config: lwe.LweConfig, a: np.ndarray, b: np.ndarray, scale: np.int32
+) -> tuple[lwe.LweConfig, np.ndarray, np.ndarray]:
+    ciphertexts = bootstrap.bootstrap_batch(
+        lwe.unstack_lwe_ciphertexts(lwe.LweCiphertext(config, a, b)),
+        _worker_key,
+        scale,
+    )
+    batch = lwe.stack_lwe_ciphertexts(ciphertexts)
+    return batch.config, batch.a, batch.b
+
+
+class WorkerPoolBackend:
+    """Bootstrap batches in a pool of processes that share the key.
+
+    This is a circuit.Backend. Each batch is split into at most num_workers
+    parts of at least min_batch_size ciphertexts, which are bootstrapped in
+    parallel with bootstrap.bootstrap_batch. Call close, or use the backend as
+    a context manager, to stop the workers and release the shared key.
+    """
+
+    def __init__(
+        self,
+        bootstrap_key: Union[
+            bootstrap.BootstrapKey, bootstrap.FourierBootstrapKey
+        ],
+        num_workers: Optional[int] = None,
+        min_batch_size: int = 1,
+        scale: Optional[np.int32] = None,
+    ):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.min_batch_size = min_batch_size
+        self.scale = (
+            lwe.lwe_encode_bool(True).message if scale is None else scale
+        )
+        self.shared_key = SharedBootstrapKey(bootstrap_key)
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            self.num_workers,
+            initializer=_initialize_worker,
+            initargs=(self.shared_key.handle,),
+        )
+
+    def __call__(
+        self, lwe_ciphertexts: Sequence[lwe.LweCiphertext]
+    ) -> Sequence[lwe.LweCiphertext]:
+        if not lwe_ciphertexts:
+            return []
+
+        batch = lwe.stack_lwe_ciphertexts(lwe_ciphertexts)
+        num_parts = max(
+            1,
+            min(self.num_workers, len(lwe_ciphertexts) // self.min_batch_size),
+        )
+        futures = [
+            self._executor.submit(
+                _bootstrap_in_worker, batch.config, a_part, b_part, self.scale
+            )
+            for a_part, b_part in zip(
+                np.array_split(batch.a, num_parts),
+                np.array_split(batch.b, num_parts),
+            )
+        ]
+
+        outputs = []
+        for future in futures:
+            outputs.extend(
+                lwe.unstack_lwe_ciphertexts(lwe.LweCiphertext(*future.result()))
+            )
+        return outputs
+
+    def close(self):
+        """Stop the workers and release the shared key."""
+        self._executor.shutdown()
+        self.shared_key.close()
+
+    def __enter__(self) -> "WorkerPoolBackend":
+        return self
+
+    def __exit__(self, *args):
+        self.close()